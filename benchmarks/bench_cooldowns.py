@@ -0,0 +1,106 @@
+"""Memory held by per-user cooldown maps after 1M distinct users.
+
+Simulates a long uptime where a million different users each send a
+message, 1,000 new users per (simulated) second, and compares the old
+plain dicts with CooldownMap / RecentEvents.
+
+Run from the repository root:
+    python benchmarks/bench_cooldowns.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cooldowns import CooldownMap, RecentEvents
+
+USERS = 1_000_000
+USERS_PER_SECOND = 1_000
+COOLDOWN = 60
+SPAM_WINDOW = 120
+SPAM_LIMIT = 4
+
+
+def measure(label, run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {len(result):>9,} entries  {current / 2**20:8.1f} MiB held  "
+          f"{peak / 2**20:8.1f} MiB peak  {elapsed:6.2f} s")
+    return result
+
+
+def user_times():
+    base = 1_700_000_000_000_000_000
+    for i in range(USERS):
+        yield base + i, i / USERS_PER_SECOND
+
+
+def legacy_cooldowns():
+    """Levels.message_cooldowns before: one entry per user ever seen"""
+    cooldowns = {}
+    for user_id, now in user_times():
+        if user_id in cooldowns and now - cooldowns[user_id] < COOLDOWN:
+            continue
+        cooldowns[user_id] = now
+    return cooldowns
+
+
+def bounded_cooldowns():
+    cooldowns = CooldownMap(ttl=COOLDOWN)
+    for user_id, now in user_times():
+        cooldowns.hit(user_id, now)
+    return cooldowns
+
+
+def legacy_history():
+    """AIPersonality.user_message_history before: a list per user ever seen"""
+    history = {}
+    for user_id, now in user_times():
+        history.setdefault(user_id, [])
+        history[user_id] = [t for t in history[user_id] if now - t < SPAM_WINDOW]
+        history[user_id].append(now)
+    return history
+
+
+def bounded_history():
+    history = RecentEvents(window=SPAM_WINDOW, limit=SPAM_LIMIT)
+    for user_id, now in user_times():
+        history.exceeded(user_id, now)
+        history.add(user_id, now)
+    return history
+
+
+def check_semantics():
+    cooldowns = CooldownMap(ttl=10)
+    assert cooldowns.hit("a", 0) and not cooldowns.hit("a", 5) and cooldowns.hit("a", 10)
+    assert cooldowns.remaining("a", 12) == 8 and cooldowns.remaining("a", 12, ttl=4) == 2
+    cooldowns.touch("b", 11)
+    cooldowns.expire(20.5)
+    assert "a" not in cooldowns and len(cooldowns) == 1
+
+    history = RecentEvents(window=10, limit=3)
+    for now in (0, 1, 2):
+        history.add("u", now)
+    assert history.exceeded("u", 5) and not history.exceeded("u", 10.5)
+    history.add("v", 30)
+    assert len(history) == 1
+    print("semantics: OK")
+
+
+def main():
+    check_semantics()
+    print(f"{USERS:,} distinct users, {USERS_PER_SECOND:,} new users/s\n")
+    measure("dict cooldowns (before)", legacy_cooldowns)
+    measure("CooldownMap", bounded_cooldowns)
+    measure("dict-of-lists history (before)", legacy_history)
+    measure("RecentEvents", bounded_history)
+
+
+if __name__ == "__main__":
+    main()
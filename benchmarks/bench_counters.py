@@ -0,0 +1,82 @@
+"""Counting leaderboard: dict of str -> int vs CounterTable.
+
+Simulates a guild with ~200k distinct contributors and measures memory
+held, the cost of a leaderboard read, and a JSON round trip through the
+packed format.
+
+Run from the repository root:
+    python benchmarks/bench_counters.py
+"""
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.counters import CounterTable, DecayingCounter
+
+CONTRIBUTORS = 300_000
+COUNTS = 2_000_000
+
+
+def build(factory, add, counts):
+    tracemalloc.start()
+    table = factory()
+    for user_id in counts:
+        add(table, user_id)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return table, current
+
+
+def legacy_add(board, user_id):
+    key = str(user_id)
+    board[key] = board.get(key, 0) + 1
+
+
+def legacy_top(board):
+    return sorted(board.items(), key=lambda x: x[1], reverse=True)[:10]
+
+
+def main():
+    random.seed(7)
+    base = 1_000_000_000_000_000_000
+    users = [base + i for i in range(CONTRIBUTORS)]
+    # A few regulars do most of the counting
+    counts = random.choices(users, weights=[1 / (i + 1) for i in range(CONTRIBUTORS)], k=COUNTS)
+
+    legacy, legacy_mem = build(dict, legacy_add, counts)
+    table, table_mem = build(CounterTable, lambda t, u: t.add(u), counts)
+    print(f"contributors: {len(legacy):,}  counts: {COUNTS:,}")
+    print(f"memory  dict: {legacy_mem / 2**20:7.1f} MiB   CounterTable: {table_mem / 2**20:7.1f} MiB")
+
+    old = [(int(u), c) for u, c in legacy_top(legacy)]
+    assert [c for _, c in old] == [c for _, c in table.top(10)]
+
+    start = time.perf_counter()
+    for _ in range(20):
+        legacy_top(legacy)
+    old_time = (time.perf_counter() - start) / 20
+    start = time.perf_counter()
+    for _ in range(20):
+        table.top(10)
+    new_time = (time.perf_counter() - start) / 20
+    print(f"leaderboard  sorted(): {old_time * 1000:8.2f} ms   top(10): {new_time * 1000:8.4f} ms")
+
+    payload = json.dumps(table.to_json())
+    restored = CounterTable.from_json(json.loads(payload))
+    assert restored.top(10) == table.top(10) and restored.total() == COUNTS
+    print(f"json  dict: {len(json.dumps(legacy)) / 2**20:6.1f} MiB   packed: {len(payload) / 2**20:6.1f} MiB")
+
+    strikes = DecayingCounter(decay_seconds=3600)
+    assert strikes.add(1, now=0) == 1 and strikes.add(1, now=10) == 2
+    assert strikes.get(1, now=3610 + 10) == 1 and strikes.get(1, now=7200 + 10) == 0
+    assert strikes.add(1, now=7200 + 10) == 1
+    print("decay: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the old level-curve loops with the precomputed LevelCurve table.
+
+Run from the repository root:
+    python benchmarks/bench_level_curve.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.level_curve import LevelCurve
+
+
+def legacy_calculate_level(xp):
+    """The original Levels.calculate_level loop"""
+    if xp < 0:
+        return 0
+    level = 0
+    xp_used = 0
+    while True:
+        xp_needed_for_next = int(150 * (level + 1) ** 1.5)
+        if xp_used + xp_needed_for_next > xp:
+            break
+        xp_used += xp_needed_for_next
+        level += 1
+    return level
+
+
+def legacy_xp_for_level(target_level):
+    """The original Levels.xp_for_level loop"""
+    if target_level <= 0:
+        return 0
+    total_xp = 0
+    for level in range(1, target_level + 1):
+        total_xp += int(150 * level ** 1.5)
+    return total_xp
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed * 1000:10.2f} ms")
+    return result, elapsed
+
+
+def main():
+    random.seed(1)
+    curve = LevelCurve(max_level=1000)
+
+    # Exactness over every boundary and its neighbours
+    for level in range(0, 1200):
+        assert curve.total_xp(level) == legacy_xp_for_level(level), level
+        boundary = legacy_xp_for_level(level)
+        for xp in (boundary - 1, boundary, boundary + 1):
+            assert curve.level_for_xp(xp) == legacy_calculate_level(xp), xp
+    print("exactness: OK (levels 0-1199, boundaries +/- 1)")
+
+    # Users with very high XP (levels ~200-800)
+    samples = [random.randint(5_000_000, 2_000_000_000) for _ in range(5_000)]
+
+    old, old_time = timed("legacy calculate_level x5000", lambda: [legacy_calculate_level(x) for x in samples])
+    new, new_time = timed("LevelCurve.level_for_xp x5000", lambda: [curve.level_for_xp(x) for x in samples])
+    batch, batch_time = timed("LevelCurve.levels_for_xp (batch)", curve.levels_for_xp, samples)
+    assert old == new == batch
+
+    levels = [random.randint(100, 800) for _ in range(5_000)]
+    _, old_total = timed("legacy xp_for_level x5000", lambda: [legacy_xp_for_level(l) for l in levels])
+    _, new_total = timed("LevelCurve.total_xp x5000", lambda: [curve.total_xp(l) for l in levels])
+
+    print()
+    print(f"calculate_level speedup: {old_time / new_time:8.1f}x (batch {old_time / batch_time:.1f}x)")
+    print(f"xp_for_level speedup:    {old_total / new_total:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Role-target selection on a 50k-member guild: member scans vs GuildMemberIndex.
+
+Times the selections the admin commands make (/roleall targets, human and
+bot counts, a role's member count) by walking guild.members the way the
+cogs used to, and with the bitset index. Also times the one-off index
+build and the per-event updates that keep it current. The fake members
+keep ``roles`` as a ready list; discord.py builds and sorts that list on
+every access, so real scans cost several times more than shown here.
+
+Run from the repository root:
+    python benchmarks/bench_member_index.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.member_index import GuildMemberIndex
+
+GUILD_ID = 1
+MEMBERS = 50_000
+ROLES = 60
+BOT_SHARE = 0.01
+REPEAT = 5
+
+
+class Role:
+    __slots__ = ("id",)
+
+    def __init__(self, role_id):
+        self.id = role_id
+
+    def __eq__(self, other):
+        return self.id == other.id
+
+    def __hash__(self):
+        return self.id
+
+
+class Member:
+    __slots__ = ("id", "bot", "roles")
+
+    def __init__(self, member_id, bot, roles):
+        self.id = member_id
+        self.bot = bot
+        self.roles = roles
+
+
+class Guild:
+    def __init__(self, members):
+        self.id = GUILD_ID
+        self.members = members
+        self.chunked = True
+
+
+def build_guild():
+    rng = random.Random(5)
+    everyone = Role(GUILD_ID)
+    roles = [Role(100 + i) for i in range(ROLES)]
+    # A few roles almost everyone has (verified, level roles), the rest rarer
+    weights = [0.9, 0.6, 0.3] + [0.05] * (ROLES - 3)
+    members = [
+        Member(10_000 + i, rng.random() < BOT_SHARE,
+               [everyone] + [role for role, w in zip(roles, weights) if rng.random() < w])
+        for i in range(MEMBERS)
+    ]
+    return Guild(members), roles
+
+
+def timed(run):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def compare(label, scan, indexed):
+    expected, scan_time = timed(scan)
+    result, index_time = timed(indexed)
+    assert expected == result, label
+    print(f"{label:<34} scan {scan_time * 1000:8.2f} ms   index {index_time * 1000:8.3f} ms   "
+          f"x{scan_time / index_time:,.0f}")
+
+
+def main():
+    guild, roles = build_guild()
+    target = roles[1]
+
+    start = time.perf_counter()
+    index = GuildMemberIndex.build(guild)
+    print(f"{MEMBERS:,} members, {ROLES} roles: index built in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    compare(
+        "humans without role (roleall add)",
+        lambda: sorted(m.id for m in guild.members if not m.bot and target not in m.roles),
+        lambda: sorted(index.ids(index.humans & ~index.role(target.id))),
+    )
+    compare(
+        "humans with role (roleall remove)",
+        lambda: sorted(m.id for m in guild.members if not m.bot and target in m.roles),
+        lambda: sorted(index.ids(index.humans & index.role(target.id))),
+    )
+    compare(
+        "human count",
+        lambda: len([m for m in guild.members if not m.bot]),
+        lambda: index.human_count,
+    )
+    compare(
+        "role member count",
+        lambda: len([m for m in guild.members if target in m.roles]),
+        lambda: index.role_count(target.id),
+    )
+
+    # Keeping the index current: joins, leaves and role changes
+    rng = random.Random(9)
+    events = 2_000
+    start = time.perf_counter()
+    for i in range(events):
+        member = rng.choice(guild.members)
+        before = {role.id for role in member.roles}
+        after = before ^ {rng.choice(roles).id}
+        index.set_roles(member.id, before, after)
+        member.roles = [Role(role_id) for role_id in after | {GUILD_ID}]
+    role_update_us = (time.perf_counter() - start) / events * 1e6
+    start = time.perf_counter()
+    for i in range(events):
+        member = guild.members.pop(rng.randrange(len(guild.members)))
+        index.remove(member.id)
+        guild.members.append(member)
+        index.add(member)
+    churn_us = (time.perf_counter() - start) / events * 2 * 1e6
+    print(f"\nrole update {role_update_us:.1f} µs/event, join/leave {churn_us:.1f} µs/event")
+
+    rebuilt = GuildMemberIndex.build(guild)
+    for role in roles:
+        assert sorted(index.ids(index.role(role.id))) == sorted(rebuilt.ids(rebuilt.role(role.id)))
+    assert index.human_count == rebuilt.human_count and index.bot_count == rebuilt.bot_count
+    print("incremental index matches a rebuild: OK")
+
+
+if __name__ == "__main__":
+    main()
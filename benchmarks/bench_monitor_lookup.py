@@ -0,0 +1,136 @@
+"""Per-message cost of the MessageMonitor "is this user monitored?" check.
+
+Every guild message goes through the check and almost none of them come
+from a monitored user. Compares the nested dict walk the listener used to
+do with MonitorIndex, for the common (not monitored) path and for
+monitored users in and out of their channel.
+
+Run from the repository root:
+    python benchmarks/bench_monitor_lookup.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.monitor_index import MonitorIndex
+
+GUILDS = 5
+MONITORED_PER_GUILD = 20
+MESSAGES = 200_000
+REPEAT = 5
+
+
+class Author:
+    __slots__ = ("id", "bot")
+
+    def __init__(self, user_id):
+        self.id = user_id
+        self.bot = False
+
+
+class Snowflake:
+    __slots__ = ("id",)
+
+    def __init__(self, object_id):
+        self.id = object_id
+
+
+class Message:
+    __slots__ = ("guild", "channel", "author")
+
+    def __init__(self, guild_id, channel_id, user_id):
+        self.guild = Snowflake(guild_id)
+        self.channel = Snowflake(channel_id)
+        self.author = Author(user_id)
+
+
+def build_monitored():
+    rng = random.Random(7)
+    monitored = {}
+    for g in range(GUILDS):
+        guild_id = 1_000 + g
+        monitored[guild_id] = {
+            10_000_000 + rng.randrange(1_000_000): 'all' if rng.random() < 0.5 else 500 + rng.randrange(50)
+            for _ in range(MONITORED_PER_GUILD)
+        }
+    return monitored
+
+
+def legacy_check(monitored_users, message):
+    """EmptyMessageCog.on_message before"""
+    if message.author.bot:
+        return False
+    guild_id = message.guild.id if message.guild else None
+    if not guild_id or guild_id not in monitored_users:
+        return False
+    user_id = message.author.id
+    if user_id not in monitored_users[guild_id]:
+        return False
+    monitor_data = monitored_users[guild_id][user_id]
+    if monitor_data != 'all' and monitor_data != message.channel.id:
+        return False
+    return True
+
+
+def indexed_check(index, message):
+    """MessageDispatcher guild check + EmptyMessageCog.handle_message now"""
+    if message.author.id not in index.users:
+        return False
+    guild = message.guild
+    if guild is None or not index.matches(guild.id, message.author.id, message.channel.id):
+        return False
+    if message.author.bot:
+        return False
+    return True
+
+
+def check_semantics(monitored, index):
+    rng = random.Random(11)
+    samples = []
+    for guild_id, users in monitored.items():
+        for user_id in users:
+            for channel_id in range(500, 550):
+                samples.append(Message(guild_id, channel_id, user_id))
+    samples += [Message(rng.choice(list(monitored)), 500 + rng.randrange(50), rng.randrange(10**9))
+                for _ in range(10_000)]
+    for message in samples:
+        assert legacy_check(monitored, message) == indexed_check(index, message)
+    assert len(index) == GUILDS * MONITORED_PER_GUILD
+    print("semantics: OK")
+
+
+def bench(label, check, state, messages):
+    def run():
+        for message in messages:
+            check(state, message)
+    best = min(timeit.repeat(run, number=1, repeat=REPEAT))
+    print(f"{label:<50} {best / len(messages) * 1e9:7.1f} ns/message")
+
+
+def main():
+    monitored = build_monitored()
+    index = MonitorIndex(monitored)
+    check_semantics(monitored, index)
+
+    rng = random.Random(3)
+    guild_ids = list(monitored)
+    plain = [Message(rng.choice(guild_ids), 500 + rng.randrange(50), rng.randrange(10**9))
+             for _ in range(MESSAGES)]
+    targets = [(g, u, scope) for g, users in monitored.items() for u, scope in users.items()]
+    hits = []
+    for _ in range(MESSAGES):
+        g, u, scope = rng.choice(targets)
+        hits.append(Message(g, 500 + rng.randrange(50) if scope == 'all' else scope, u))
+    misses = [Message(g, 600, u) for g, u, scope in targets if scope != 'all'] * (MESSAGES // 50)
+
+    print(f"{GUILDS} guilds, {MONITORED_PER_GUILD} monitored users each, {MESSAGES:,} messages\n")
+    for name, messages in (("not monitored", plain), ("monitored, other channel", misses), ("monitored", hits)):
+        bench(f"nested dicts (before), {name}", legacy_check, monitored, messages)
+        bench(f"MonitorIndex, {name}", indexed_check, index, messages)
+
+
+if __name__ == "__main__":
+    main()
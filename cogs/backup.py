@@ -1,11 +1,18 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+import io
 import json
 import os
+import time
 from datetime import datetime
 import asyncio
 from typing import Dict, List, Optional, Union
 
+from utils.guild_diff import GuildDiff, restorable_role
+from utils.ratelimit import RouteLimiter
+from utils.restore_plan import ProgressMessage, RestorePlan
+from utils.snapshots import SECTIONS, SnapshotStore, layout_order
+
 class ServerBackup(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -13,12 +20,101 @@ class ServerBackup(commands.Cog):
         # Create backup directory if it doesn't exist
         if not os.path.exists(self.backup_dir):
             os.makedirs(self.backup_dir)
+        self.snapshots = SnapshotStore(self.backup_dir)
+        
+        # Restore/wipe pacing: discord.py waits on the bucket headers, these keep bursts polite
+        self.plan_concurrency = 5
+        self.plan_limiter = RouteLimiter(10, 2)
+        
+        # Scheduled backups: {guild_id: {"interval_hours", "keep", "last_run"}}
+        self.storage = bot.storage
+        self.schedule_file = "backup_schedule.json"
+        self.schedule = self.storage.load(self.schedule_file, dict)
+        self.scheduled_backup_task.start()
+    
+    def cog_unload(self):
+        self.scheduled_backup_task.cancel()
     
     @commands.Cog.listener()
     async def on_ready(self):
         """Bot ready event"""
         print("🎭 Delirium Den Server Backup cog loaded successfully")
     
+    @tasks.loop(minutes=5)
+    async def scheduled_backup_task(self):
+        """Take snapshots for guilds whose backup interval has elapsed"""
+        now = time.time()
+        for guild_id, config in list(self.schedule.items()):
+            if now - config.get("last_run", 0) < config["interval_hours"] * 3600:
+                continue
+            guild = self.bot.get_guild(int(guild_id))
+            if guild is None:
+                continue
+            try:
+                _, snapshot_id, stats = await self.take_snapshot(guild, "Scheduled backup")
+                removed = await asyncio.to_thread(self.snapshots.prune, guild.id, config["keep"])
+                print(
+                    f"Scheduled backup {snapshot_id} for {guild.name}: "
+                    f"{stats['objects_written']} new objects, {stats['bytes_written']} bytes, pruned {removed}"
+                )
+            except Exception as e:
+                print(f"Scheduled backup failed for {guild_id}: {e}")
+            config["last_run"] = now
+            self.storage.mark_dirty(self.schedule_file)
+    
+    @scheduled_backup_task.before_loop
+    async def before_scheduled_backup_task(self):
+        await self.bot.wait_until_ready()
+    
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def backup_schedule(self, ctx, interval_hours: str = None, keep: int = 48):
+        """Back up this server in the background every N hours (or 'off')"""
+        guild_key = str(ctx.guild.id)
+        
+        if interval_hours is None:
+            config = self.schedule.get(guild_key)
+            status_embed = discord.Embed(
+                title="🕒 Backup Schedule",
+                description=(
+                    f"Backing up every **{config['interval_hours']}h**, keeping the last **{config['keep']}** snapshots."
+                    if config else "Scheduled backups are off. Use `!backup_schedule <hours> [keep]` to enable them."
+                ),
+                color=discord.Color.blue(),
+                timestamp=datetime.utcnow()
+            )
+            status_embed.set_footer(
+                text="Delirium Den • Backup System",
+                icon_url="https://i.imgur.com/RzksmKL.png"
+            )
+            return await ctx.send(embed=status_embed)
+        
+        if interval_hours.lower() == "off":
+            self.schedule.pop(guild_key, None)
+            description = "Scheduled backups have been turned off."
+        else:
+            try:
+                hours = float(interval_hours)
+            except ValueError:
+                return await ctx.send("❌ Interval must be a number of hours or `off`.")
+            if hours <= 0 or keep < 1:
+                return await ctx.send("❌ Interval and snapshots to keep must be positive.")
+            self.schedule[guild_key] = {"interval_hours": hours, "keep": keep, "last_run": 0}
+            description = f"Backing up every **{hours:g}h**, keeping the last **{keep}** snapshots. Only changes are stored."
+        self.storage.mark_dirty(self.schedule_file)
+        
+        success_embed = discord.Embed(
+            title="✅ Backup Schedule Updated",
+            description=description,
+            color=discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+        success_embed.set_footer(
+            text="Delirium Den • Backup System",
+            icon_url="https://i.imgur.com/RzksmKL.png"
+        )
+        await ctx.send(embed=success_embed)
+    
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def backup(self, ctx):
@@ -50,92 +146,9 @@ class ServerBackup(commands.Cog):
         await ctx.send(embed=start_embed)
         
         guild = ctx.guild
-        backup_data = {
-            "name": guild.name,
-            "icon_url": str(guild.icon.url) if guild.icon else None,
-            "created_at": str(guild.created_at),
-            "categories": [],
-            "channels": [],
-            "roles": [],
-            "backup_date": str(datetime.utcnow()),
-            "backed_up_by": f"{ctx.author.name}#{ctx.author.discriminator}",
-            "server_id": guild.id,
-            "member_count": guild.member_count
-        }
-        
-        # Backup roles (reversed to maintain hierarchy)
-        progress_embed = discord.Embed(
-            title="⚙️ Backup in Progress",
-            description="Backing up roles...",
-            color=discord.Color.orange(),
-            timestamp=datetime.utcnow()
+        backup_data, snapshot_id, stats = await self.take_snapshot(
+            guild, f"{ctx.author.name}#{ctx.author.discriminator}"
         )
-        progress_embed.set_footer(
-            text="Delirium Den • Backup Progress",
-            icon_url="https://i.imgur.com/RzksmKL.png"
-        )
-        progress_msg = await ctx.send(embed=progress_embed)
-        
-        roles = sorted(guild.roles, key=lambda r: r.position, reverse=True)
-        for role in roles:
-            # Skip @everyone role as it can't be recreated
-            if role.name == "@everyone":
-                continue
-                
-            role_data = {
-                "name": role.name,
-                "color": role.color.value,
-                "permissions": role.permissions.value,
-                "hoist": role.hoist,
-                "mentionable": role.mentionable,
-                "position": role.position,
-                "managed": role.managed
-            }
-            backup_data["roles"].append(role_data)
-        
-        # Backup categories
-        progress_embed.description = "Backing up categories..."
-        await progress_msg.edit(embed=progress_embed)
-        
-        for category in guild.categories:
-            category_data = {
-                "name": category.name,
-                "position": category.position,
-                "overwrites": self._get_overwrites(category),
-                "id": category.id  # Store ID for channel references
-            }
-            backup_data["categories"].append(category_data)
-        
-        # Backup channels
-        progress_embed.description = "Backing up channels..."
-        await progress_msg.edit(embed=progress_embed)
-        
-        for channel in guild.channels:
-            # Skip categories as they're already backed up
-            if isinstance(channel, discord.CategoryChannel):
-                continue
-                
-            channel_data = {
-                "name": channel.name,
-                "type": str(channel.type),
-                "position": channel.position,
-                "category_id": channel.category_id,
-                "overwrites": self._get_overwrites(channel),
-                "slowmode_delay": getattr(channel, "slowmode_delay", 0),
-                "nsfw": getattr(channel, "nsfw", False),
-                "topic": getattr(channel, "topic", None)
-            }
-            backup_data["channels"].append(channel_data)
-        
-        # Save to file
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        backup_filename = f"{self.backup_dir}/{guild.name}_{timestamp}.json"
-        
-        # Clean filename for filesystem compatibility
-        safe_filename = "".join(c for c in backup_filename if c.isalnum() or c in (' ', '-', '_', '.', '/')).rstrip()
-        
-        with open(safe_filename, "w", encoding="utf-8") as f:
-            json.dump(backup_data, f, indent=4)
         
         # Create completion embed
         complete_embed = discord.Embed(
@@ -152,8 +165,8 @@ class ServerBackup(commands.Cog):
         )
         
         complete_embed.add_field(
-            name="📁 File Info",
-            value=f"**Filename:** `{os.path.basename(safe_filename)}`\n**Size:** {os.path.getsize(safe_filename)} bytes",
+            name="📁 Snapshot Info",
+            value=f"**Snapshot:** `{snapshot_id}`\n**Changed Objects:** {stats['objects_written']} of {stats['items']}\n**Written:** {stats['bytes_written']} bytes",
             inline=True
         )
         
@@ -168,7 +181,7 @@ class ServerBackup(commands.Cog):
             icon_url="https://i.imgur.com/RzksmKL.png"
         )
         
-        await progress_msg.edit(embed=complete_embed)
+        await ctx.send(embed=complete_embed)
         
         # Send backup file to user
         try:
@@ -188,15 +201,89 @@ class ServerBackup(commands.Cog):
                 icon_url="https://i.imgur.com/RzksmKL.png"
             )
             
-            with open(safe_filename, "rb") as f:
-                await ctx.author.send(embed=dm_embed, file=discord.File(f, filename=f"{guild.name}_backup.json"))
+            payload = io.BytesIO(json.dumps(backup_data, indent=4).encode("utf-8"))
+            await ctx.author.send(embed=dm_embed, file=discord.File(payload, filename=f"{guild.name}_backup.json"))
         except discord.Forbidden:
             await ctx.send("⚠️ Could not send backup file via DM. Please check your privacy settings.")
     
+    def capture_guild(self, guild, backed_up_by):
+        """Read the server structure from the gateway cache (no API calls)"""
+        backup_data = {
+            "name": guild.name,
+            "icon_url": str(guild.icon.url) if guild.icon else None,
+            "created_at": str(guild.created_at),
+            "categories": [],
+            "channels": [],
+            "roles": [],
+            "backup_date": str(datetime.utcnow()),
+            "backed_up_by": backed_up_by,
+            "server_id": guild.id,
+            "member_count": guild.member_count
+        }
+        
+        # Positions aren't stored: each list is in layout order, so a moved
+        # channel doesn't change the stored object of every channel around it
+        
+        # Backup roles (reversed to maintain hierarchy)
+        roles = sorted(guild.roles, key=lambda r: r.position, reverse=True)
+        for role in roles:
+            # Skip @everyone role as it can't be recreated
+            if role.name == "@everyone":
+                continue
+                
+            role_data = {
+                "name": role.name,
+                "color": role.color.value,
+                "permissions": role.permissions.value,
+                "hoist": role.hoist,
+                "mentionable": role.mentionable,
+                "managed": role.managed,
+                "id": role.id
+            }
+            backup_data["roles"].append(role_data)
+        
+        # Backup categories (top down)
+        for category in sorted(guild.categories, key=lambda c: (c.position, c.id)):
+            category_data = {
+                "name": category.name,
+                "overwrites": self._get_overwrites(category),
+                "id": category.id  # Store ID for channel references
+            }
+            backup_data["categories"].append(category_data)
+        
+        # Backup channels (in a stable order so unchanged guilds hash the same)
+        for channel in sorted(guild.channels, key=lambda c: (c.position, c.id)):
+            # Skip categories as they're already backed up
+            if isinstance(channel, discord.CategoryChannel):
+                continue
+                
+            channel_data = {
+                "name": channel.name,
+                "type": str(channel.type),
+                "category_id": channel.category_id,
+                "overwrites": self._get_overwrites(channel),
+                "slowmode_delay": getattr(channel, "slowmode_delay", 0),
+                "nsfw": getattr(channel, "nsfw", False),
+                "topic": getattr(channel, "topic", None),
+                "id": channel.id
+            }
+            backup_data["channels"].append(channel_data)
+        
+        return backup_data
+    
+    async def take_snapshot(self, guild, backed_up_by):
+        """Capture a guild and store only what changed since its last snapshot"""
+        backup_data = self.capture_guild(guild, backed_up_by)
+        meta = {k: v for k, v in backup_data.items() if k not in SECTIONS}
+        sections = {section: backup_data[section] for section in SECTIONS}
+        # Hashing, compression and file writes run off the event loop
+        snapshot_id, stats = await asyncio.to_thread(self.snapshots.save, guild.id, meta, sections)
+        return backup_data, snapshot_id, stats
+    
     @commands.command()
     @commands.has_permissions(administrator=True)
-    async def restore(self, ctx, backup_file: str = None):
-        """Restore a server from backup by completely wiping it first"""
+    async def restore(self, ctx, backup_file: str = None, mode: str = "wipe"):
+        """Restore a server from backup by wiping it first, or with `diff` by applying only the changes"""
         # Check if bot has administrator permissions
         if not ctx.guild.me.guild_permissions.administrator:
             error_embed = discord.Embed(
@@ -211,9 +298,10 @@ class ServerBackup(commands.Cog):
             )
             return await ctx.send(embed=error_embed)
         
-        # If no file specified, list available backups
+        # If no file specified, list available backups (newest snapshots first, then legacy files)
         if not backup_file:
-            files = [f for f in os.listdir(self.backup_dir) if f.endswith('.json')]
+            files = list(reversed(self.snapshots.list(ctx.guild.id)))
+            files += [f for f in os.listdir(self.backup_dir) if f.endswith('.json')]
             if not files:
                 no_backups_embed = discord.Embed(
                     title="📁 No Backups Found",
@@ -246,7 +334,7 @@ class ServerBackup(commands.Cog):
             
             list_embed.add_field(
                 name="Usage",
-                value="Use `!restore filename.json` to restore a backup.",
+                value="Use `!restore <snapshot>`, `!restore latest` or `!restore filename.json` to restore a backup. Add `diff` to apply only the changes.",
                 inline=False
             )
             
@@ -257,9 +345,13 @@ class ServerBackup(commands.Cog):
             
             return await ctx.send(embed=list_embed)
         
-        # Check if file exists
+        # Resolve a snapshot id ("latest" for the newest) or a legacy backup file
+        snapshot_ids = self.snapshots.list(ctx.guild.id)
+        if backup_file == "latest" and snapshot_ids:
+            backup_file = snapshot_ids[-1]
         backup_path = f"{self.backup_dir}/{backup_file}"
-        if not os.path.isfile(backup_path):
+        is_snapshot = backup_file in snapshot_ids
+        if not is_snapshot and not os.path.isfile(backup_path):
             error_embed = discord.Embed(
                 title="❌ File Not Found",
                 description=f"Backup file `{backup_file}` not found.",
@@ -274,8 +366,11 @@ class ServerBackup(commands.Cog):
         
         # Load backup data
         try:
-            with open(backup_path, "r", encoding="utf-8") as f:
-                backup_data = json.load(f)
+            if is_snapshot:
+                backup_data = await asyncio.to_thread(self.snapshots.load, ctx.guild.id, backup_file)
+            else:
+                with open(backup_path, "r", encoding="utf-8") as f:
+                    backup_data = layout_order(json.load(f))
         except Exception as e:
             error_embed = discord.Embed(
                 title="❌ Invalid Backup File",
@@ -289,6 +384,9 @@ class ServerBackup(commands.Cog):
             )
             return await ctx.send(embed=error_embed)
         
+        if mode.lower() == "diff":
+            return await self._restore_diff(ctx, backup_file, backup_data)
+        
         # EXTREME WARNING for destructive operation
         warning_embed = discord.Embed(
             title="⚠️ DANGER: DESTRUCTIVE OPERATION ⚠️",
@@ -389,112 +487,13 @@ class ServerBackup(commands.Cog):
         # Call the wipe function
         await self._wipe_server(ctx.guild, temp_channel, log_status)
         
-        # STAGE 3: Recreate all roles
-        await log_status("🔨 **PHASE 3: CREATING ROLES**", discord.Color.green())
-        role_map = {}  # Maps role names to new role IDs
-        
-        # Map @everyone role
-        role_map["@everyone"] = ctx.guild.default_role.id
-        
-        # Create roles in reverse order to maintain hierarchy
-        for role_data in backup_data["roles"]:
-            try:
-                # Skip managed roles (bot roles, integration roles)
-                if role_data.get("managed", False):
-                    continue
-                    
-                # Skip problematic role names
-                if role_data["name"].startswith(("@", "Dyno", "MEE6", "Ticket Tool")) or role_data["name"].lower().endswith(" bot"):
-                    continue
-                    
-                # Create role
-                new_role = await ctx.guild.create_role(
-                    name=role_data["name"],
-                    permissions=discord.Permissions(role_data["permissions"]),
-                    color=discord.Color(role_data["color"]),
-                    hoist=role_data["hoist"],
-                    mentionable=role_data["mentionable"]
-                )
-                
-                # Store role mapping
-                role_map[role_data["name"]] = new_role.id
-                await log_status(f"✅ Created role: {new_role.name}")
-                await asyncio.sleep(0.5)  # Rate limit prevention
-            except Exception as e:
-                await log_status(f"⚠️ Error creating role {role_data['name']}: {str(e)}", discord.Color.orange())
-        
-        # STAGE 4: Recreate categories
-        await log_status("🔨 **PHASE 4: CREATING CATEGORIES**", discord.Color.green())
-        category_map = {}  # Maps old category IDs to new ones
-        
-        for category_data in backup_data["categories"]:
-            try:
-                # Create permission overwrites
-                overwrites = self._restore_overwrites(ctx.guild, category_data["overwrites"], role_map)
-                
-                # Create category
-                new_category = await ctx.guild.create_category(
-                    name=category_data["name"],
-                    overwrites=overwrites
-                )
-                
-                # Store category mapping
-                category_map[category_data["id"]] = new_category.id
-                await log_status(f"✅ Created category: {new_category.name}")
-                await asyncio.sleep(0.5)  # Rate limit prevention
-            except Exception as e:
-                await log_status(f"⚠️ Error creating category {category_data['name']}: {str(e)}", discord.Color.orange())
-        
-        # STAGE 5: Recreate channels
-        await log_status("🔨 **PHASE 5: CREATING CHANNELS**", discord.Color.green())
-        
-        # Sort channels by position for proper ordering
-        sorted_channels = sorted(backup_data["channels"], key=lambda c: c["position"])
-        
-        for channel_data in sorted_channels:
-            try:
-                # Get category if it exists
-                category = None
-                if channel_data["category_id"] and channel_data["category_id"] in category_map:
-                    category = ctx.guild.get_channel(category_map[channel_data["category_id"]])
-                
-                # Create permission overwrites
-                overwrites = self._restore_overwrites(ctx.guild, channel_data["overwrites"], role_map)
-                
-                # Create channel based on type
-                if channel_data["type"] == "text":
-                    new_channel = await ctx.guild.create_text_channel(
-                        name=channel_data["name"],
-                        overwrites=overwrites,
-                        category=category,
-                        topic=channel_data["topic"],
-                        slowmode_delay=channel_data["slowmode_delay"],
-                        nsfw=channel_data["nsfw"]
-                    )
-                    await log_status(f"✅ Created text channel: {new_channel.name}")
-                    
-                elif channel_data["type"] == "voice":
-                    new_channel = await ctx.guild.create_voice_channel(
-                        name=channel_data["name"],
-                        overwrites=overwrites,
-                        category=category
-                    )
-                    await log_status(f"✅ Created voice channel: {new_channel.name}")
-                    
-                elif channel_data["type"] == "forum":
-                    try:
-                        new_channel = await ctx.guild.create_forum(
-                            name=channel_data["name"],
-                            overwrites=overwrites,
-                            category=category
-                        )
-                        await log_status(f"✅ Created forum channel: {new_channel.name}")
-                    except Exception as e:
-                        await log_status(f"⚠️ Error creating forum channel {channel_data['name']}: {str(e)}", discord.Color.orange())
-                
-                await asyncio.sleep(0.5)  # Rate limit prevention
-            except Exception as e:
-                await log_status(f"⚠️ Error creating channel {channel_data['name']}: {str(e)}", discord.Color.orange())
+        # STAGES 3-5: Recreate roles, categories and channels as one dependency graph
+        await log_status("🔨 **PHASE 3: REBUILDING ROLES, CATEGORIES AND CHANNELS**", discord.Color.green())
+        plan = self._build_restore_plan(ctx.guild, backup_data)
+        progress = await self._start_progress(temp_channel, "🔨 Restoring Server")
+        progress.add_phases(plan.phases())
+        await plan.execute(self.plan_limiter, self.plan_concurrency, progress)
+        await progress.stop()
         
         # Restoration complete
         await log_status("✅ **SERVER RESTORATION COMPLETE!**", discord.Color.green())
@@ -632,44 +631,444 @@ class ServerBackup(commands.Cog):
     
     async def _wipe_server(self, guild, temp_channel, log_status):
         """Wipe the server (delete all channels, categories, and roles)"""
-        # STAGE 1: Delete all channels except temp channel
-        await log_status("🗑️ **PHASE 1: DELETING CHANNELS**", discord.Color.orange())
-        deleted_count = 0
+        await log_status("🗑️ **PHASES 1-2: DELETING CHANNELS AND ROLES**", discord.Color.orange())
+        plan = RestorePlan()
         
+        # STAGE 1: Delete all channels except temp channel
         for channel in guild.channels:
             if channel != temp_channel:
-                try:
-                    await channel.delete(reason="Server wipe operation")
-                    deleted_count += 1
-                    if deleted_count % 5 == 0:  # Log progress every 5 channels
-                        await log_status(f"Deleted {deleted_count} channels so far...")
-                    await asyncio.sleep(0.5)  # Rate limit prevention
-                except Exception as e:
-                    await log_status(f"⚠️ Error deleting channel {channel.name}: {str(e)}", discord.Color.orange())
-        
-        await log_status(f"✅ Deleted {deleted_count} channels")
+                plan.add(
+                    ("delete-channel", channel.id),
+                    lambda results, channel=channel: channel.delete(reason="Server wipe operation"),
+                    route=("channels", guild.id),
+                    label=f"channel {channel.name}",
+                    phase="🗑️ Channels"
+                )
         
         # STAGE 2: Delete all roles except @everyone and bot role
-        await log_status("🗑️ **PHASE 2: DELETING ROLES**", discord.Color.orange())
-        deleted_roles = 0
-        
         bot_role = guild.me.top_role
         
-        for role in reversed(guild.roles):  # Reverse to delete from bottom up
+        for role in reversed(guild.roles):
             # Skip @everyone, bot roles, and managed roles
             if role == guild.default_role or role == bot_role or role.managed:
                 continue
-                
+            plan.add(
+                ("delete-role", role.id),
+                lambda results, role=role: role.delete(reason="Server wipe operation"),
+                route=("roles", guild.id),
+                label=f"role {role.name}",
+                phase="🗑️ Roles"
+            )
+        
+        progress = await self._start_progress(temp_channel, "🗑️ Wiping Server")
+        progress.add_phases(plan.phases())
+        await plan.execute(self.plan_limiter, self.plan_concurrency, progress)
+        await progress.stop()
+        
+        counts = {phase: progress.counts[phase][0] for phase in progress.totals}
+        await log_status(
+            f"✅ Deleted {counts.get('🗑️ Channels', 0)} channels and {counts.get('🗑️ Roles', 0)} roles"
+            + (f" ({progress.error_count} errors)" if progress.error_count else "")
+        )
+        
+        return True
+    
+    def _build_restore_plan(self, guild, backup_data):
+        """Roles -> categories -> channels, each step depending only on what it references"""
+        plan = RestorePlan()
+        role_map = {"@everyone": guild.default_role.id}  # Maps role names and backup role ids to new role IDs
+        roles_route = ("roles", guild.id)
+        channels_route = ("channels", guild.id)
+        
+        roles = list(filter(restorable_role, backup_data["roles"]))
+        role_keys, overwrite_deps = self._role_steps(roles)
+        
+        for role_key, role_data in zip(role_keys, roles):
+            async def create_role(results, role_data=role_data):
+                new_role = await guild.create_role(
+                    name=role_data["name"],
+                    permissions=discord.Permissions(role_data["permissions"]),
+                    color=discord.Color(role_data["color"]),
+                    hoist=role_data["hoist"],
+                    mentionable=role_data["mentionable"]
+                )
+                role_map[role_data["name"]] = new_role.id
+                if role_data.get("id") is not None:
+                    role_map[role_data["id"]] = new_role.id
+                return new_role
+            
+            plan.add(role_key, create_role, route=roles_route,
+                     label=f"role {role_data['name']}", phase="👑 Roles")
+        
+        # Roles were created concurrently, so put them in backup order once they all exist
+        if role_keys:
+            plan.add(("role-order",),
+                     lambda results: self._order_roles(guild, [results.get(key) for key in role_keys]),
+                     after=role_keys, route=roles_route, label="role order", phase="👑 Roles")
+        
+        for position, category_data in enumerate(backup_data["categories"]):
+            async def create_category(results, category_data=category_data, position=position):
+                overwrites = self._restore_overwrites(guild, category_data["overwrites"], role_map)
+                return await guild.create_category(
+                    name=category_data["name"],
+                    overwrites=overwrites,
+                    position=position
+                )
+            
+            plan.add(("category", category_data["id"]), create_category,
+                     after=overwrite_deps(category_data["overwrites"]), route=channels_route,
+                     label=f"category {category_data['name']}", phase="📁 Categories")
+        
+        # Channels are listed in order, so their index is their position
+        for index, channel_data in enumerate(backup_data["channels"]):
+            if channel_data["type"] not in ("text", "voice", "forum"):
+                continue
+            category_key = ("category", channel_data["category_id"])
+            # Like before, a missing role or category just leaves that part out
+            after = overwrite_deps(channel_data["overwrites"])
+            if channel_data["category_id"] and category_key in plan:
+                after.append(category_key)
+            
+            async def create_channel(results, channel_data=channel_data, category_key=category_key, position=index):
+                category = results.get(category_key)
+                overwrites = self._restore_overwrites(guild, channel_data["overwrites"], role_map)
+                if channel_data["type"] == "text":
+                    return await guild.create_text_channel(
+                        name=channel_data["name"],
+                        overwrites=overwrites,
+                        category=category,
+                        position=position,
+                        topic=channel_data["topic"],
+                        slowmode_delay=channel_data["slowmode_delay"],
+                        nsfw=channel_data["nsfw"]
+                    )
+                if channel_data["type"] == "voice":
+                    return await guild.create_voice_channel(
+                        name=channel_data["name"],
+                        overwrites=overwrites,
+                        category=category,
+                        position=position
+                    )
+                return await guild.create_forum(
+                    name=channel_data["name"],
+                    overwrites=overwrites,
+                    category=category,
+                    position=position
+                )
+            
+            plan.add(("channel", index), create_channel, after=after, route=channels_route,
+                     label=f"{channel_data['type']} channel {channel_data['name']}", phase="💬 Channels")
+        
+        return plan
+    
+    async def _restore_diff(self, ctx, backup_file, backup_data):
+        """Compare the backup with the live server and apply only what differs"""
+        guild = ctx.guild
+        live = self.capture_guild(guild, "")
+        diff = GuildDiff(backup_data, live, keep_channel_ids={ctx.channel.id})
+        
+        if diff.empty:
+            match_embed = discord.Embed(
+                title="✅ Nothing to Restore",
+                description=f"**{guild.name}** already matches backup `{backup_file}`.",
+                color=discord.Color.green(),
+                timestamp=datetime.utcnow()
+            )
+            match_embed.set_footer(
+                text="Delirium Den • Restore System",
+                icon_url="https://i.imgur.com/RzksmKL.png"
+            )
+            return await ctx.send(embed=match_embed)
+        
+        # Show the plan before touching anything
+        counts = diff.counts()
+        lines = diff.describe()
+        plan_embed = discord.Embed(
+            title="📋 Restore Plan (Diff Mode)",
+            description=(
+                f"Applying backup `{backup_file}` to **{guild.name}** needs "
+                f"**{counts['create']}** creates, **{counts['update']}** updates, "
+                f"**{counts['delete']}** deletes and **{counts['reorder']}** reorders. "
+                "Unchanged channels keep their message history."
+            ),
+            color=discord.Color.orange(),
+            timestamp=datetime.utcnow()
+        )
+        preview = "\n".join(lines[:20])
+        if len(lines) > 20:
+            preview += f"\n... and {len(lines) - 20} more (full plan attached)"
+        plan_embed.add_field(name="Changes", value=f"```diff\n{preview[:990]}\n```", inline=False)
+        plan_embed.add_field(
+            name="✅ Confirmation Required",
+            value="To apply these changes, type: `CONFIRM-APPLY-DIFF`\n*You have 60 seconds to respond.*",
+            inline=False
+        )
+        plan_embed.set_footer(
+            text="Delirium Den • Server Restore Plan",
+            icon_url="https://i.imgur.com/RzksmKL.png"
+        )
+        if len(lines) > 20:
+            plan_file = discord.File(io.BytesIO("\n".join(lines).encode("utf-8")), filename="restore_plan.diff")
+            await ctx.send(embed=plan_embed, file=plan_file)
+        else:
+            await ctx.send(embed=plan_embed)
+        
+        def check(message):
+            return message.author == ctx.author and message.channel == ctx.channel and message.content == "CONFIRM-APPLY-DIFF"
+        
+        try:
+            await self.bot.wait_for("message", timeout=60.0, check=check)
+        except asyncio.TimeoutError:
+            timeout_embed = discord.Embed(
+                title="⏰ Operation Cancelled",
+                description="Restoration cancelled due to timeout.",
+                color=discord.Color.orange(),
+                timestamp=datetime.utcnow()
+            )
+            timeout_embed.set_footer(
+                text="Delirium Den • Operation Cancelled",
+                icon_url="https://i.imgur.com/RzksmKL.png"
+            )
+            return await ctx.send(embed=timeout_embed)
+        
+        plan = self._build_diff_plan(guild, diff, live)
+        progress = await self._start_progress(ctx.channel, "🔧 Applying Restore Plan")
+        progress.add_phases(plan.phases())
+        await plan.execute(self.plan_limiter, self.plan_concurrency, progress)
+        if diff.channel_positions:
             try:
-                await role.delete(reason="Server wipe operation")
-                deleted_roles += 1
-                await asyncio.sleep(0.5)  # Rate limit prevention
+                await self.bot.http.bulk_channel_update(
+                    guild.id,
+                    [{"id": channel_id, "position": position} for channel_id, position in diff.channel_positions],
+                    reason="Server restore"
+                )
             except Exception as e:
-                await log_status(f"⚠️ Error deleting role {role.name}: {str(e)}", discord.Color.orange())
+                progress.failed("↕️ Order", f"channel positions: {e}")
+        await progress.stop()
+    
+    def _build_diff_plan(self, guild, diff, live):
+        """Turn a GuildDiff into a RestorePlan (deletes, then creates/updates in dependency order)"""
+        plan = RestorePlan()
+        role_map = {"@everyone": guild.default_role.id}
+        role_map.update({role["name"]: role["id"] for role in live["roles"]})
+        roles_route = ("roles", guild.id)
+        channels_route = ("channels", guild.id)
+        role_keys, overwrite_deps = self._role_steps(diff.role_creates)
         
-        await log_status(f"✅ Deleted {deleted_roles} roles")
+        def role_kwargs(fields):
+            kwargs = dict(fields)
+            if "permissions" in kwargs:
+                kwargs["permissions"] = discord.Permissions(kwargs["permissions"])
+            if "color" in kwargs:
+                kwargs["color"] = discord.Color(kwargs["color"])
+            return kwargs
         
-        return True
+        def resolve_category(results, category_id):
+            """Backup category id -> the category just created for it, or the live one it was paired with"""
+            if category_id is None:
+                return None
+            return results.get(("category", category_id)) or guild.get_channel(diff.category_ids.get(category_id))
+        
+        # Roles
+        for role_key, role_data in zip(role_keys, diff.role_creates):
+            async def create_role(results, role_data=role_data):
+                new_role = await guild.create_role(
+                    name=role_data["name"],
+                    reason="Server restore",
+                    **role_kwargs({f: role_data[f] for f in ("permissions", "color", "hoist", "mentionable")})
+                )
+                role_map[role_data["name"]] = new_role.id
+                if role_data.get("id") is not None:
+                    role_map[role_data["id"]] = new_role.id
+                return new_role
+            plan.add(role_key, create_role, route=roles_route,
+                     label=f"role {role_data['name']}", phase="👑 Roles")
+        for role_id, name, changes in diff.role_updates:
+            plan.add(("role-edit", role_id),
+                     lambda results, role_id=role_id, changes=changes: guild.get_role(role_id).edit(
+                         reason="Server restore", **role_kwargs(changes)),
+                     route=roles_route, label=f"role {name}", phase="👑 Roles")
+        for role_id, name in diff.role_deletes:
+            plan.add(("role-delete", role_id),
+                     lambda results, role_id=role_id: guild.get_role(role_id).delete(reason="Server restore"),
+                     route=roles_route, label=f"role {name}", phase="👑 Roles")
+        if diff.role_order:
+            created_keys = {id(role_data): key for key, role_data in zip(role_keys, diff.role_creates)}
+            
+            def ordered_roles(results):
+                return [
+                    guild.get_role(live_id) if live_id is not None else results.get(created_keys[id(role_data)])
+                    for role_data, live_id in diff.role_order
+                ]
+            
+            plan.add(("role-order",), lambda results: self._order_roles(guild, ordered_roles(results)),
+                     after=[key for key in plan.steps if key[0] in ("role", "role-edit", "role-delete")],
+                     route=roles_route, label="role order", phase="👑 Roles")
+        
+        # Channels that no longer belong go first, so names are free for the creates
+        for channel_id, name in diff.channel_deletes:
+            plan.add(("channel-delete", channel_id),
+                     lambda results, channel_id=channel_id: guild.get_channel(channel_id).delete(reason="Server restore"),
+                     route=channels_route, label=f"channel {name}", phase="💬 Channels")
+        
+        # Categories
+        for category_data, position in diff.category_creates:
+            async def create_category(results, category_data=category_data, position=position):
+                return await guild.create_category(
+                    name=category_data["name"],
+                    overwrites=self._restore_overwrites(guild, category_data["overwrites"], role_map),
+                    position=position
+                )
+            plan.add(("category", category_data["id"]), create_category,
+                     after=overwrite_deps(category_data["overwrites"]), route=channels_route,
+                     label=f"category {category_data['name']}", phase="📁 Categories")
+        for category_id, category_data, _ in diff.category_updates:
+            async def update_category(results, category_id=category_id, category_data=category_data):
+                return await guild.get_channel(category_id).edit(
+                    overwrites=self._restore_overwrites(guild, category_data["overwrites"], role_map),
+                    reason="Server restore"
+                )
+            plan.add(("category-edit", category_id), update_category,
+                     after=overwrite_deps(category_data["overwrites"]), route=channels_route,
+                     label=f"category {category_data['name']}", phase="📁 Categories")
+        
+        # Channels
+        for channel_data, _, position in diff.channel_creates:
+            async def create_channel(results, channel_data=channel_data, position=position):
+                category = resolve_category(results, channel_data["category_id"])
+                overwrites = self._restore_overwrites(guild, channel_data["overwrites"], role_map)
+                if channel_data["type"] == "text":
+                    return await guild.create_text_channel(
+                        name=channel_data["name"],
+                        overwrites=overwrites,
+                        category=category,
+                        position=position,
+                        topic=channel_data["topic"],
+                        slowmode_delay=channel_data["slowmode_delay"],
+                        nsfw=channel_data["nsfw"]
+                    )
+                if channel_data["type"] == "voice":
+                    return await guild.create_voice_channel(
+                        name=channel_data["name"],
+                        overwrites=overwrites,
+                        category=category,
+                        position=position
+                    )
+                return await guild.create_forum(
+                    name=channel_data["name"],
+                    overwrites=overwrites,
+                    category=category,
+                    position=position
+                )
+            plan.add(("channel-create", len(plan)), create_channel,
+                     after=overwrite_deps(channel_data["overwrites"]) + [("category", channel_data["category_id"])],
+                     route=channels_route,
+                     label=f"{channel_data['type']} channel {channel_data['name']}", phase="💬 Channels")
+        for channel_id, channel_data, _, fields in diff.channel_updates:
+            async def update_channel(results, channel_id=channel_id, channel_data=channel_data, fields=fields):
+                kwargs = {f: channel_data[f] for f in fields if f in ("topic", "nsfw", "slowmode_delay")}
+                if "overwrites" in fields:
+                    kwargs["overwrites"] = self._restore_overwrites(guild, channel_data["overwrites"], role_map)
+                if "category" in fields:
+                    kwargs["category"] = resolve_category(results, channel_data["category_id"])
+                return await guild.get_channel(channel_id).edit(reason="Server restore", **kwargs)
+            plan.add(("channel-edit", channel_id), update_channel,
+                     after=overwrite_deps(channel_data["overwrites"]) + [("category", channel_data["category_id"])],
+                     route=channels_route,
+                     label=f"channel {channel_data['name']}", phase="💬 Channels")
+        
+        # Emptied categories go last, once their channels have moved out
+        channel_steps = [key for key in plan.steps if key[0] in ("channel-create", "channel-edit", "channel-delete")]
+        for category_id, name in diff.category_deletes:
+            plan.add(("category-delete", category_id),
+                     lambda results, category_id=category_id: guild.get_channel(category_id).delete(reason="Server restore"),
+                     after=channel_steps, route=channels_route,
+                     label=f"category {name}", phase="📁 Categories")
+        
+        return plan
+    
+    def _role_steps(self, roles):
+        """Plan keys for creating roles, and overwrite_deps(overwrites) -> the role steps they wait for.
+        
+        Role names can repeat, so each role is keyed by its place in ``roles``.
+        Overwrites point at a role by its backup id; backups made before roles
+        stored their id fall back to every role step with that name.
+        """
+        keys = [("role", index) for index in range(len(roles))]
+        keys_by_id = {}
+        keys_by_name = {}
+        for key, role_data in zip(keys, roles):
+            if role_data.get("id") is not None:
+                keys_by_id[role_data["id"]] = key
+            keys_by_name.setdefault(role_data["name"], []).append(key)
+        
+        def overwrite_deps(overwrites_data):
+            deps = []
+            for overwrite in overwrites_data:
+                if overwrite["type"] != "role":
+                    continue
+                key = keys_by_id.get(overwrite.get("id"))
+                deps += [key] if key else keys_by_name.get(overwrite["name"], [])
+            return deps
+        
+        return keys, overwrite_deps
+    
+    async def _order_roles(self, guild, roles):
+        """Put roles (top first; None for any that failed) in that order with one bulk edit.
+        
+        Only the slots those roles already hold are reassigned, so managed
+        roles, roles at or above the bot's top role and any role not in the
+        list keep their place, and the edit never asks for a position the bot
+        can't set.
+        """
+        top_position = guild.me.top_role.position
+        # Re-read from the cache: roles returned by create_role keep their creation-time position
+        roles = [guild.get_role(role.id) for role in roles if role is not None]
+        movable = [role for role in roles if role is not None and not role.managed and role.position < top_position]
+        chosen = {role.id for role in movable}
+        # Discord orders roles by (position, id); index 0 is @everyone
+        ladder = sorted(guild.roles, key=lambda r: (r.position, r.id))
+        slots = [index for index, role in enumerate(ladder) if role.id in chosen]
+        # Bottom slot gets the bottom role
+        positions = {
+            role: slot for slot, role in zip(slots, reversed(movable))
+            if role.position != slot
+        }
+        if positions:
+            await guild.edit_role_positions(positions=positions, reason="Server restore")
+    
+    async def _start_progress(self, channel, title):
+        """Post one progress embed that is edited every few seconds"""
+        def render(progress):
+            finished = all(sum(progress.counts[phase]) >= total for phase, total in progress.totals.items())
+            embed = discord.Embed(
+                title=title,
+                color=discord.Color.green() if finished else discord.Color.orange(),
+                timestamp=datetime.utcnow()
+            )
+            for phase, total in progress.totals.items():
+                done, failed, skipped = progress.counts[phase]
+                embed.add_field(
+                    name=phase,
+                    value=f"{done + failed + skipped}/{total} • ✅ {done} • ⚠️ {failed} • ⏭️ {skipped}",
+                    inline=False
+                )
+            if progress.recent_errors:
+                embed.add_field(
+                    name=f"⚠️ Errors ({progress.error_count})",
+                    value="\n".join(progress.recent_errors)[:1024],
+                    inline=False
+                )
+            embed.set_footer(
+                text=f"Delirium Den • {progress.elapsed:.0f}s elapsed",
+                icon_url="https://i.imgur.com/RzksmKL.png"
+            )
+            return embed
+        
+        message = await channel.send(embed=discord.Embed(title=title, description="Planning...", color=discord.Color.orange()))
+        progress = ProgressMessage(message, render)
+        progress.start()
+        return progress
     
     def _get_overwrites(self, channel):
         """Convert channel permission overwrites to serializable format"""
@@ -703,8 +1102,8 @@ class ServerBackup(commands.Cog):
             if overwrite["name"] == "@everyone":
                 target = guild.default_role
             else:
-                # Get role ID from the mapping
-                role_id = role_map.get(overwrite["name"])
+                # Get role ID from the mapping (by backup role id first, since names can repeat)
+                role_id = role_map.get(overwrite.get("id")) or role_map.get(overwrite["name"])
                 if not role_id:
                     continue
                     
@@ -733,4 +1132,30 @@ class ServerBackup(commands.Cog):
         )
         
         help_embed.add_field(
-            name="📋 Available Commands
\ No newline at end of file
+            name="📋 Available Commands",
+            value=(
+                "`!backup` - Snapshot the server structure (only changes are stored)\n"
+                "`!backup_schedule <hours> [keep]` - Take snapshots in the background (`off` to stop)\n"
+                "`!restore [snapshot|latest|file]` - List backups or restore one (wipes first)\n"
+                "`!restore <snapshot|latest|file> diff` - Show and apply only the differences\n"
+                "`!wipe` - Delete every channel, category and role\n"
+                "`!backup_help` - Show this message"
+            ),
+            inline=False
+        )
+        
+        help_embed.add_field(
+            name="⚠️ Important Notes",
+            value="• Restoring wipes the server first and cannot be undone\n• Member-specific permission overwrites are not backed up\n• Managed and bot roles are skipped",
+            inline=False
+        )
+        
+        help_embed.set_footer(
+            text="Delirium Den • Backup System",
+            icon_url="https://i.imgur.com/RzksmKL.png"
+        )
+        
+        await ctx.send(embed=help_embed)
+
+async def setup(bot):
+    await bot.add_cog(ServerBackup(bot))
@@ -1,16 +1,18 @@
 import discord
 from discord.ext import commands
-import json
-import os
 import asyncio
+import copy
 from datetime import datetime, timedelta
+import heapq
 import random
 
+from utils.counters import CounterTable, DecayingCounter
+
 class Counting(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.data_file = "counting_data.json"
-        self.counting_data = self.load_data()
+        self.storage = bot.storage
         
         # Counting settings per guild - STRICT MODE
         self.default_settings = {
@@ -40,8 +42,21 @@ class Counting(commands.Cog):
             "user_violations": {},     # Track user violations
             "mute_violators": True,    # STRICT: Temporarily mute repeat offenders
             "violation_timeout": 60,   # Timeout duration in seconds
+            "violation_decay": 3600,   # Seconds for one violation to wear off (0 = never)
         }
         
+        self.counting_data = self.load_data()
+        self.migrate_data()
+        
+        # counting channel id -> guild data, so other channels return before any dict work
+        self.counting_channels = {}
+        self.index_channels()
+        
+        # Per-channel ordering: pending messages (heap by snowflake) and the task draining them
+        self.channel_queues = {}
+        self.channel_workers = {}
+        self.side_effect_tasks = set()
+        
         # Fun messages for milestones
         self.milestone_messages = [
             "🎉 Amazing! You've reached {count}! Keep it up!",
@@ -77,57 +92,64 @@ class Counting(commands.Cog):
         ]
 
     def load_data(self):
-        """Load counting data from file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return {}
-        return {}
+        """Load counting data from the shared store"""
+        return self.storage.load(self.data_file, dict)
 
     def save_data(self):
-        """Save counting data to file"""
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.counting_data, f, indent=2, default=str)
-        except Exception as e:
-            print(f"Error saving counting data: {e}")
+        """Queue counting data for the next storage flush"""
+        self.storage.mark_dirty(self.data_file)
 
-    def get_guild_data(self, guild_id):
-        """Get or create guild counting data with migration"""
-        guild_id_str = str(guild_id)
-        
-        if guild_id_str not in self.counting_data:
-            self.counting_data[guild_id_str] = self.default_settings.copy()
-            self.save_data()
-        else:
-            # Migrate old data to include new settings
-            guild_data = self.counting_data[guild_id_str]
-            updated = False
-            
-            # Add missing keys from default settings
+    def migrate_data(self):
+        """Add settings introduced since a guild's data was saved (runs once at load)"""
+        updated = False
+        for guild_data in self.counting_data.values():
             for key, default_value in self.default_settings.items():
                 if key not in guild_data:
-                    guild_data[key] = default_value
+                    guild_data[key] = copy.deepcopy(default_value)
                     updated = True
-            
-            # Save if we added new keys
-            if updated:
-                self.save_data()
-        
-        return self.counting_data[guild_id_str]
+            self.attach_counters(guild_data)
+        if updated:
+            self.save_data()
+
+    def attach_counters(self, guild_data):
+        """Swap the stored leaderboard/violations for compact counter tables.
+
+        Both accept their old {user_id: ...} dict layout as well as the packed
+        form they serialize to, so existing counting_data.json files load as is.
+        """
+        guild_data["leaderboard"] = CounterTable.from_json(guild_data["leaderboard"])
+        guild_data["user_violations"] = DecayingCounter.from_json(
+            guild_data["user_violations"],
+            guild_data["violation_decay"]
+        )
+
+    def index_channels(self):
+        """Rebuild the counting channel -> guild data map (after setup/enable/disable)"""
+        # Updated in place: the message dispatcher routes on this same dict
+        self.counting_channels.clear()
+        self.counting_channels.update(
+            (guild_data["channel_id"], guild_data)
+            for guild_data in self.counting_data.values()
+            if guild_data["enabled"] and guild_data["channel_id"]
+        )
 
-    def update_leaderboard(self, guild_id, user_id):
-        """Update user's count in leaderboard"""
-        guild_data = self.get_guild_data(guild_id)
-        user_id_str = str(user_id)
+    def get_guild_data(self, guild_id):
+        """Get or create guild counting data"""
+        guild_id_str = str(guild_id)
+        guild_data = self.counting_data.get(guild_id_str)
         
-        if user_id_str not in guild_data["leaderboard"]:
-            guild_data["leaderboard"][user_id_str] = 0
+        if guild_data is None:
+            # Deep copy so guilds don't share the leaderboard/violation dicts
+            guild_data = copy.deepcopy(self.default_settings)
+            self.attach_counters(guild_data)
+            self.counting_data[guild_id_str] = guild_data
+            self.save_data()
         
-        guild_data["leaderboard"][user_id_str] += 1
-        self.save_data()
+        return guild_data
+
+    def update_leaderboard(self, guild_data, user_id):
+        """Update user's count in leaderboard (caller saves)"""
+        guild_data["leaderboard"].add(user_id)
 
     async def send_milestone_message(self, channel, count):
         """Send a celebration message for milestones"""
@@ -144,62 +166,46 @@ class Counting(commands.Cog):
         
         await channel.send(embed=embed)
 
-    def update_violations(self, guild_id, user_id):
-        """Track user violations for strict mode"""
-        guild_data = self.get_guild_data(guild_id)
-        user_id_str = str(user_id)
-        
-        if "user_violations" not in guild_data:
-            guild_data["user_violations"] = {}
-        
-        if user_id_str not in guild_data["user_violations"]:
-            guild_data["user_violations"][user_id_str] = {
-                "count": 0,
-                "last_violation": None
-            }
-        
-        guild_data["user_violations"][user_id_str]["count"] += 1
-        guild_data["user_violations"][user_id_str]["last_violation"] = datetime.now().isoformat()
-        
+    def update_violations(self, guild_data, user_id):
+        """Track user violations for strict mode (older violations decay away)"""
+        violation_count = guild_data["user_violations"].add(user_id)
         self.save_data()
-        return guild_data["user_violations"][user_id_str]["count"]
+        return violation_count
 
-    async def handle_violation(self, message, violation_count):
-        """Handle user violations in strict mode"""
-        guild_data = self.get_guild_data(message.guild.id)
+    def apply_violation(self, message, guild_data, violation_count):
+        """Commit the punishment state for a violation; returns the side effects to run"""
+        if violation_count < guild_data["spam_threshold"]:
+            # No warning message below the threshold - silent enforcement
+            return []
         
-        if violation_count >= guild_data["spam_threshold"]:
-            # Mute the user
-            if guild_data["mute_violators"]:
-                try:
-                    timeout_until = datetime.now() + timedelta(seconds=guild_data["violation_timeout"])
-                    await message.author.timeout(timeout_until, reason="Counting violations")
-                    
-                    embed = discord.Embed(
-                        title="🚨 USER MUTED",
-                        description=f"{message.author.mention} has been muted for {guild_data['violation_timeout']} seconds due to repeated counting violations.",
-                        color=discord.Color.red()
-                    )
-                    embed.add_field(name="Violations", value=str(violation_count), inline=True)
-                    embed.add_field(name="Duration", value=f"{guild_data['violation_timeout']} seconds", inline=True)
-                    
-                    await message.channel.send(embed=embed)
-                    
-                except discord.errors.Forbidden:
-                    await message.channel.send(f"⚠️ {message.author.mention} has {violation_count} violations but I lack permission to timeout users.")
-            
-            # Reset violation count after punishment
-            guild_data["user_violations"][str(message.author.id)]["count"] = 0
-            self.save_data()
+        # Reset violation count after punishment
+        guild_data["user_violations"].reset(message.author.id)
         
-        elif violation_count == 2:
-            # No warning message - silent enforcement
-            pass
+        if guild_data["mute_violators"]:
+            return [self.mute_violator(message, guild_data["violation_timeout"], violation_count)]
+        return []
 
-    async def reset_count(self, guild_id, channel, reason="mistake", user=None, expected=None, actual=None):
-        """Reset the counting with strict messaging"""
-        guild_data = self.get_guild_data(guild_id)
-        
+    async def mute_violator(self, message, timeout_seconds, violation_count):
+        """Time out a repeat offender and announce it"""
+        try:
+            timeout_until = datetime.now() + timedelta(seconds=timeout_seconds)
+            await message.author.timeout(timeout_until, reason="Counting violations")
+            
+            embed = discord.Embed(
+                title="🚨 USER MUTED",
+                description=f"{message.author.mention} has been muted for {timeout_seconds} seconds due to repeated counting violations.",
+                color=discord.Color.red()
+            )
+            embed.add_field(name="Violations", value=str(violation_count), inline=True)
+            embed.add_field(name="Duration", value=f"{timeout_seconds} seconds", inline=True)
+            
+            await message.channel.send(embed=embed)
+            
+        except discord.errors.Forbidden:
+            await message.channel.send(f"⚠️ {message.author.mention} has {violation_count} violations but I lack permission to timeout users.")
+
+    def reset_state(self, guild_data):
+        """Reset the count to 0 and record the reset; returns the count that was lost"""
         # Save progress if enabled
         if guild_data["save_progress"] and guild_data["current_number"] > 0:
             if guild_data["current_number"] > guild_data["streak_record"]:
@@ -213,7 +219,10 @@ class Counting(commands.Cog):
         guild_data["last_reset"] = datetime.now().isoformat()
         
         self.save_data()
-        
+        return old_count
+
+    async def send_reset_message(self, guild_data, channel, old_count, reason="mistake", user=None, expected=None, actual=None):
+        """Announce a reset with strict messaging"""
         if reason == "mistake" and guild_data["strict_mode"]:
             message = random.choice(self.strict_messages).format(
                 expected=expected or "?", 
@@ -237,20 +246,42 @@ class Counting(commands.Cog):
         else:
             await channel.send(f"🔄 Count has been reset! Next number is **1**.")
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """STRICT counting message listener"""
-        if message.author.bot:
-            return
-        
-        guild_data = self.get_guild_data(message.guild.id)
-        
-        # Check if counting is enabled and in the right channel
-        if (not guild_data["enabled"] or 
-            guild_data["channel_id"] != message.channel.id):
-            return
-        
+    async def reset_count(self, guild_data, channel, reason="mistake", user=None, expected=None, actual=None):
+        """Reset the counting with strict messaging"""
+        old_count = self.reset_state(guild_data)
+        await self.send_reset_message(guild_data, channel, old_count, reason, user, expected, actual)
+
+    async def delete_message(self, message):
+        try:
+            await message.delete()
+        except discord.errors.Forbidden:
+            pass
+
+    async def add_reaction(self, message, emoji):
+        try:
+            await message.add_reaction(emoji)
+        except discord.errors.Forbidden:
+            pass
+
+    async def run_side_effects(self, effects):
+        """Run a message's Discord calls in order, after its count has been committed"""
+        for effect in effects:
+            try:
+                await effect
+            except discord.HTTPException:
+                pass
+            except Exception as e:
+                print(f"Error in counting side effect: {e}")
+
+    def process_count(self, guild_data, message):
+        """Validate one message and commit the new count state.
+
+        Runs without awaiting, so nothing can interleave between reading and
+        writing current_number. Returns the Discord calls (deletes, reactions,
+        embeds, timeouts) to run afterwards.
+        """
         expected_number = guild_data["current_number"] + 1
+        effects = []
         
         # STRICT MODE: Only allow pure numbers
         if guild_data["only_numbers"]:
@@ -264,12 +295,9 @@ class Counting(commands.Cog):
             except ValueError:
                 # Not a pure number - delete and warn in strict mode
                 if guild_data["delete_wrong_messages"]:
-                    try:
-                        await message.delete()
-                    except discord.errors.Forbidden:
-                        pass
+                    effects.append(self.delete_message(message))
                 
-                violation_count = self.update_violations(message.guild.id, message.author.id)
+                violation_count = self.update_violations(guild_data, message.author.id)
                 
                 embed = discord.Embed(
                     title="❌ INVALID MESSAGE",
@@ -280,54 +308,47 @@ class Counting(commands.Cog):
                 embed.add_field(name="Violations", value=str(violation_count), inline=True)
                 embed.set_footer(text="STRICT MODE: Numbers only!")
                 
-                warning_msg = await message.channel.send(embed=embed, delete_after=10)
-                
-                await self.handle_violation(message, violation_count)
-                return
+                effects.append(message.channel.send(embed=embed, delete_after=10))
+                effects.extend(self.apply_violation(message, guild_data, violation_count))
+                return effects
         else:
             # Normal mode - try to extract number
             try:
                 number = int(message.content.strip())
             except ValueError:
                 # Not a number, ignore in normal mode
-                return
+                return effects
         
         # Check if it's the correct number
         if number != expected_number:
             # Delete wrong message in strict mode
             if guild_data["delete_wrong_messages"]:
-                try:
-                    await message.delete()
-                except discord.errors.Forbidden:
-                    pass
-            
-            # Track violation
-            violation_count = self.update_violations(message.guild.id, message.author.id)
+                effects.append(self.delete_message(message))
             
-            # Reset count
-            await self.reset_count(
-                message.guild.id, 
+            # Track violation and reset count
+            violation_count = self.update_violations(guild_data, message.author.id)
+            old_count = self.reset_state(guild_data)
+            effects.append(self.send_reset_message(
+                guild_data, 
                 message.channel, 
+                old_count,
                 "mistake", 
                 message.author,
                 expected_number,
                 number
-            )
+            ))
             
             # Handle violations
-            await self.handle_violation(message, violation_count)
-            return
+            effects.extend(self.apply_violation(message, guild_data, violation_count))
+            return effects
         
         # STRICT: Check same user rule (never allow in strict mode)
         if guild_data["last_user"] == message.author.id:
             # Delete message
             if guild_data["delete_wrong_messages"]:
-                try:
-                    await message.delete()
-                except discord.errors.Forbidden:
-                    pass
+                effects.append(self.delete_message(message))
             
-            violation_count = self.update_violations(message.guild.id, message.author.id)
+            violation_count = self.update_violations(guild_data, message.author.id)
             
             embed = discord.Embed(
                 title="🚫 SAME USER VIOLATION",
@@ -338,9 +359,9 @@ class Counting(commands.Cog):
             embed.add_field(name="Violations", value=str(violation_count), inline=True)
             embed.set_footer(text="STRICT MODE: Wait for another user!")
             
-            await message.channel.send(embed=embed, delete_after=8)
-            await self.handle_violation(message, violation_count)
-            return
+            effects.append(message.channel.send(embed=embed, delete_after=8))
+            effects.extend(self.apply_violation(message, guild_data, violation_count))
+            return effects
         
         # Valid count! Update data
         guild_data["current_number"] = number
@@ -352,27 +373,60 @@ class Counting(commands.Cog):
             guild_data["highest_count"] = number
         
         # Update leaderboard
-        self.update_leaderboard(message.guild.id, message.author.id)
+        self.update_leaderboard(guild_data, message.author.id)
+        self.save_data()
         
         # Auto react if enabled
         if guild_data["auto_react"]:
-            try:
-                await message.add_reaction("✅")
-            except discord.errors.Forbidden:
-                pass
+            effects.append(self.add_reaction(message, "✅"))
         
         # Check for milestones
         if number in guild_data["milestones"]:
-            await self.send_milestone_message(message.channel, number)
+            effects.append(self.send_milestone_message(message.channel, number))
         
         # Special milestone reactions
         if number % 100 == 0 and number > 0:  # Every 100
-            try:
-                await message.add_reaction("💯")
-            except discord.errors.Forbidden:
-                pass
+            effects.append(self.add_reaction(message, "💯"))
         
-        self.save_data()
+        return effects
+
+    async def drain_channel(self, channel_id):
+        """Process a counting channel's queued messages oldest snowflake first"""
+        # Let messages that arrived in the same burst join the queue before sorting
+        await asyncio.sleep(0)
+        queue = self.channel_queues.get(channel_id)
+        try:
+            while queue:
+                message = heapq.heappop(queue)[1]
+                guild_data = self.counting_channels.get(channel_id)
+                if guild_data is None:
+                    # Counting was disabled or moved while messages were queued
+                    queue.clear()
+                    break
+                effects = self.process_count(guild_data, message)
+                if effects:
+                    task = asyncio.create_task(self.run_side_effects(effects))
+                    self.side_effect_tasks.add(task)
+                    task.add_done_callback(self.side_effect_tasks.discard)
+        finally:
+            self.channel_queues.pop(channel_id, None)
+            self.channel_workers.pop(channel_id, None)
+
+    def cog_load(self):
+        # Only messages in enabled counting channels reach the handler
+        self.bot.messages.register("counting", self.handle_message, priority=20, channels=self.counting_channels)
+
+    def cog_unload(self):
+        self.bot.messages.unregister("counting")
+
+    async def handle_message(self, message):
+        """STRICT counting message handler"""
+        # Queue per channel; one worker per channel validates in snowflake order
+        channel_id = message.channel.id
+        queue = self.channel_queues.setdefault(channel_id, [])
+        heapq.heappush(queue, (message.id, message))
+        if channel_id not in self.channel_workers:
+            self.channel_workers[channel_id] = asyncio.create_task(self.drain_channel(channel_id))
 
     @commands.group(name="count", invoke_without_command=True)
     async def count_group(self, ctx):
@@ -436,6 +490,7 @@ class Counting(commands.Cog):
         guild_data["enabled"] = True
         
         self.save_data()
+        self.index_channels()
         
         embed = discord.Embed(
             title="✅ Counting Setup Complete!",
@@ -470,6 +525,7 @@ class Counting(commands.Cog):
         guild_data = self.get_guild_data(ctx.guild.id)
         guild_data["enabled"] = False
         self.save_data()
+        self.index_channels()
         
         await ctx.send("🔴 Counting game has been disabled.")
 
@@ -484,6 +540,7 @@ class Counting(commands.Cog):
         
         guild_data["enabled"] = True
         self.save_data()
+        self.index_channels()
         
         await ctx.send("🟢 Counting game has been enabled!")
 
@@ -497,7 +554,7 @@ class Counting(commands.Cog):
             return await ctx.send("Count is already at 0!")
         
         old_count = guild_data["current_number"]
-        await self.reset_count(ctx.guild.id, ctx.channel, "admin", ctx.author)
+        await self.reset_count(guild_data, ctx.channel, "admin", ctx.author)
         
         embed = discord.Embed(
             title="🔄 Count Reset by Admin",
@@ -516,7 +573,7 @@ class Counting(commands.Cog):
         
         if user:
             # Individual user stats
-            user_counts = guild_data["leaderboard"].get(str(user.id), 0)
+            user_counts = guild_data["leaderboard"].get(user.id)
             
             embed = discord.Embed(
                 title=f"📊 Counting Stats for {user.display_name}",
@@ -560,8 +617,8 @@ class Counting(commands.Cog):
         if not guild_data["leaderboard"]:
             return await ctx.send("No counting data yet! Start counting to see the leaderboard!")
         
-        # Sort users by count
-        sorted_users = sorted(guild_data["leaderboard"].items(), key=lambda x: x[1], reverse=True)[:10]
+        # Top counters are maintained as counts change
+        sorted_users = guild_data["leaderboard"].top(10)
         
         embed = discord.Embed(
             title="🏆 Counting Leaderboard",
@@ -571,7 +628,7 @@ class Counting(commands.Cog):
         
         leaderboard_text = []
         for i, (user_id, count) in enumerate(sorted_users, 1):
-            user = ctx.guild.get_member(int(user_id))
+            user = ctx.guild.get_member(user_id)
             if user:
                 medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
                 leaderboard_text.append(f"{medal} {user.display_name} - **{count}** counts")
@@ -590,21 +647,18 @@ class Counting(commands.Cog):
         
         if user:
             # Individual user violations
-            user_violations = guild_data.get("user_violations", {}).get(str(user.id), {"count": 0})
+            violations = guild_data["user_violations"]
             
             embed = discord.Embed(
                 title=f"⚠️ Violations for {user.display_name}",
                 color=discord.Color.orange()
             )
             embed.set_thumbnail(url=user.display_avatar.url)
-            embed.add_field(name="Total Violations", value=str(user_violations["count"]), inline=True)
+            embed.add_field(name="Total Violations", value=str(violations.get(user.id)), inline=True)
             
-            if user_violations.get("last_violation"):
-                try:
-                    last_violation = datetime.fromisoformat(user_violations["last_violation"])
-                    embed.add_field(name="Last Violation", value=f"<t:{int(last_violation.timestamp())}:R>", inline=True)
-                except:
-                    pass
+            last_violation = violations.last_strike(user.id)
+            if last_violation:
+                embed.add_field(name="Last Violation", value=f"<t:{int(last_violation)}:R>", inline=True)
         else:
             # Server violation stats
             embed = discord.Embed(
@@ -612,27 +666,19 @@ class Counting(commands.Cog):
                 color=discord.Color.orange()
             )
             
-            total_violations = sum(data["count"] for data in guild_data.get("user_violations", {}).values())
-            embed.add_field(name="Total Violations", value=str(total_violations), inline=True)
+            violations = guild_data["user_violations"]
+            embed.add_field(name="Total Violations", value=str(violations.total()), inline=True)
             embed.add_field(name="Total Resets", value=str(guild_data["resets"]), inline=True)
             
-            # Top violators
-            if guild_data.get("user_violations"):
-                sorted_violators = sorted(
-                    guild_data["user_violations"].items(), 
-                    key=lambda x: x[1]["count"], 
-                    reverse=True
-                )[:5]
-                
-                violator_text = []
-                for user_id, data in sorted_violators:
-                    if data["count"] > 0:
-                        user = ctx.guild.get_member(int(user_id))
-                        name = user.display_name if user else "Unknown User"
-                        violator_text.append(f"{name}: {data['count']} violations")
-                
-                if violator_text:
-                    embed.add_field(name="Top Violators", value="\n".join(violator_text), inline=False)
+            # Top violators (counts with decay applied)
+            violator_text = []
+            for user_id, count in violations.top(5):
+                user = ctx.guild.get_member(user_id)
+                name = user.display_name if user else "Unknown User"
+                violator_text.append(f"{name}: {count} violations")
+            
+            if violator_text:
+                embed.add_field(name="Top Violators", value="\n".join(violator_text), inline=False)
         
         await ctx.send(embed=embed)
 
@@ -656,13 +702,16 @@ class Counting(commands.Cog):
         embed.add_field(name="Auto React", value="✅" if guild_data["auto_react"] else "❌", inline=True)
         embed.add_field(name="Violation Threshold", value=f"{guild_data['spam_threshold']} strikes", inline=True)
         embed.add_field(name="Mute Duration", value=f"{guild_data['violation_timeout']} seconds", inline=True)
+        decay = guild_data["violation_decay"]
+        embed.add_field(name="Violation Decay", value=f"1 per {decay} seconds" if decay else "Never", inline=True)
         
         embed.add_field(
             name="📋 Strict Settings Commands",
             value="`!count setting delete_wrong_messages true/false`\n"
                   "`!count setting mute_violators true/false`\n"
                   "`!count setting violation_timeout <seconds>`\n"
-                  "`!count setting spam_threshold <number>`",
+                  "`!count setting spam_threshold <number>`\n"
+                  "`!count setting violation_decay <seconds>`",
             inline=False
         )
         
@@ -677,7 +726,7 @@ class Counting(commands.Cog):
         guild_data = self.get_guild_data(ctx.guild.id)
         
         # Handle numeric settings
-        if setting in ["violation_timeout", "spam_threshold"]:
+        if setting in ["violation_timeout", "spam_threshold", "violation_decay"]:
             if not value or not value.isdigit():
                 return await ctx.send(f"❌ {setting} requires a number value!")
             
@@ -691,6 +740,11 @@ class Counting(commands.Cog):
                 if num_value < 1 or num_value > 10:
                     return await ctx.send("❌ Spam threshold must be between 1 and 10!")
                 guild_data[setting] = num_value
+            elif setting == "violation_decay":
+                if num_value > 604800:  # Up to a week; 0 disables decay
+                    return await ctx.send("❌ Violation decay must be between 0 and 604800 seconds!")
+                guild_data[setting] = num_value
+                guild_data["user_violations"].decay_seconds = num_value
             
             self.save_data()
             
@@ -753,9 +807,10 @@ class Counting(commands.Cog):
         
         if user:
             # Clear specific user's violations
-            if "user_violations" in guild_data and str(user.id) in guild_data["user_violations"]:
-                old_count = guild_data["user_violations"][str(user.id)]["count"]
-                guild_data["user_violations"][str(user.id)] = {"count": 0, "last_violation": None}
+            violations = guild_data["user_violations"]
+            if user.id in violations:
+                old_count = violations.get(user.id)
+                violations.reset(user.id)
                 self.save_data()
                 
                 embed = discord.Embed(
@@ -771,9 +826,10 @@ class Counting(commands.Cog):
                 )
         else:
             # Clear all violations
-            if "user_violations" in guild_data:
-                total_cleared = sum(data["count"] for data in guild_data["user_violations"].values())
-                guild_data["user_violations"] = {}
+            violations = guild_data["user_violations"]
+            if len(violations):
+                total_cleared = violations.total()
+                violations.clear()
                 self.save_data()
                 
                 embed = discord.Embed(
@@ -1,14 +1,15 @@
 import discord
 from discord.ext import commands
 import asyncio
-import time
+
+from utils.cooldowns import CooldownMap
 
 class DynamicVoice(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.temp_channels = {}  # Dictionary to track temporary channels {channel_id: creator_id}
-        self.user_cooldowns = {}  # Dictionary to track user cooldowns {user_id: last_channel_creation_time}
         self.cooldown_period = 30  # Cooldown in seconds to prevent spam
+        self.user_cooldowns = CooldownMap(ttl=self.cooldown_period)  # user_id -> last channel creation, forgotten once it expires
         self.pending_deletes = set()  # Set to track channels pending deletion
     
     @commands.Cog.listener()
@@ -24,11 +25,8 @@ class DynamicVoice(commands.Cog):
             
         # CHANNEL CREATION LOGIC
         if after.channel and after.channel.name.lower() == "🐙 create voice channel":
-            # Check if user is on cooldown
-            current_time = time.time()
-            last_creation = self.user_cooldowns.get(member.id, 0)
-            
-            if current_time - last_creation < self.cooldown_period:
+            # Check if user is on cooldown (and start it if not)
+            if not self.user_cooldowns.hit(member.id):
                 # User is on cooldown, move them back to their previous channel if possible
                 if before.channel and before.channel.id != after.channel.id:
                     try:
@@ -37,9 +35,6 @@ class DynamicVoice(commands.Cog):
                     except:
                         pass
                 return
-                
-            # Set cooldown
-            self.user_cooldowns[member.id] = current_time
             
             # Create a new voice channel in the same category or guild if no category
             try:
@@ -178,6 +173,7 @@ class DynamicVoice(commands.Cog):
             return
             
         self.cooldown_period = seconds
+        self.user_cooldowns.ttl = seconds
         embed = discord.Embed(
             title="⏱️ Cooldown Updated",
             description=f"Voice channel creation cooldown set to **{seconds} seconds**.",
@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import random
 import asyncio
 from typing import Optional, List, Dict, Any
@@ -97,9 +96,10 @@ class BlackjackHand:
 class BlackjackView(discord.ui.View):
     """View for blackjack game controls"""
     
-    def __init__(self, gambling_cog, user_id: int):
+    def __init__(self, gambling_cog, guild_id: int, user_id: int):
         super().__init__(timeout=300)
         self.gambling_cog = gambling_cog
+        self.guild_id = guild_id
         self.user_id = user_id
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
@@ -172,12 +172,10 @@ class BlackjackView(discord.ui.View):
         if not current_hand.can_double():
             return await interaction.response.send_message("❌ You can't double down now!", ephemeral=True)
         
-        # Check if user has enough credits
-        if current_hand.bet > self.gambling_cog.get_user_credits(self.user_id):
+        # Double the bet (fails if the user can't cover it)
+        if self.gambling_cog.debit_user_credits(self.guild_id, self.user_id, current_hand.bet) is None:
             return await interaction.response.send_message("❌ Not enough credits to double down!", ephemeral=True)
         
-        # Double the bet
-        self.gambling_cog.update_user_credits(self.user_id, -current_hand.bet)
         current_hand.bet *= 2
         current_hand.doubled = True
         
@@ -207,9 +205,10 @@ class BlackjackView(discord.ui.View):
 class HighLowView(discord.ui.View):
     """View for high-low game controls"""
     
-    def __init__(self, gambling_cog, user_id: int):
+    def __init__(self, gambling_cog, guild_id: int, user_id: int):
         super().__init__(timeout=300)
         self.gambling_cog = gambling_cog
+        self.guild_id = guild_id
         self.user_id = user_id
 
     async def interaction_check(self, interaction: discord.Interaction) -> bool:
@@ -247,7 +246,7 @@ class HighLowView(discord.ui.View):
         winnings = int(total_bet * multiplier)
         
         # Give winnings
-        new_balance = self.gambling_cog.update_user_credits(self.user_id, winnings)
+        new_balance = self.gambling_cog.update_user_credits(self.guild_id, self.user_id, winnings)
         
         embed = discord.Embed(
             title="💸 Cashed Out!",
@@ -309,7 +308,7 @@ class HighLowView(discord.ui.View):
                 color=discord.Color.red()
             )
             
-            balance = self.gambling_cog.get_user_credits(self.user_id)
+            balance = self.gambling_cog.get_user_credits(self.guild_id, self.user_id)
             embed.add_field(
                 name="💳 Balance",
                 value=f"`{balance:,}` credits",
@@ -333,9 +332,10 @@ class HighLowView(discord.ui.View):
 class DiceGameView(discord.ui.View):
     """View for dice game number selection"""
     
-    def __init__(self, gambling_cog, user_id: int, bet: int, balance: int):
+    def __init__(self, gambling_cog, guild_id: int, user_id: int, bet: int, balance: int):
         super().__init__(timeout=60)
         self.gambling_cog = gambling_cog
+        self.guild_id = guild_id
         self.user_id = user_id
         self.bet = bet
         self.balance = balance
@@ -382,7 +382,7 @@ class DiceGameView(discord.ui.View):
                            8: 7.2, 9: 9, 10: 12, 11: 18, 12: 36}
                 multiplier = prob_map[number]
                 winnings = int(self.bet * multiplier)
-                new_balance = self.gambling_cog.update_user_credits(self.user_id, winnings)
+                new_balance = self.gambling_cog.update_user_credits(self.guild_id, self.user_id, winnings)
                 
                 embed = discord.Embed(
                     title="🎲 Dice Roll - You Won!",
@@ -417,7 +417,7 @@ class DiceGameView(discord.ui.View):
 class Gambling(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.data_file = "levels_data.json"
+        self.ledger = bot.ledger  # Shared with the leveling cog
         
         # Active games tracking
         self.blackjack_games: Dict[int, Dict[str, Any]] = {}
@@ -438,50 +438,19 @@ class Gambling(commands.Cog):
             6: 5.0,   # Extreme
         }
 
-    def load_data(self) -> Dict[str, Any]:
-        """Load user data from JSON file"""
-        try:
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {}
+    def get_user_credits(self, guild_id: int, user_id: int) -> int:
+        """Get user's credit balance in a guild"""
+        return self.ledger.get_credits(guild_id, user_id)
 
-    def save_data(self, data: Dict[str, Any]):
-        """Save user data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=4)
-
-    def get_user_credits(self, user_id: int) -> int:
-        """Get user's credit balance"""
-        data = self.load_data()
-        user_data = data.get(str(user_id), {})
-        return user_data.get("credits", 0)
-
-    def update_user_credits(self, user_id: int, amount: int) -> int:
+    def update_user_credits(self, guild_id: int, user_id: int, amount: int) -> int:
         """Update user's credits and return new balance"""
-        data = self.load_data()
-        user_id_str = str(user_id)
-        
-        if user_id_str not in data:
-            data[user_id_str] = {
-                "xp": 0,
-                "level": 0,
-                "credits": 100,
-                "reputation": 0,
-                "voice_time": 0,
-                "messages_sent": 0,
-                "last_daily": 0,
-                "profile_bg": "default",
-                "rank_bg": "default",
-                "description": "No description set."
-            }
-        
-        data[user_id_str]["credits"] += amount
-        new_balance = data[user_id_str]["credits"]
-        self.save_data(data)
-        return new_balance
+        return self.ledger.credit(guild_id, user_id, amount)
+
+    def debit_user_credits(self, guild_id: int, user_id: int, amount: int) -> Optional[int]:
+        """Atomically take a bet; returns the new balance or None if it can't be covered"""
+        return self.ledger.debit(guild_id, user_id, amount)
 
-    def validate_bet(self, user_id: int, bet: int) -> tuple[bool, str]:
+    def validate_bet(self, guild_id: int, user_id: int, bet: int) -> tuple[bool, str]:
         """Validate if user can make the bet"""
         if bet < self.min_bet:
             return False, f"Minimum bet is `{self.min_bet}` credits!"
@@ -489,7 +458,7 @@ class Gambling(commands.Cog):
         if bet > self.max_bet:
             return False, f"Maximum bet is `{self.max_bet:,}` credits!"
         
-        credits = self.get_user_credits(user_id)
+        credits = self.get_user_credits(guild_id, user_id)
         if bet > credits:
             return False, f"You only have `{credits:,}` credits!"
         
@@ -497,6 +466,7 @@ class Gambling(commands.Cog):
 
     # Coinflip Command
     @app_commands.command(name="coinflip", description="Flip a coin and bet on heads or tails")
+    @app_commands.guild_only()
     @app_commands.describe(
         choice="Choose heads or tails",
         bet="Amount to bet"
@@ -508,13 +478,14 @@ class Gambling(commands.Cog):
     async def coinflip(self, interaction: discord.Interaction, choice: str, bet: int):
         """Coinflip gambling game"""
         # Validate bet
-        valid, error_msg = self.validate_bet(interaction.user.id, bet)
+        valid, error_msg = self.validate_bet(interaction.guild.id, interaction.user.id, bet)
         if not valid:
             return await interaction.response.send_message(f"❌ {error_msg}", ephemeral=True)
         
         # Deduct bet
-        old_balance = self.update_user_credits(interaction.user.id, -bet)
-        new_balance = old_balance - bet
+        new_balance = self.debit_user_credits(interaction.guild.id, interaction.user.id, bet)
+        if new_balance is None:
+            return await interaction.response.send_message("❌ You don't have enough credits for that bet!", ephemeral=True)
         
         # Flip coin
         result = random.choice(["heads", "tails"])
@@ -539,7 +510,7 @@ class Gambling(commands.Cog):
         # Show result
         if won:
             winnings = bet * 2
-            new_balance = self.update_user_credits(interaction.user.id, winnings)
+            new_balance = self.update_user_credits(interaction.guild.id, interaction.user.id, winnings)
             
             embed = discord.Embed(
                 title="🪙 Coinflip - You Won!",
@@ -573,6 +544,7 @@ class Gambling(commands.Cog):
 
     # Blackjack Commands
     @app_commands.command(name="blackjack", description="Play a game of blackjack")
+    @app_commands.guild_only()
     @app_commands.describe(bet="Amount to bet")
     async def blackjack(self, interaction: discord.Interaction, bet: int):
         """Start a blackjack game"""
@@ -583,12 +555,13 @@ class Gambling(commands.Cog):
             return await interaction.response.send_message("❌ You already have a blackjack game in progress!", ephemeral=True)
         
         # Validate bet
-        valid, error_msg = self.validate_bet(user_id, bet)
+        valid, error_msg = self.validate_bet(interaction.guild.id, user_id, bet)
         if not valid:
             return await interaction.response.send_message(f"❌ {error_msg}", ephemeral=True)
         
         # Deduct bet
-        self.update_user_credits(user_id, -bet)
+        if self.debit_user_credits(interaction.guild.id, user_id, bet) is None:
+            return await interaction.response.send_message("❌ You don't have enough credits for that bet!", ephemeral=True)
         
         # Initialize game
         deck = Deck()
@@ -605,6 +578,7 @@ class Gambling(commands.Cog):
         
         # Store game
         self.blackjack_games[user_id] = {
+            "guild_id": interaction.guild.id,
             "deck": deck,
             "player_hands": [player_hand],
             "dealer_hand": dealer_hand,
@@ -616,12 +590,12 @@ class Gambling(commands.Cog):
         if player_hand.is_blackjack():
             if dealer_hand.is_blackjack():
                 # Push
-                self.update_user_credits(user_id, bet)
+                self.update_user_credits(interaction.guild.id, user_id, bet)
                 result_embed = self.create_blackjack_embed(user_id, "🤝 Push - Both Blackjack!", discord.Color.yellow())
             else:
                 # Player blackjack wins
                 winnings = int(bet * (1 + self.blackjack_payout))
-                self.update_user_credits(user_id, winnings)
+                self.update_user_credits(interaction.guild.id, user_id, winnings)
                 result_embed = self.create_blackjack_embed(user_id, f"🎉 Blackjack! You won `{winnings:,}` credits!", discord.Color.green())
             
             del self.blackjack_games[user_id]
@@ -629,7 +603,7 @@ class Gambling(commands.Cog):
         
         # Show initial game state
         embed = self.create_blackjack_embed(user_id, "🃏 Your turn!")
-        view = BlackjackView(self, user_id)
+        view = BlackjackView(self, interaction.guild.id, user_id)
         await interaction.response.send_message(embed=embed, view=view)
 
     def create_blackjack_embed(self, user_id: int, title: str, color: discord.Color = discord.Color.blue()) -> discord.Embed:
@@ -676,7 +650,7 @@ class Gambling(commands.Cog):
             )
         
         # Show balance
-        balance = self.get_user_credits(user_id)
+        balance = self.get_user_credits(game["guild_id"], user_id)
         embed.add_field(
             name="💳 Balance",
             value=f"`{balance:,}` credits",
@@ -734,13 +708,14 @@ class Gambling(commands.Cog):
         
         # Update balance
         if total_winnings > 0:
-            self.update_user_credits(user_id, total_winnings)
+            self.update_user_credits(game["guild_id"], user_id, total_winnings)
         
         result_text = "\n".join(results)
         return result_text
 
     # High-Low Game
     @app_commands.command(name="highlow", description="Guess if the next card will be higher or lower")
+    @app_commands.guild_only()
     @app_commands.describe(bet="Amount to bet")
     async def highlow(self, interaction: discord.Interaction, bet: int):
         """Start a high-low game"""
@@ -751,18 +726,20 @@ class Gambling(commands.Cog):
             return await interaction.response.send_message("❌ You already have a high-low game in progress!", ephemeral=True)
         
         # Validate bet
-        valid, error_msg = self.validate_bet(user_id, bet)
+        valid, error_msg = self.validate_bet(interaction.guild.id, user_id, bet)
         if not valid:
             return await interaction.response.send_message(f"❌ {error_msg}", ephemeral=True)
         
         # Deduct bet
-        self.update_user_credits(user_id, -bet)
+        if self.debit_user_credits(interaction.guild.id, user_id, bet) is None:
+            return await interaction.response.send_message("❌ You don't have enough credits for that bet!", ephemeral=True)
         
         # Initialize game
         deck = Deck()
         current_card = deck.draw()
         
         self.highlow_games[user_id] = {
+            "guild_id": interaction.guild.id,
             "deck": deck,
             "current_card": current_card,
             "streak": 0,
@@ -771,7 +748,7 @@ class Gambling(commands.Cog):
         }
         
         embed = self.create_highlow_embed(user_id, "🎴 High-Low Game Started!")
-        view = HighLowView(self, user_id)
+        view = HighLowView(self, interaction.guild.id, user_id)
         await interaction.response.send_message(embed=embed, view=view)
 
     def create_highlow_embed(self, user_id: int, title: str, color: discord.Color = discord.Color.blue()) -> discord.Embed:
@@ -808,7 +785,7 @@ class Gambling(commands.Cog):
             inline=True
         )
         
-        balance = self.get_user_credits(user_id)
+        balance = self.get_user_credits(game["guild_id"], user_id)
         embed.add_field(
             name="💳 Balance",
             value=f"`{balance:,}` credits",
@@ -835,6 +812,7 @@ class Gambling(commands.Cog):
         return embed
 
     @app_commands.command(name="gamble", description="Quick gambling with various games")
+    @app_commands.guild_only()
     @app_commands.describe(
         game="Choose a quick game",
         bet="Amount to bet"
@@ -847,13 +825,14 @@ class Gambling(commands.Cog):
     async def quick_gamble(self, interaction: discord.Interaction, game: str, bet: int):
         """Quick gambling games"""
         # Validate bet
-        valid, error_msg = self.validate_bet(interaction.user.id, bet)
+        valid, error_msg = self.validate_bet(interaction.guild.id, interaction.user.id, bet)
         if not valid:
             return await interaction.response.send_message(f"❌ {error_msg}", ephemeral=True)
         
         # Deduct bet
-        old_balance = self.update_user_credits(interaction.user.id, -bet)
-        new_balance = old_balance - bet
+        new_balance = self.debit_user_credits(interaction.guild.id, interaction.user.id, bet)
+        if new_balance is None:
+            return await interaction.response.send_message("❌ You don't have enough credits for that bet!", ephemeral=True)
         
         if game == "dice":
             await self.dice_game(interaction, bet, new_balance)
@@ -871,7 +850,7 @@ class Gambling(commands.Cog):
             color=discord.Color.blue()
         )
         
-        view = DiceGameView(self, interaction.user.id, bet, balance)
+        view = DiceGameView(self, interaction.guild.id, interaction.user.id, bet, balance)
         await interaction.response.send_message(embed=embed, view=view)
 
     async def lucky_number_game(self, interaction: discord.Interaction, bet: int, balance: int):
@@ -902,7 +881,7 @@ class Gambling(commands.Cog):
         
         if multiplier > 0:
             winnings = bet * multiplier
-            new_balance = self.update_user_credits(interaction.user.id, winnings)
+            new_balance = self.update_user_credits(interaction.guild.id, interaction.user.id, winnings)
             color = discord.Color.green()
         else:
             winnings = 0
@@ -946,7 +925,7 @@ class Gambling(commands.Cog):
         
         # Calculate winnings
         winnings = int(bet * result_data["multiplier"])
-        new_balance = self.update_user_credits(interaction.user.id, winnings)
+        new_balance = self.update_user_credits(interaction.guild.id, interaction.user.id, winnings)
         
         embed = discord.Embed(
             title="🎡 Color Wheel Results",
@@ -970,10 +949,11 @@ class Gambling(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="gambling-stats", description="View your gambling statistics")
+    @app_commands.guild_only()
     async def gambling_stats(self, interaction: discord.Interaction, user: discord.Member = None):
         """Show gambling statistics"""
         target_user = user or interaction.user
-        credits = self.get_user_credits(target_user.id)
+        credits = self.get_user_credits(interaction.guild.id, target_user.id)
         
         embed = discord.Embed(
             title=f"🎰 {target_user.display_name}'s Gambling Stats",
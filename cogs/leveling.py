@@ -1,30 +1,47 @@
 import discord
 from discord.ext import commands, tasks
 from discord import app_commands
-import json
 import asyncio
 import time
 import random
 import math
 import re
 
+from utils.cooldowns import CooldownMap
+from utils.level_curve import LevelCurve
+from utils.level_events import LevelUpQueue
+from utils.ranking import LeaderboardIndex
+from utils.ratelimit import RouteLimiter
+from utils.voice_sessions import VoiceSessionTracker
+
 
 class Levels(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.data_file = "levels_data.json"
-        self.voice_sessions = {}  # Track voice channel time
-        self.message_cooldowns = {}  # Prevent XP spam
-        self.voice_xp_task.start()
-        
-        # Load data on startup
-        self.load_data()
+        self.ledger = bot.ledger  # Shared with the gambling cog
+        self.voice_sessions = VoiceSessionTracker()  # Track voice channel time per (guild, user)
+        self.pending_xp = {}  # Message XP not yet written: (guild_id, user_id) -> [xp, messages, channel_id]
+        self.level_ups = LevelUpQueue()  # Roles and announcements still to deliver
+        self.announce_channels = {}  # guild_id -> channel_id for level-ups without a source channel
+        self.send_limiter = RouteLimiter(rate=5, per=5)  # Per channel
+        self.role_limiter = RouteLimiter(rate=10, per=10)  # Per guild
+        self.voice_checkpoint_task.start()
+        self.level_flush_task.start()
         
         # XP Configuration - More balanced rates
         self.text_xp_min = 5
         self.text_xp_max = 15
         self.voice_xp_per_minute = 3
         self.message_cooldown = 60
+        self.message_cooldowns = CooldownMap(ttl=self.message_cooldown)  # Prevent XP spam, keyed by (guild_id, user_id)
+        
+        # Precomputed XP curve; levels past max_level are added on demand
+        self.max_level = 1000
+        self.curve = LevelCurve(base=150, exponent=1.5, max_level=self.max_level)
+        
+        # Per-guild XP rankings for /rank and /leaderboard, built on first use
+        self.rankings = LeaderboardIndex(self.load_guild_ranking)
+        self.ranking_idle_seconds = 1800
         
         # Level rewards (role IDs to give at certain levels)
         self.level_rewards = {
@@ -37,73 +54,30 @@ class Levels(commands.Cog):
             40: 1295853145095667763,  # [Levels 40+] - level 40
         }
 
-    def load_data(self):
-        """Load user data from JSON file"""
-        try:
-            with open(self.data_file, 'r') as f:
-                self.users_data = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.users_data = {}
-
-    def save_data(self):
-        """Save user data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.users_data, f, indent=4)
-
-    def get_user_data(self, user_id):
-        """Get or create user data"""
-        user_id = str(user_id)
-        if user_id not in self.users_data:
-            self.users_data[user_id] = {
-                "xp": 0,
-                "level": 0,
-                "credits": 100,  # Starting credits
-                "reputation": 0,
-                "voice_time": 0,  # Total voice time in minutes
-                "messages_sent": 0,
-                "last_daily": 0,
-                "profile_bg": "default",
-                "rank_bg": "default",
-                "description": "No description set."
-            }
-        return self.users_data[user_id]
+    def get_user_data(self, guild_id, user_id):
+        """Get or create a user's data in a guild (a snapshot of their ledger row)"""
+        return self.ledger.get_user(guild_id, user_id)
+
+    def load_guild_ranking(self, guild):
+        """(user_id, xp) rows for a guild's human members, used to build its ranking"""
+        member_ids = {m.id for m in guild.members if not m.bot}
+        return [(row["user_id"], row["xp"]) for row in self.ledger.iter_xp(guild.id) if row["user_id"] in member_ids]
 
     def calculate_level(self, xp):
-        """Calculate level from XP using the new formula"""
-        if xp < 0:
-            return 0
-            
-        level = 0
-        xp_used = 0
-        
-        while True:
-            # XP needed for the NEXT level (starting from level 1)
-            xp_needed_for_next = int(150 * (level + 1) ** 1.5)
-            
-            # If we don't have enough XP for the next level, stay at current level
-            if xp_used + xp_needed_for_next > xp:
-                break
-                
-            xp_used += xp_needed_for_next
-            level += 1
-            
-        return level
+        """Calculate level from XP using the precomputed curve"""
+        return self.curve.level_for_xp(xp)
+
+    def calculate_levels(self, xp_values):
+        """Calculate levels for many XP values at once (leaderboards, imports)"""
+        return self.curve.levels_for_xp(xp_values)
 
     def xp_for_level(self, target_level):
         """Calculate total XP needed to reach a specific level"""
-        if target_level <= 0:
-            return 0
-            
-        total_xp = 0
-        for level in range(1, target_level + 1):
-            xp_for_this_level = int(150 * level ** 1.5)
-            total_xp += xp_for_this_level
-            
-        return total_xp
+        return self.curve.total_xp(target_level)
 
     def xp_for_next_level(self, current_level):
         """Calculate XP needed for the next level from current level"""
-        return int(150 * (current_level + 1) ** 1.5)
+        return self.curve.xp_for_next_level(current_level)
 
     def xp_progress_for_current_level(self, xp, current_level):
         """Calculate how much XP progress toward the next level"""
@@ -116,138 +90,290 @@ class Levels(commands.Cog):
         # Progress toward next level
         return xp - xp_for_current_level
 
-    async def level_up_check(self, user_id, channel):
-        """Check if user leveled up and handle rewards"""
-        user_data = self.get_user_data(user_id)
-        current_level = user_data["level"]
+    def record_level(self, guild_id, user_id, user_data, channel_id=None):
+        """Store a level change for a freshly updated row and queue its rewards/announcement"""
         new_level = self.calculate_level(user_data["xp"])
-        
-        if new_level > current_level:
-            user_data["level"] = new_level
-            self.save_data()
-            
-            # Send level up message
-            user = self.bot.get_user(int(user_id))
-            embed = discord.Embed(
-                title="🎉 Level Up!",
-                description=f"{user.mention} reached level **{new_level}**!",
-                color=discord.Color.gold()
-            )
+        if new_level <= user_data["level"]:
+            return False
+        self.ledger.update(guild_id, user_id, level=new_level)
+        self.level_ups.push(guild_id, user_id, user_data["level"], new_level, user_data["xp"], channel_id)
+        user_data["level"] = new_level
+        return True
+
+    def flush_pending_xp(self):
+        """Write buffered message XP to the ledger in one transaction"""
+        if not self.pending_xp:
+            return 0
+        pending, self.pending_xp = self.pending_xp, {}
+        with self.ledger.transaction():
+            for (guild_id, user_id), (xp, messages, channel_id) in pending.items():
+                user_data = self.ledger.increment(guild_id, user_id, xp=xp, messages_sent=messages)
+                self.record_level(guild_id, user_id, user_data, channel_id)
+                self.rankings.update_xp(guild_id, user_id, user_data["xp"])
+        return len(pending)
+
+    def get_announce_channel(self, guild, channel_id=None):
+        """Where to announce a level-up: its source channel, else the guild's cached general channel"""
+        if channel_id is not None:
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        
+        cached = self.announce_channels.get(guild.id)
+        channel = guild.get_channel(cached) if cached else None
+        if channel is None:
+            channel = discord.utils.get(guild.text_channels, name="general")
+            if not channel and guild.text_channels:
+                channel = guild.text_channels[0]
+            if channel is None:
+                return None
+            self.announce_channels[guild.id] = channel.id
+        return channel
+
+    def reward_roles_for(self, guild, member, old_level, new_level):
+        """Reward roles for every level crossed in (old_level, new_level] the member doesn't have yet"""
+        roles = []
+        for level, role_id in self.level_rewards.items():
+            if old_level < level <= new_level and role_id:
+                role = guild.get_role(role_id)
+                if role and role not in member.roles:
+                    roles.append(role)
+        return roles
+
+    def level_up_embed(self, member, event, roles):
+        embed = discord.Embed(
+            title="🎉 Level Up!",
+            description=f"{member.mention} reached level **{event.new_level}**!",
+            color=discord.Color.gold()
+        )
+        embed.add_field(
+            name="XP Progress",
+            value=f"`{event.xp:,}` total XP",
+            inline=True
+        )
+        if roles:
             embed.add_field(
-                name="XP Progress",
-                value=f"`{user_data['xp']:,}` total XP",
-                inline=True
+                name="🎁 Reward Unlocked!",
+                value=f"You received the **{', '.join(role.name for role in roles)}** role!",
+                inline=False
             )
+        return embed
+
+    async def deliver_level_ups(self):
+        """Grant reward roles and send announcements for every queued level-up"""
+        for guild_id, events in self.level_ups.drain().items():
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                continue
             
-            # Check for role rewards
-            if new_level in self.level_rewards and self.level_rewards[new_level]:
-                try:
-                    guild = channel.guild
-                    member = guild.get_member(int(user_id))
-                    role = guild.get_role(self.level_rewards[new_level])
-                    if role and member:
-                        await member.add_roles(role)
-                        embed.add_field(
-                            name="🎁 Reward Unlocked!",
-                            value=f"You received the **{role.name}** role!",
-                            inline=False
-                        )
-                except:
-                    pass
+            announcements = {}  # channel -> embeds
+            for event in events:
+                member = guild.get_member(event.user_id)
+                if member is None:
+                    continue
+                
+                # One role edit per member, however many levels they crossed
+                roles = self.reward_roles_for(guild, member, event.old_level, event.new_level)
+                if roles:
+                    await self.role_limiter.acquire(guild_id)
+                    try:
+                        await member.add_roles(*roles, reason=f"Reached level {event.new_level}")
+                    except discord.HTTPException as e:
+                        print(f"Error granting level roles to {member}: {e}")
+                        roles = []
+                
+                channel = self.get_announce_channel(guild, event.channel_id)
+                if channel is not None:
+                    announcements.setdefault(channel, []).append(self.level_up_embed(member, event, roles))
             
-            try:
-                await channel.send(embed=embed)
-            except:
-                pass
+            # Up to 10 embeds per message
+            for channel, embeds in announcements.items():
+                for i in range(0, len(embeds), 10):
+                    await self.send_limiter.acquire(channel.id)
+                    try:
+                        await channel.send(embeds=embeds[i:i + 10])
+                    except discord.HTTPException:
+                        pass
+        
+        self.send_limiter.prune()
+        self.role_limiter.prune()
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Handle XP gain from messages"""
-        if message.author.bot or not message.guild:
-            return
-        
-        user_id = str(message.author.id)
-        current_time = time.time()
-        
-        # Check message cooldown
-        if user_id in self.message_cooldowns:
-            if current_time - self.message_cooldowns[user_id] < self.message_cooldown:
-                return
+    @tasks.loop(seconds=3)
+    async def level_flush_task(self):
+        """Persist buffered message XP and deliver queued level-ups"""
+        try:
+            self.flush_pending_xp()
+        except Exception as e:
+            print(f"Error flushing message XP: {e}")
+        if self.level_ups:
+            await self.deliver_level_ups()
+
+    @level_flush_task.before_loop
+    async def before_level_flush_task(self):
+        await self.bot.wait_until_ready()
+
+    def cog_load(self):
+        self.bot.messages.register("leveling", self.handle_message, priority=50)
+
+    async def handle_message(self, message):
+        """Handle XP gain from guild messages by humans (buffered; written by level_flush_task)"""
+        key = (message.guild.id, message.author.id)
         
-        # Update cooldown
-        self.message_cooldowns[user_id] = current_time
+        # Check and start the message cooldown
+        if not self.message_cooldowns.hit(key):
+            return
         
         # Give XP
-        user_data = self.get_user_data(user_id)
         xp_gain = random.randint(self.text_xp_min, self.text_xp_max)
-        user_data["xp"] += xp_gain
-        user_data["messages_sent"] += 1
-        
-        # Check for level up
-        await self.level_up_check(user_id, message.channel)
+        pending = self.pending_xp.get(key)
+        if pending is None:
+            self.pending_xp[key] = [xp_gain, 1, message.channel.id]
+        else:
+            pending[0] += xp_gain
+            pending[1] += 1
+            pending[2] = message.channel.id
+
+    def cog_unload(self):
+        self.bot.messages.unregister("leveling")
+        self.voice_checkpoint_task.cancel()
+        self.level_flush_task.cancel()
+        # Don't lose buffered XP; undelivered announcements are dropped
+        self.flush_pending_xp()
+
+    def is_earning_voice(self, member, channel):
+        """Whether time spent in channel earns XP (not AFK, deafened, or alone)"""
+        if channel is None or member.voice is None:
+            return False
+        if channel == member.guild.afk_channel:
+            return False
+        voice = member.voice
+        if voice.self_deaf or voice.deaf or voice.mute:
+            return False
+        # Sitting alone (or only with bots) doesn't count
+        return any(not m.bot and m.id != member.id for m in channel.members)
+
+    def refresh_voice_channel(self, channel):
+        """Re-evaluate earning state for everyone in a channel after it changed"""
+        if channel is None:
+            return
+        for m in channel.members:
+            if not m.bot:
+                self.voice_sessions.update(m.guild.id, m.id, channel.id, self.is_earning_voice(m, channel))
+
+    def credit_voice_minutes(self, member, minutes):
+        """Credit settled voice minutes to a member and return their updated data"""
+        user_data = self.ledger.increment(
+            member.guild.id,
+            member.id,
+            voice_time=minutes,
+            xp=minutes * self.voice_xp_per_minute
+        )
+        # Voice level-ups are announced in the guild's announce channel
+        self.record_level(member.guild.id, member.id, user_data)
+        self.rankings.update_xp(member.guild.id, member.id, user_data["xp"])
+        return user_data
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
         """Track voice channel time"""
-        user_id = str(member.id)
-        current_time = time.time()
+        if member.bot:
+            return
         
-        # User joined a voice channel
-        if before.channel is None and after.channel is not None:
-            self.voice_sessions[user_id] = current_time
+        # User left voice entirely: settle whatever the session earned
+        if after.channel is None:
+            minutes = self.voice_sessions.end(member.guild.id, member.id)
+            self.refresh_voice_channel(before.channel)
+            
+            if minutes > 0:  # Only give XP for full minutes
+                self.credit_voice_minutes(member, minutes)
+            return
         
-        # User left a voice channel
-        elif before.channel is not None and after.channel is None:
-            if user_id in self.voice_sessions:
-                session_time = current_time - self.voice_sessions[user_id]
-                minutes = int(session_time // 60)
-                
-                if minutes > 0:  # Only give XP for full minutes
-                    user_data = self.get_user_data(user_id)
-                    user_data["voice_time"] += minutes
-                    user_data["xp"] += minutes * self.voice_xp_per_minute
-                    
-                    # Check for level up (use general channel if available)
-                    channel = discord.utils.get(member.guild.text_channels, name="general")
-                    if not channel:
-                        channel = member.guild.text_channels[0]
-                    await self.level_up_check(user_id, channel)
-                
-                del self.voice_sessions[user_id]
+        # Joined, moved, or changed mute/deafen state
+        self.voice_sessions.update(
+            member.guild.id, member.id, after.channel.id,
+            self.is_earning_voice(member, after.channel)
+        )
+        if before.channel != after.channel:
+            self.refresh_voice_channel(before.channel)
+            self.refresh_voice_channel(after.channel)
 
-    @tasks.loop(minutes=1)
-    async def voice_xp_task(self):
-        """Give XP to users currently in voice channels"""
-        current_time = time.time()
-        for user_id in list(self.voice_sessions.keys()):
-            # Get member from all guilds the bot is in
-            member = None
-            for guild in self.bot.guilds:
-                member = guild.get_member(int(user_id))
-                if member and member.voice and member.voice.channel:
-                    # User is still in voice in this guild
-                    user_data = self.get_user_data(user_id)
-                    user_data["xp"] += self.voice_xp_per_minute
-                    user_data["voice_time"] += 1
-                    break
-            
-            # If we didn't find the user in any voice channel, clean up
-            if not member or not member.voice or not member.voice.channel:
-                if user_id in self.voice_sessions:
-                    del self.voice_sessions[user_id]
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Copy pre-guild-scoping progress into the guilds we're in (runs once ever)"""
+        copied = self.ledger.adopt_legacy_users({
+            guild.id: [m.id for m in guild.members if not m.bot]
+            for guild in self.bot.guilds
+        })
+        if copied:
+            self.rankings.invalidate()
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        """Put returning members back into the guild ranking"""
+        if member.bot:
+            return
+        xp = self.ledger.get_xp(member.guild.id, member.id)
+        if xp is not None:
+            self.rankings.add_member(member.guild.id, member.id, xp)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        """Drop departed members from the guild ranking"""
+        self.rankings.remove_member(member.guild.id, member.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        self.announce_channels.pop(channel.guild.id, None)
 
-    @voice_xp_task.before_loop
-    async def before_voice_xp_task(self):
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        if before.name != after.name or before.position != after.position:
+            self.announce_channels.pop(after.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if self.announce_channels.get(channel.guild.id) == channel.id:
+            del self.announce_channels[channel.guild.id]
+
+    @tasks.loop(minutes=10)
+    async def voice_checkpoint_task(self):
+        """Periodically settle long voice sessions and drop rankings for idle guilds"""
+        for (guild_id, user_id), minutes in self.voice_sessions.settle_all():
+            guild = self.bot.get_guild(guild_id)
+            member = guild.get_member(user_id) if guild else None
+            if member is None:
+                self.voice_sessions.end(guild_id, user_id)
+                continue
+            self.credit_voice_minutes(member, minutes)
+            # Missed leave event (e.g. across a reconnect): close the session
+            if member.voice is None or member.voice.channel is None:
+                self.voice_sessions.end(guild_id, user_id)
+        
+        self.rankings.evict_idle(self.ranking_idle_seconds)
+
+    @voice_checkpoint_task.before_loop
+    async def before_voice_checkpoint_task(self):
         await self.bot.wait_until_ready()
+        # Pick up anyone who was already in voice when the bot started
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels:
+                self.refresh_voice_channel(channel)
 
     @app_commands.command(name="rank", description="Show your or another user's rank and XP")
+    @app_commands.guild_only()
     @app_commands.describe(user="The user to check (optional)")
     async def rank(self, interaction: discord.Interaction, user: discord.Member = None):
         """Show user's rank and XP"""
         if user is None:
             user = interaction.user
         
-        user_data = self.get_user_data(user.id)
+        # Settle buffered message XP and any voice time the user has accrued so far
+        self.flush_pending_xp()
+        voice_minutes = self.voice_sessions.settle(interaction.guild.id, user.id)
+        if voice_minutes > 0:
+            self.credit_voice_minutes(user, voice_minutes)
+        
+        user_data = self.get_user_data(interaction.guild.id, user.id)
         current_level = user_data["level"]
         current_xp = user_data["xp"]
         
@@ -256,17 +382,17 @@ class Levels(commands.Cog):
         if actual_level != current_level:
             user_data["level"] = actual_level
             current_level = actual_level
-            self.save_data()
+            self.ledger.update(interaction.guild.id, user.id, level=actual_level)
         
         # Calculate XP progress for current level
         xp_for_next = self.xp_for_next_level(current_level)
         xp_progress = self.xp_progress_for_current_level(current_xp, current_level)
         
         # Calculate server rank
-        all_users = [(uid, data["xp"]) for uid, data in self.users_data.items() 
-                     if int(uid) in [m.id for m in interaction.guild.members]]
-        all_users.sort(key=lambda x: x[1], reverse=True)
-        rank = next((i + 1 for i, (uid, _) in enumerate(all_users) if uid == str(user.id)), 0)
+        ranking = self.rankings.get(interaction.guild)
+        if not user.bot:
+            ranking.update(user.id, current_xp)
+        rank = ranking.rank(user.id)
         
         embed = discord.Embed(
             title=f"📊 {user.display_name}'s Rank",
@@ -326,18 +452,18 @@ class Levels(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="leaderboard", description="Show the server leaderboard")
+    @app_commands.guild_only()
     @app_commands.describe(page="Page number to view (default: 1)")
     async def leaderboard(self, interaction: discord.Interaction, page: int = 1):
         """Show server leaderboard"""
-        # Get all users in the server
-        guild_members = [str(m.id) for m in interaction.guild.members if not m.bot]
-        guild_users = [(uid, data) for uid, data in self.users_data.items() 
-                       if uid in guild_members]
-        guild_users.sort(key=lambda x: x[1]["xp"], reverse=True)
+        self.flush_pending_xp()
+        
+        # Ranked members of this server
+        ranking = self.rankings.get(interaction.guild)
         
         # Pagination
         per_page = 10
-        total_pages = math.ceil(len(guild_users) / per_page)
+        total_pages = math.ceil(len(ranking) / per_page)
         page = max(1, min(page, total_pages))
         
         start = (page - 1) * per_page
@@ -349,27 +475,31 @@ class Levels(commands.Cog):
             color=discord.Color.gold()
         )
         
+        page_users = ranking.page(start, end)
+        page_levels = self.calculate_levels(xp for _, xp in page_users)
+        
         leaderboard_text = ""
-        for i, (user_id, user_data) in enumerate(guild_users[start:end], start + 1):
+        for i, ((user_id, xp), level) in enumerate(zip(page_users, page_levels), start + 1):
             user = self.bot.get_user(int(user_id))
             if user:
                 medals = {1: "🥇", 2: "🥈", 3: "🥉"}
                 medal = medals.get(i, f"`#{i}`")
                 leaderboard_text += f"{medal} **{user.display_name}**\n"
-                leaderboard_text += f"    Level `{user_data['level']}` • `{user_data['xp']:,}` XP\n\n"
+                leaderboard_text += f"    Level `{level}` • `{xp:,}` XP\n\n"
         
         embed.description = leaderboard_text or "No users found."
         embed.set_footer(
-            text=f"Delirium Den • Your rank: #{next((i + 1 for i, (uid, _) in enumerate(guild_users) if uid == str(interaction.user.id)), 'N/A')}",
+            text=f"Delirium Den • Your rank: #{ranking.rank(interaction.user.id) or 'N/A'}",
             icon_url="https://i.imgur.com/RzksmKL.png"
         )
         
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="daily", description="Claim your daily credits")
+    @app_commands.guild_only()
     async def daily(self, interaction: discord.Interaction):
         """Claim daily credits"""
-        user_data = self.get_user_data(interaction.user.id)
+        user_data = self.get_user_data(interaction.guild.id, interaction.user.id)
         current_time = time.time()
         last_daily = user_data["last_daily"]
         
@@ -388,20 +518,19 @@ class Levels(commands.Cog):
         
         # Give daily credits
         daily_amount = random.randint(50, 100)
-        user_data["credits"] += daily_amount
-        user_data["last_daily"] = current_time
-        self.save_data()
+        new_balance = self.ledger.credit(interaction.guild.id, interaction.user.id, daily_amount, last_daily=current_time)
         
         embed = discord.Embed(
             title="💰 Daily Credits Claimed!",
             description=f"You received `{daily_amount}` credits!\n"
-                       f"New balance: `{user_data['credits']:,}` credits",
+                       f"New balance: `{new_balance:,}` credits",
             color=discord.Color.green()
         )
         
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="reputation", description="Give reputation to another user")
+    @app_commands.guild_only()
     @app_commands.describe(user="The user to give reputation to")
     async def reputation(self, interaction: discord.Interaction, user: discord.Member):
         """Give reputation to another user"""
@@ -411,11 +540,11 @@ class Levels(commands.Cog):
         if user.id == interaction.user.id:
             return await interaction.response.send_message("❌ You can't give reputation to yourself!", ephemeral=True)
         
-        giver_data = self.get_user_data(interaction.user.id)
+        giver_data = self.get_user_data(interaction.guild.id, interaction.user.id)
         current_time = time.time()
         
         # Check cooldown (24 hours)
-        if "last_rep" in giver_data:
+        if giver_data["last_rep"]:
             if current_time - giver_data["last_rep"] < 86400:
                 time_left = 86400 - (current_time - giver_data["last_rep"])
                 hours = int(time_left // 3600)
@@ -424,10 +553,9 @@ class Levels(commands.Cog):
                 return await interaction.response.send_message(f"⏰ You can give reputation again in `{hours}h {minutes}m`", ephemeral=True)
         
         # Give reputation
-        receiver_data = self.get_user_data(user.id)
-        receiver_data["reputation"] += 1
-        giver_data["last_rep"] = current_time
-        self.save_data()
+        with self.ledger.transaction():
+            receiver_data = self.ledger.increment(interaction.guild.id, user.id, reputation=1)
+            self.ledger.update(interaction.guild.id, interaction.user.id, last_rep=current_time)
         
         embed = discord.Embed(
             title="⭐ Reputation Given!",
@@ -439,13 +567,15 @@ class Levels(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="profile", description="View your or another user's profile")
+    @app_commands.guild_only()
     @app_commands.describe(user="The user to view (optional)")
     async def profile(self, interaction: discord.Interaction, user: discord.Member = None):
         """View user profile"""
         if user is None:
             user = interaction.user
         
-        user_data = self.get_user_data(user.id)
+        self.flush_pending_xp()
+        user_data = self.get_user_data(interaction.guild.id, user.id)
         
         embed = discord.Embed(
             title=f"👤 {user.display_name}'s Profile",
@@ -487,19 +617,19 @@ class Levels(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="setdesc", description="Set your profile description")
+    @app_commands.guild_only()
     @app_commands.describe(description="Your new profile description (max 100 characters)")
     async def set_description(self, interaction: discord.Interaction, description: str):
         """Set your profile description"""
         if len(description) > 100:
             return await interaction.response.send_message("❌ Description must be 100 characters or less!", ephemeral=True)
         
-        user_data = self.get_user_data(interaction.user.id)
-        user_data["description"] = description
-        self.save_data()
+        self.ledger.update(interaction.guild.id, interaction.user.id, description=description)
         
         await interaction.response.send_message(f"✅ Your description has been updated to: `{description}`", ephemeral=True)
 
     @app_commands.command(name="scanroles", description="Scan server for Japanese quote format level roles")
+    @app_commands.guild_only()
     @app_commands.default_permissions(administrator=True)
     async def scan_roles(self, interaction: discord.Interaction):
         """Scan server for Japanese quote format level roles"""
@@ -619,6 +749,7 @@ class Levels(commands.Cog):
         await interaction.followup.send(embed=embed)
 
     @app_commands.command(name="importroles", description="Import existing level roles and assign appropriate XP/levels")
+    @app_commands.guild_only()
     @app_commands.default_permissions(administrator=True)
     async def import_roles(self, interaction: discord.Interaction):
         """Import existing level roles and assign appropriate XP/levels"""
@@ -669,37 +800,37 @@ class Levels(commands.Cog):
         imported_count = 0
         skipped_count = 0
         
-        for member in interaction.guild.members:
-            if member.bot:
-                continue
+        with self.ledger.transaction():
+            for member in interaction.guild.members:
+                if member.bot:
+                    continue
             
-            # Find the highest level role this member has
-            highest_level = 0
-            for role in member.roles:
-                if role.id in role_to_level_range:
-                    min_lvl, max_lvl = role_to_level_range[role.id]
-                    # Use the maximum level of the range for import
-                    if max_lvl > highest_level:
-                        highest_level = max_lvl
+                # Find the highest level role this member has
+                highest_level = 0
+                for role in member.roles:
+                    if role.id in role_to_level_range:
+                        min_lvl, max_lvl = role_to_level_range[role.id]
+                        # Use the maximum level of the range for import
+                        if max_lvl > highest_level:
+                            highest_level = max_lvl
             
-            if highest_level > 0:
-                # Get or create user data
-                user_data = self.get_user_data(member.id)
+                if highest_level > 0:
+                    # Get or create user data
+                    user_data = self.get_user_data(interaction.guild.id, member.id)
                 
-                # Only import if they don't already have a higher level
-                if user_data["level"] < highest_level:
-                    # Calculate minimum XP needed for this level
-                    min_xp_for_level = self.xp_for_level(highest_level)
+                    # Only import if they don't already have a higher level
+                    if user_data["level"] < highest_level:
+                        # Calculate minimum XP needed for this level
+                        min_xp_for_level = self.xp_for_level(highest_level)
                     
-                    # Set their XP to the minimum needed for their level
-                    user_data["xp"] = min_xp_for_level
-                    user_data["level"] = highest_level
-                    imported_count += 1
-                else:
-                    skipped_count += 1
+                        # Set their XP to the minimum needed for their level
+                        self.ledger.update(interaction.guild.id, member.id, xp=min_xp_for_level, level=highest_level)
+                        imported_count += 1
+                    else:
+                        skipped_count += 1
         
-        # Save all changes
-        self.save_data()
+        # The ranking is rebuilt from the ledger on next use
+        self.rankings.invalidate(interaction.guild.id)
         
         # Send completion message
         embed = discord.Embed(
@@ -714,16 +845,18 @@ class Levels(commands.Cog):
 
     # Admin commands
     @app_commands.command(name="givexp", description="Give XP to a user")
+    @app_commands.guild_only()
     @app_commands.describe(user="The user to give XP to", amount="Amount of XP to give")
     @app_commands.default_permissions(administrator=True)
     async def give_xp(self, interaction: discord.Interaction, user: discord.Member, amount: int):
         """Give XP to a user (Admin only)"""
-        user_data = self.get_user_data(user.id)
-        old_level = user_data["level"]
-        user_data["xp"] += amount
-        new_level = self.calculate_level(user_data["xp"])
-        user_data["level"] = new_level
-        self.save_data()
+        self.flush_pending_xp()
+        with self.ledger.transaction():
+            old_level = self.get_user_data(interaction.guild.id, user.id)["level"]
+            user_data = self.ledger.increment(interaction.guild.id, user.id, xp=amount)
+            new_level = self.calculate_level(user_data["xp"])
+            self.ledger.update(interaction.guild.id, user.id, level=new_level)
+        self.rankings.update_xp(interaction.guild.id, user.id, user_data["xp"])
         
         embed = discord.Embed(
             title="✅ XP Given",
@@ -735,16 +868,16 @@ class Levels(commands.Cog):
         await interaction.response.send_message(embed=embed)
 
     @app_commands.command(name="resetlevels", description="Reset levels for a user or entire server")
+    @app_commands.guild_only()
     @app_commands.describe(user="The user to reset (leave empty for server-wide reset)")
     @app_commands.default_permissions(administrator=True)
     async def reset_levels(self, interaction: discord.Interaction, user: discord.Member = None):
         """Reset levels for a user or entire server (Admin only)"""
+        self.flush_pending_xp()
         if user:
             # Reset specific user
-            user_data = self.get_user_data(user.id)
-            user_data["xp"] = 0
-            user_data["level"] = 0
-            self.save_data()
+            self.ledger.update(interaction.guild.id, user.id, xp=0, level=0)
+            self.rankings.update_xp(interaction.guild.id, user.id, 0)
             await interaction.response.send_message(f"✅ Reset levels for {user.mention}")
         else:
             # Reset entire server (with confirmation)
@@ -765,12 +898,8 @@ class Levels(commands.Cog):
                 reaction, user = await self.bot.wait_for("reaction_add", timeout=30.0, check=check)
                 if str(reaction.emoji) == "✅":
                     # Reset all users in this server
-                    guild_member_ids = [str(m.id) for m in interaction.guild.members]
-                    for user_id in guild_member_ids:
-                        if user_id in self.users_data:
-                            self.users_data[user_id]["xp"] = 0
-                            self.users_data[user_id]["level"] = 0
-                    self.save_data()
+                    self.ledger.reset_guild(interaction.guild.id)
+                    self.rankings.invalidate(interaction.guild.id)
                     await interaction.edit_original_response(embed=discord.Embed(title="✅ Server Levels Reset", color=discord.Color.green()))
                 else:
                     await interaction.edit_original_response(embed=discord.Embed(title="❌ Reset Cancelled", color=discord.Color.red()))
@@ -778,6 +907,7 @@ class Levels(commands.Cog):
                 await interaction.edit_original_response(embed=discord.Embed(title="⏰ Reset Timed Out", color=discord.Color.red()))
 
     @app_commands.command(name="xplevels", description="Show XP requirements for different levels")
+    @app_commands.guild_only()
     @app_commands.default_permissions(administrator=True)  
     async def xp_levels(self, interaction: discord.Interaction):
         """Show XP requirements for different levels (Admin only)"""
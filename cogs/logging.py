@@ -3,10 +3,12 @@ from discord.ext import commands
 from datetime import datetime, timedelta
 import re
 import os
-import asyncio
-import aiohttp
 from dotenv import load_dotenv
 
+from utils.audit_tail import AuditLogCorrelator
+from utils.purge_archive import MAX_UPLOAD_BYTES, archive_messages
+from utils.webhooks import WebhookDispatcher
+
 # Load environment variables
 load_dotenv()
 
@@ -22,6 +24,14 @@ class WebhookLogging(commands.Cog):
         self.staff_server_id = int(os.getenv("STAFF_SERVER_ID", "0"))
         # Get the main server name for reference
         self.main_server_name = os.getenv("SERVER_NAME", "Delirium Den")
+        
+        # One pooled session and a batching queue for every log event
+        self.dispatcher = WebhookDispatcher(self.webhook_url)
+        # Recent audit log entries per guild, shared by every event that needs one
+        self.audit_logs = AuditLogCorrelator()
+
+    async def cog_unload(self):
+        await self.dispatcher.close()
 
     def get_role_info(self, role, guild_id=None, staff_server_id=None):
         """Format role information based on whether it's from a different server"""
@@ -53,49 +63,38 @@ class WebhookLogging(commands.Cog):
             except:
                 return "Unknown Role"
 
-    async def get_audit_log_entry(self, guild, action_type, target=None, limit=10):
-        """Get the most recent audit log entry for a specific action and target"""
-        if not guild.me.guild_permissions.view_audit_log:
-            return None
-            
+    async def get_audit_log_entry(self, guild, action_type, target=None):
+        """Get the audit log entry for an action that just happened to target.
+
+        Entries come from a shared per-guild tail, so concurrent events wait on
+        one fetch (or the gateway's audit log event) instead of each querying.
+        """
         try:
-            # Wait a short time to ensure the audit log entry has been created
-            await asyncio.sleep(0.5)
-            
-            # Get audit logs with the specified action type
-            async for entry in guild.audit_logs(limit=limit, action=action_type):
-                # If target is provided, match it with the entry target
-                if target is not None:
-                    # Check if target is a member/user
-                    if isinstance(target, (discord.Member, discord.User)):
-                        if entry.target.id == target.id:
-                            return entry
-                    # Check if target is a message (match channel and user)
-                    elif hasattr(target, 'author') and hasattr(target, 'channel'):
-                        if entry.target.id == target.author.id and entry.extra.channel.id == target.channel.id:
-                            return entry
-                    # Check if target is a channel
-                    elif isinstance(target, discord.abc.GuildChannel):
-                        if entry.target.id == target.id:
-                            return entry
-                    # Check if target is a role
-                    elif isinstance(target, discord.Role):
-                        if entry.target.id == target.id:
-                            return entry
-                # If no target provided or target doesn't match any type above, return the most recent entry
-                else:
-                    return entry
-                
-            # If we went through all entries and didn't find a match, return None
-            return None
+            # If target is a message, match the author and channel
+            if hasattr(target, 'author') and hasattr(target, 'channel'):
+                channel_id = target.channel.id
+                return await self.audit_logs.find(
+                    guild, action_type, target.author.id,
+                    match=lambda entry: entry.extra.channel.id == channel_id
+                )
+            # Members, users, channels and roles all match on id
+            target_id = target.id if target is not None else None
+            return await self.audit_logs.find(guild, action_type, target_id)
         except Exception as e:
             print(f"Error getting audit log entry: {e}")
             return None
 
-    async def send_webhook(self, embed, guild=None):
-        """Send a log event via webhook"""
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry):
+        """Entries pushed by the gateway resolve waiting events without a fetch"""
+        self.audit_logs.feed(entry)
+
+    async def send_webhook(self, embed, guild=None, attachment=None):
+        """Send a log event via webhook; attachment is an optional (path, filename) to upload"""
         if not self.webhook_url:
             print("Warning: No webhook URL configured, skipping log event")
+            if attachment:
+                self.dispatcher.discard_attachment(attachment)
             return
             
         try:
@@ -116,18 +115,13 @@ class WebhookLogging(commands.Cog):
                         icon_url=icon_url
                     )
             
-            # Convert embed to dict for webhook
-            webhook_data = {
-                "embeds": [embed.to_dict()]
-            }
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.webhook_url, json=webhook_data) as response:
-                    if response.status not in [200, 204]:
-                        print(f"Webhook request failed with status {response.status}: {await response.text()}")
+            # Queue the embed; the dispatcher packs up to 10 per webhook call
+            self.dispatcher.send(embed.to_dict(), attachment)
                         
         except Exception as e:
             print(f"Error sending webhook: {e}")
+            if attachment:
+                self.dispatcher.discard_attachment(attachment)
 
     @commands.Cog.listener()
     async def on_message_delete(self, message):
@@ -243,21 +237,44 @@ class WebhookLogging(commands.Cog):
             timestamp=discord.utils.utcnow()
         )
         
-        # Count messages by author
-        author_counts = {}
-        for message in messages:
-            author_name = str(message.author)
-            if author_name in author_counts:
-                author_counts[author_name] += 1
+        # Stream every message into a compressed archive instead of building it up in the embed
+        deleted_at = discord.utils.utcnow()
+        attachment = None
+        try:
+            archive, tally = await archive_messages(messages, {
+                "Guild": f"{guild.name} ({guild.id})",
+                "Channel": f"#{channel.name} ({channel.id})",
+                "Deleted At": deleted_at.isoformat(),
+                "Messages": len(messages),
+            })
+        except Exception as e:
+            print(f"Error archiving bulk delete: {e}")
+            archive = tally = None
+
+        if tally is not None:
+            top = tally.top(10)
+            author_text = "\n".join(f"**{name}** (<@{author_id}>): {count}" for author_id, name, count in top)
+            others = tally.authors - len(top)
+            if others > 0:
+                author_text += f"\n...and {others}{'' if tally.exact else '+'} more"
+            embed.add_field(name=f"Top Authors ({len(top)} of {tally.authors})", value=author_text[:1024], inline=False)
+
+        if archive is not None:
+            if archive.size > MAX_UPLOAD_BYTES:
+                embed.add_field(
+                    name="Archive",
+                    value=f"Too large to upload ({archive.size / 1024 / 1024:.1f} MiB)",
+                    inline=False
+                )
+                archive.discard()
             else:
-                author_counts[author_name] = 1
-        
-        # Format author counts
-        author_text = "\n".join([f"**{author}**: {count} messages" for author, count in author_counts.items()])
-        if len(author_text) > 1024:
-            author_text = author_text[:1021] + "..."
-            
-        embed.add_field(name="Authors", value=author_text, inline=False)
+                filename = f"bulk-delete-{channel.id}-{deleted_at.strftime('%Y%m%d_%H%M%S')}{archive.extension}"
+                attachment = (archive.path, filename)
+                embed.add_field(
+                    name="Archive",
+                    value=f"`{filename}` • {archive.messages} messages • {archive.size / 1024:.1f} KiB",
+                    inline=False
+                )
         
         # Add responsible user from audit log if available
         entry = await self.get_audit_log_entry(guild, discord.AuditLogAction.message_bulk_delete)
@@ -280,7 +297,7 @@ class WebhookLogging(commands.Cog):
             icon_url="https://i.imgur.com/RzksmKL.png"
         )
         
-        await self.send_webhook(embed, guild)
+        await self.send_webhook(embed, guild, attachment)
 
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
@@ -500,7 +517,7 @@ class WebhookLogging(commands.Cog):
         embed.add_field(name="Category", value=channel.category.name if channel.category else "None", inline=True)
         
         # Add responsible user from audit log
-        entry = await self.get_audit_log_entry(channel.guild, discord.AuditLogAction.channel_create)
+        entry = await self.get_audit_log_entry(channel.guild, discord.AuditLogAction.channel_create, channel)
         if entry and entry.user and entry.target.id == channel.id:
             embed.add_field(
                 name="Created By",
@@ -534,7 +551,7 @@ class WebhookLogging(commands.Cog):
         embed.add_field(name="Channel ID", value=channel.id, inline=True)
         
         # Add responsible user from audit log
-        entry = await self.get_audit_log_entry(channel.guild, discord.AuditLogAction.channel_delete)
+        entry = await self.get_audit_log_entry(channel.guild, discord.AuditLogAction.channel_delete, channel)
         if entry and entry.user and entry.target.id == channel.id:
             embed.add_field(
                 name="Deleted By",
@@ -567,6 +584,7 @@ class WebhookLogging(commands.Cog):
             return
             
         self.webhook_url = webhook_url
+        self.dispatcher.url = webhook_url
         
         # Store the webhook URL in environment (for runtime)
         os.environ["WEBHOOK_URL"] = webhook_url
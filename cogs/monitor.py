@@ -1,89 +1,131 @@
 import discord
 from discord.ext import commands
 import asyncio
-import json
-import os
+from collections import deque
+
+from utils.monitor_index import MonitorIndex
+from utils.webhooks import ChannelWebhookPool
+
+INVISIBLE_CHAR = "​"  # Zero-width space
 
 class EmptyMessageCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.monitored_users = {}  # {guild_id: {user_id: channel_id or 'all'}}
+        self.index = MonitorIndex()  # flat keys checked on every message
         self.data_file = 'monitored_users.json'
+        self.storage = bot.storage
+        # One cached webhook per channel, and a queue per channel so spam is replaced in order
+        self.webhooks = ChannelWebhookPool(bot, "DeliriumDenAutoReplacer")
+        self.replace_queues = {}  # {channel_id: deque of messages}
+        self.replace_workers = {}  # {channel_id: task}
         self.load_data()
+
+    def cog_load(self):
+        # First, so a replaced message is queued before anything else reacts to it
+        self.bot.messages.register("monitor", self.handle_message, priority=10)
+
+    def cog_unload(self):
+        self.bot.messages.unregister("monitor")
+        for worker in self.replace_workers.values():
+            worker.cancel()
         
     def load_data(self):
-        """Load monitored users from file"""
+        """Load monitored users from the shared store"""
         try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    # Convert string keys back to integers
-                    self.monitored_users = {
-                        int(guild_id): {
-                            int(user_id): channel_data 
-                            for user_id, channel_data in users.items()
-                        }
-                        for guild_id, users in data.items()
-                    }
+            data = self.storage.load(self.data_file, dict)
+            # Convert string keys back to integers
+            self.monitored_users = {
+                int(guild_id): {
+                    int(user_id): channel_data 
+                    for user_id, channel_data in users.items()
+                }
+                for guild_id, users in data.items()
+            }
         except Exception as e:
             print(f"Error loading monitored users: {e}")
             self.monitored_users = {}
+        # The store serializes this dict directly from now on
+        self.storage.register(self.data_file, self.monitored_users)
+        self.index = MonitorIndex(self.monitored_users)
     
     def save_data(self):
-        """Save monitored users to file"""
-        try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.monitored_users, f, indent=2)
-        except Exception as e:
-            print(f"Error saving monitored users: {e}")
+        """Rebuild the lookup index and queue monitored users for the next storage flush"""
+        self.index = MonitorIndex(self.monitored_users)
+        self.storage.mark_dirty(self.data_file)
 
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        """Monitor messages and replace if user is being tracked"""
-        # Ignore bot messages and commands
-        if message.author.bot:
-            return
-            
-        # Check if user is monitored in this guild
-        guild_id = message.guild.id if message.guild else None
-        if not guild_id or guild_id not in self.monitored_users:
-            return
-            
-        user_id = message.author.id
-        if user_id not in self.monitored_users[guild_id]:
+    async def handle_message(self, message):
+        """Replace guild messages by humans if the user is being tracked"""
+        # Almost nobody is monitored, so the common path is a single set lookup
+        if message.author.id not in self.index.users:
             return
-            
-        # Check if monitoring applies to this channel
-        monitor_data = self.monitored_users[guild_id][user_id]
-        if monitor_data != 'all' and monitor_data != message.channel.id:
+        if not self.index.matches(message.guild.id, message.author.id, message.channel.id):
             return
             
-        # Replace the message with empty content
+        self.queue_replacement(message)
+
+    def queue_replacement(self, message):
+        """Hand a message to its channel's replacement worker"""
+        channel_id = message.channel.id
+        self.replace_queues.setdefault(channel_id, deque()).append(message)
+        worker = self.replace_workers.get(channel_id)
+        if worker is None or worker.done():
+            self.replace_workers[channel_id] = asyncio.create_task(self.replace_worker(message.channel))
+
+    async def replace_worker(self, channel):
+        """Replace queued messages one channel at a time: a webhook send each, then one bulk delete"""
+        queue = self.replace_queues[channel.id]
         try:
-            # Small delay to ensure message is fully sent
-            await asyncio.sleep(0.1)
-            
-            # Create webhook to send replacement
-            webhook = await message.channel.create_webhook(name="DeliriumDenAutoReplacer")
-            
-            # Send empty message with invisible character
-            invisible_char = "​"  # Zero-width space
-            await webhook.send(
-                content=invisible_char,
-                username=message.author.display_name,
-                avatar_url=message.author.avatar.url if message.author.avatar else None
-            )
-            
-            # Delete the original message
-            await message.delete()
-            
-            # Clean up webhook
-            await webhook.delete()
-            
+            while queue:
+                batch = [queue.popleft() for _ in range(min(len(queue), 100))]
+                for message in batch:
+                    try:
+                        await self.webhooks.send(
+                            channel,
+                            content=INVISIBLE_CHAR,
+                            username=message.author.display_name,
+                            avatar_url=message.author.avatar.url if message.author.avatar else None
+                        )
+                    except discord.Forbidden:
+                        print(f"Missing permissions to replace message in {message.guild.name}")
+                    except Exception as e:
+                        print(f"Error replacing message: {e}")
+                await self.delete_originals(channel, batch)
+        finally:
+            self.replace_workers.pop(channel.id, None)
+            if not queue:
+                self.replace_queues.pop(channel.id, None)
+
+    async def delete_originals(self, channel, messages):
+        try:
+            if len(messages) > 1:
+                await channel.delete_messages(messages)
+            else:
+                await messages[0].delete()
+            return
+        except discord.NotFound:
+            if len(messages) == 1:
+                return
         except discord.Forbidden:
-            print(f"Missing permissions to replace message in {message.guild.name}")
-        except Exception as e:
-            print(f"Error replacing message: {e}")
+            print(f"Missing permissions to delete messages in {channel.guild.name}")
+            return
+        except discord.HTTPException as e:
+            print(f"Error bulk deleting replaced messages: {e}")
+        # Bulk delete refused (a message already gone or too old); fall back to one by one
+        for message in messages:
+            try:
+                await message.delete()
+            except discord.HTTPException:
+                pass
+
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel):
+        """A webhook in this channel was created, edited or deleted; look it up again next time"""
+        self.webhooks.invalidate(channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.webhooks.invalidate(channel.id)
 
     @commands.command(name='monitor_empty', aliases=['monitor', 'auto_empty'])
     @commands.has_permissions(manage_messages=True)
@@ -299,17 +341,14 @@ class EmptyMessageCog(commands.Cog):
                         break
             
             if target_message:
-                webhook = await ctx.channel.create_webhook(name="DeliriumDenEmptyReplacer")
-                
-                invisible_char = "​"
-                await webhook.send(
-                    content=invisible_char,
+                await self.webhooks.send(
+                    ctx.channel,
+                    content=INVISIBLE_CHAR,
                     username=target_message.author.display_name,
                     avatar_url=target_message.author.avatar.url if target_message.author.avatar else None
                 )
                 
                 await target_message.delete()
-                await webhook.delete()
                 
             else:
                 error_embed = discord.Embed(
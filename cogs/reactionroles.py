@@ -1,29 +1,21 @@
 import discord
 from discord.ext import commands
-import json
-import os
 from typing import Dict, List, Optional
 
 class ReactionRoles(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.data_file = "reaction_roles.json"
+        self.storage = bot.storage
         self.reaction_roles = self.load_data()
     
     def load_data(self) -> Dict:
-        """Load reaction roles data from JSON file"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                return {}
-        return {}
+        """Load reaction roles data from the shared store"""
+        return self.storage.load(self.data_file, dict)
     
     def save_data(self):
-        """Save reaction roles data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.reaction_roles, f, indent=4)
+        """Queue reaction roles data for the next storage flush"""
+        self.storage.mark_dirty(self.data_file)
     
     def get_emoji_name(self, emoji) -> str:
         """Get the name/id of an emoji for storage"""
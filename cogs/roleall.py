@@ -2,6 +2,23 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from typing import Literal
+import asyncio
+
+from utils.ratelimit import RouteLimiter
+from utils.restore_plan import ProgressMessage
+from utils.role_jobs import RoleJob, RoleJobStore
+
+JOB_PHASE = "👥 Members"
+
+
+def format_duration(seconds):
+    """Compact h/m/s for progress and summaries"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m {seconds % 60}s"
+    return f"{seconds}s"
 
 class ConfirmView(discord.ui.View):
     def __init__(self, role, members_count, action):
@@ -46,6 +63,164 @@ class ConfirmView(discord.ui.View):
 class RoleAll(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Bulk role jobs: a few workers per job, paced per guild; discord.py waits on the bucket headers
+        self.job_concurrency = 4
+        self.job_limiter = RouteLimiter(10, 1)
+        self.jobs = RoleJobStore(bot.storage)
+        self.job_tasks = {}  # guild_id -> task running that guild's job (None while it is being started)
+    
+    def cog_load(self):
+        # Picking up jobs after a reload; after a restart on_ready does it
+        if self.bot.is_ready():
+            self.resume_jobs()
+    
+    def cog_unload(self):
+        # Running jobs stay "running" in the checkpoint and resume on the next load
+        for task in self.job_tasks.values():
+            if task is not None:
+                task.cancel()
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.resume_jobs()
+    
+    def resume_jobs(self):
+        for job in self.jobs.running():
+            guild = self.bot.get_guild(job.guild_id)
+            if guild is None or job.guild_id in self.job_tasks:
+                continue
+            print(f"Resuming role {job.action} job for {job.role_name} in {guild.name} ({job.remaining} members left)")
+            self.job_tasks[job.guild_id] = asyncio.create_task(self.run_job(guild, job))
+    
+    def reserve_job(self, guild, role, action, member_ids, requested_by, channel):
+        """Claim the guild for a new job before anything is awaited, so two
+        confirmations landing together can't both start one. Returns None if
+        a job is already running there."""
+        job = RoleJob(guild.id, role.id, role.name, action, str(requested_by), channel.id, member_ids)
+        if not self.jobs.reserve(job):
+            return None
+        self.job_tasks[guild.id] = None
+        return job
+    
+    def release_job(self, guild, job):
+        """Give up a reserved job whose progress message could not be sent"""
+        self.jobs.release(job)
+        if self.job_tasks.get(guild.id, False) is None:
+            del self.job_tasks[guild.id]
+    
+    def start_job(self, guild, job, message):
+        job.message_id = message.id
+        self.jobs.checkpoint()
+        self.job_tasks[guild.id] = asyncio.create_task(self.run_job(guild, job, message))
+        return job
+    
+    async def run_job(self, guild, job, message=None):
+        """Drive a job to the end (or cancellation), editing its progress message as it goes"""
+        role = guild.get_role(job.role_id)
+        channel = guild.get_channel_or_thread(job.channel_id)
+        if message is None and channel is not None:
+            if job.message_id is not None:
+                message = channel.get_partial_message(job.message_id)
+            else:
+                # Restarted between reserving the job and posting its progress message
+                message = await channel.send(embed=self.job_embed(job))
+                job.message_id = message.id
+        if role is None:
+            job.cancel()
+            self.jobs.checkpoint()
+            self.job_tasks.pop(guild.id, None)
+            return
+        
+        adding = job.action == "add"
+        reason = f"Bulk role {'assignment' if adding else 'removal'} by {job.requested_by}"
+        
+        async def apply(member_id):
+            member = guild.get_member(member_id)
+            # Left the server, or already changed (by someone else, or before a restart)
+            if member is None or (member.get_role(role.id) is not None) == adding:
+                return False
+            if adding:
+                await self.bot.http.add_role(guild.id, member_id, role.id, reason=reason)
+            else:
+                await self.bot.http.remove_role(guild.id, member_id, role.id, reason=reason)
+            return True
+        
+        progress = ProgressMessage(message, lambda p: self.job_embed(job, p), interval=5.0)
+        progress.add_phases({JOB_PHASE: job.total})
+        progress.counts[JOB_PHASE] = [job.done, job.failed, job.skipped]
+        progress.start()
+        try:
+            await job.run(apply, self.job_limiter, self.job_concurrency, progress, self.jobs.checkpoint)
+        finally:
+            self.job_tasks.pop(guild.id, None)
+            await progress.stop()
+    
+    def job_embed(self, job, progress=None):
+        """Progress while a job runs, the summary once it has finished or been cancelled"""
+        preposition = "to" if job.action == "add" else "from"
+        role_text = f"<@&{job.role_id}>"
+        if job.status == "running":
+            embed = discord.Embed(
+                title="⚙️ Processing...",
+                description=f"{'Assigning' if job.action == 'add' else 'Removing'} the **{job.role_name}** role {preposition} {job.total} members.",
+                color=discord.Color.orange(),
+                timestamp=discord.utils.utcnow()
+            )
+            percent = job.processed / job.total * 100 if job.total else 100
+            embed.add_field(name="📈 Progress", value=f"{job.processed}/{job.total} ({percent:.0f}%)", inline=True)
+            eta = format_duration(job.remaining / job.rate) if job.rate else "—"
+            embed.add_field(name="⚡ Rate", value=f"{job.rate:.1f} members/s • ETA {eta}", inline=True)
+            footer = "Delirium Den • Processing Role Changes"
+        else:
+            cancelled = job.status == "cancelled"
+            embed = discord.Embed(
+                title=f"{'🛑' if cancelled else '✅'} Role {job.action.title()} {'Cancelled' if cancelled else 'Complete'}",
+                description=f"{'Assigned' if job.action == 'add' else 'Removed'} the **{job.role_name}** role {preposition} **{job.done}** members.",
+                color=discord.Color.red() if cancelled else discord.Color.green(),
+                timestamp=discord.utils.utcnow()
+            )
+            embed.add_field(
+                name="⏱️ Throughput",
+                value=f"{job.processed} members in {format_duration(job.elapsed)} ({job.rate:.1f} members/s)",
+                inline=False
+            )
+            footer = "Delirium Den • Role Management Complete"
+        
+        embed.add_field(
+            name="📊 Statistics",
+            value=f"**Success:** {job.done}\n**Skipped:** {job.skipped}\n**Failed:** {job.failed}\n**Remaining:** {job.remaining}",
+            inline=True
+        )
+        embed.add_field(name="🎭 Role", value=role_text, inline=True)
+        embed.add_field(name="👤 Performed By", value=job.requested_by, inline=True)
+        
+        if job.failed_ids:
+            failed_list = ', '.join(f"<@{member_id}>" for member_id in job.failed_ids)
+            if job.failed > len(job.failed_ids):
+                failed_list += f"... and {job.failed - len(job.failed_ids)} more"
+            embed.add_field(name="❌ Failed Members", value=failed_list, inline=False)
+        if progress and progress.recent_errors and job.status == "running":
+            embed.add_field(name="⚠️ Recent Errors", value="\n".join(progress.recent_errors[-3:])[:1024], inline=False)
+        
+        embed.set_footer(text=footer, icon_url="https://i.imgur.com/RzksmKL.png")
+        return embed
+    
+    def busy_embed(self, guild_id):
+        """Error embed if a role job is already running in this guild, else None"""
+        job = self.jobs.get(guild_id)
+        if job is None or job.status != "running":
+            return None
+        embed = discord.Embed(
+            title="⏳ Role Job Already Running",
+            description=f"A role {job.action} job for **{job.role_name}** is still running ({job.processed}/{job.total}).\nUse `!roleall_status` to check on it or `!roleall_cancel` to stop it.",
+            color=discord.Color.orange(),
+            timestamp=discord.utils.utcnow()
+        )
+        embed.set_footer(
+            text="Delirium Den • Role Management",
+            icon_url="https://i.imgur.com/RzksmKL.png"
+        )
+        return embed
     
     @app_commands.command(name="roleall", description="Add or remove a role from every member in the server")
     async def roleall_slash(self, interaction: discord.Interaction, role: discord.Role, action: Literal["add", "remove"]):
@@ -91,22 +266,23 @@ class RoleAll(commands.Cog):
             await interaction.response.send_message(embed=error_embed, ephemeral=True)
             return
         
-        # Get all members in the guild excluding bots
-        members = [member for member in interaction.guild.members if not member.bot]
+        busy_embed = self.busy_embed(interaction.guild.id)
+        if busy_embed:
+            await interaction.response.send_message(embed=busy_embed, ephemeral=True)
+            return
         
-        # Filter members based on action
+        # Humans with/without the role, straight from the member index bitsets
+        index = self.bot.member_index.get(interaction.guild)
         if action == "add":
-            target_members = [member for member in members if role not in member.roles]
+            target_ids = index.ids(index.humans & ~index.role(role.id))
             action_text = "assign"
-            action_past = "assigned"
             action_emoji = "➕"
         else:  # remove
-            target_members = [member for member in members if role in member.roles]
+            target_ids = index.ids(index.humans & index.role(role.id))
             action_text = "remove"
-            action_past = "removed"
             action_emoji = "➖"
         
-        if not target_members:
+        if not target_ids:
             info_embed = discord.Embed(
                 title="ℹ️ No Action Needed",
                 color=discord.Color.blue(),
@@ -125,7 +301,7 @@ class RoleAll(commands.Cog):
             )
             info_embed.add_field(
                 name="Total Members",
-                value=len(members),
+                value=index.human_count,
                 inline=True
             )
             info_embed.set_footer(
@@ -136,10 +312,10 @@ class RoleAll(commands.Cog):
             return
         
         # Create confirmation view
-        view = ConfirmView(role, len(target_members), action)
+        view = ConfirmView(role, len(target_ids), action)
         embed = discord.Embed(
             title=f"{action_emoji} Role {action.title()} Confirmation",
-            description=f"Are you sure you want to **{action_text}** the **{role.name}** role {'to' if action == 'add' else 'from'} **{len(target_members)}** members?",
+            description=f"Are you sure you want to **{action_text}** the **{role.name}** role {'to' if action == 'add' else 'from'} **{len(target_ids)}** members?",
             color=role.color or discord.Color.purple(),
             timestamp=discord.utils.utcnow()
         )
@@ -151,7 +327,7 @@ class RoleAll(commands.Cog):
         )
         embed.add_field(
             name="👥 Target Members",
-            value=len(target_members),
+            value=len(target_ids),
             inline=True
         )
         embed.add_field(
@@ -186,10 +362,16 @@ class RoleAll(commands.Cog):
         if not view.confirmed:
             return  # Already handled in the view
         
-        # Process the role assignment/removal
+        # Another job may have started while this one waited for confirmation
+        job = self.reserve_job(interaction.guild, role, action, target_ids, interaction.user, interaction.channel)
+        if job is None:
+            await interaction.followup.send(embed=self.busy_embed(interaction.guild.id), ephemeral=True)
+            return
+        
+        # Hand the work to a background job; its progress message lives in the channel so it survives restarts
         processing_embed = discord.Embed(
             title="⚙️ Processing...",
-            description=f"Please wait while I {action_text} the **{role.name}** role {'to' if action == 'add' else 'from'} {len(target_members)} members.",
+            description=f"Please wait while I {action_text} the **{role.name}** role {'to' if action == 'add' else 'from'} {len(target_ids)} members.",
             color=discord.Color.orange(),
             timestamp=discord.utils.utcnow()
         )
@@ -197,70 +379,12 @@ class RoleAll(commands.Cog):
             text="Delirium Den • Processing Role Changes",
             icon_url="https://i.imgur.com/RzksmKL.png"
         )
-        await interaction.followup.send(embed=processing_embed, ephemeral=True)
-        
-        # Add or remove the role
-        failed_members = []
-        success_count = 0
-        
-        for member in target_members:
-            try:
-                if action == "add":
-                    await member.add_roles(role, reason=f"Bulk role assignment by {interaction.user}")
-                else:
-                    await member.remove_roles(role, reason=f"Bulk role removal by {interaction.user}")
-                success_count += 1
-            except discord.Forbidden:
-                failed_members.append(member.name)
-            except discord.HTTPException:
-                failed_members.append(member.name)
-        
-        # Send final result
-        result_embed = discord.Embed(
-            title=f"✅ Role {action.title()} Complete",
-            color=discord.Color.green(),
-            timestamp=discord.utils.utcnow()
-        )
-        
-        if failed_members:
-            result_embed.description = f"Successfully {action_past} the **{role.name}** role {'to' if action == 'add' else 'from'} **{success_count}** members!"
-            
-            failed_list = ', '.join(failed_members[:10])
-            if len(failed_members) > 10:
-                failed_list += f"... and {len(failed_members) - 10} more"
-            
-            result_embed.add_field(
-                name="❌ Failed Members",
-                value=failed_list,
-                inline=False
-            )
-        else:
-            result_embed.description = f"Successfully {action_past} the **{role.name}** role {'to' if action == 'add' else 'from'} all **{success_count}** members!"
-        
-        result_embed.add_field(
-            name="📊 Statistics",
-            value=f"**Success:** {success_count}\n**Failed:** {len(failed_members)}\n**Total Processed:** {len(target_members)}",
-            inline=True
-        )
-        
-        result_embed.add_field(
-            name="🎭 Role",
-            value=role.mention,
-            inline=True
-        )
-        
-        result_embed.add_field(
-            name="👤 Performed By",
-            value=interaction.user.mention,
-            inline=True
-        )
-        
-        result_embed.set_footer(
-            text="Delirium Den • Role Management Complete",
-            icon_url="https://i.imgur.com/RzksmKL.png"
-        )
-        
-        await interaction.followup.send(embed=result_embed, ephemeral=True)
+        try:
+            message = await interaction.channel.send(embed=processing_embed)
+        except Exception:
+            self.release_job(interaction.guild, job)
+            raise
+        self.start_job(interaction.guild, job, message)
     
     @commands.command(name="roleall")
     @commands.has_permissions(manage_roles=True)
@@ -332,22 +456,23 @@ class RoleAll(commands.Cog):
             await ctx.send(embed=error_embed)
             return
         
-        # Get all members in the guild excluding bots
-        members = [member for member in ctx.guild.members if not member.bot]
+        busy_embed = self.busy_embed(ctx.guild.id)
+        if busy_embed:
+            await ctx.send(embed=busy_embed)
+            return
         
-        # Filter members based on action
+        # Humans with/without the role, straight from the member index bitsets
+        index = self.bot.member_index.get(ctx.guild)
         if action == "add":
-            target_members = [member for member in members if role not in member.roles]
+            target_ids = index.ids(index.humans & ~index.role(role.id))
             action_text = "assign"
-            action_past = "assigned"
             action_emoji = "➕"
         else:  # remove
-            target_members = [member for member in members if role in member.roles]
+            target_ids = index.ids(index.humans & index.role(role.id))
             action_text = "remove"
-            action_past = "removed"
             action_emoji = "➖"
         
-        if not target_members:
+        if not target_ids:
             info_embed = discord.Embed(
                 title="ℹ️ No Action Needed",
                 color=discord.Color.blue(),
@@ -366,7 +491,7 @@ class RoleAll(commands.Cog):
             )
             info_embed.add_field(
                 name="Total Members",
-                value=len(members),
+                value=index.human_count,
                 inline=True
             )
             info_embed.set_footer(
@@ -379,7 +504,7 @@ class RoleAll(commands.Cog):
         # Ask for confirmation
         confirm_embed = discord.Embed(
             title=f"{action_emoji} Role {action.title()} Confirmation",
-            description=f"Are you sure you want to **{action_text}** the **{role.name}** role {'to' if action == 'add' else 'from'} **{len(target_members)}** members?",
+            description=f"Are you sure you want to **{action_text}** the **{role.name}** role {'to' if action == 'add' else 'from'} **{len(target_ids)}** members?",
             color=role.color or discord.Color.purple(),
             timestamp=discord.utils.utcnow()
         )
@@ -391,7 +516,7 @@ class RoleAll(commands.Cog):
         )
         confirm_embed.add_field(
             name="👥 Target Members",
-            value=len(target_members),
+            value=len(target_ids),
             inline=True
         )
         confirm_embed.add_field(
@@ -449,10 +574,16 @@ class RoleAll(commands.Cog):
             await ctx.send(embed=cancelled_embed)
             return
         
+        # Another job may have started while this one waited for confirmation
+        job = self.reserve_job(ctx.guild, role, action, target_ids, ctx.author, ctx.channel)
+        if job is None:
+            await ctx.send(embed=self.busy_embed(ctx.guild.id))
+            return
+        
         # Send processing message
         processing_embed = discord.Embed(
             title="⚙️ Processing...",
-            description=f"Please wait while I {action_text} the **{role.name}** role {'to' if action == 'add' else 'from'} {len(target_members)} members.",
+            description=f"Please wait while I {action_text} the **{role.name}** role {'to' if action == 'add' else 'from'} {len(target_ids)} members.",
             color=discord.Color.orange(),
             timestamp=discord.utils.utcnow()
         )
@@ -460,70 +591,66 @@ class RoleAll(commands.Cog):
             text="Delirium Den • Processing Role Changes",
             icon_url="https://i.imgur.com/RzksmKL.png"
         )
-        message = await ctx.send(embed=processing_embed)
-        
-        # Add or remove the role
-        failed_members = []
-        success_count = 0
-        
-        for member in target_members:
-            try:
-                if action == "add":
-                    await member.add_roles(role, reason=f"Bulk role assignment by {ctx.author}")
-                else:
-                    await member.remove_roles(role, reason=f"Bulk role removal by {ctx.author}")
-                success_count += 1
-            except discord.Forbidden:
-                failed_members.append(member.name)
-            except discord.HTTPException:
-                failed_members.append(member.name)
-        
-        # Send final result
-        result_embed = discord.Embed(
-            title=f"✅ Role {action.title()} Complete",
-            color=discord.Color.green(),
-            timestamp=discord.utils.utcnow()
-        )
-        
-        if failed_members:
-            result_embed.description = f"Successfully {action_past} the **{role.name}** role {'to' if action == 'add' else 'from'} **{success_count}** members!"
-            
-            failed_list = ', '.join(failed_members[:10])
-            if len(failed_members) > 10:
-                failed_list += f"... and {len(failed_members) - 10} more"
-            
-            result_embed.add_field(
-                name="❌ Failed Members",
-                value=failed_list,
-                inline=False
+        try:
+            message = await ctx.send(embed=processing_embed)
+        except Exception:
+            self.release_job(ctx.guild, job)
+            raise
+        self.start_job(ctx.guild, job, message)
+
+    @commands.command(name="roleall_status", aliases=["rolestatus"])
+    @commands.has_permissions(manage_roles=True)
+    async def roleall_status(self, ctx):
+        """Show the running (or last) bulk role job in this server"""
+        job = self.jobs.get(ctx.guild.id)
+        if job is None:
+            info_embed = discord.Embed(
+                title="ℹ️ No Role Jobs",
+                description="No bulk role job has been run in this server yet.",
+                color=discord.Color.blue(),
+                timestamp=discord.utils.utcnow()
             )
-        else:
-            result_embed.description = f"Successfully {action_past} the **{role.name}** role {'to' if action == 'add' else 'from'} all **{success_count}** members!"
-        
-        result_embed.add_field(
-            name="📊 Statistics",
-            value=f"**Success:** {success_count}\n**Failed:** {len(failed_members)}\n**Total Processed:** {len(target_members)}",
-            inline=True
-        )
-        
-        result_embed.add_field(
-            name="🎭 Role",
-            value=role.mention,
-            inline=True
-        )
+            info_embed.set_footer(
+                text="Delirium Den • Role Management",
+                icon_url="https://i.imgur.com/RzksmKL.png"
+            )
+            await ctx.send(embed=info_embed)
+            return
+        await ctx.send(embed=self.job_embed(job))
+
+    @commands.command(name="roleall_cancel", aliases=["rolecancel"])
+    @commands.has_permissions(manage_roles=True)
+    async def roleall_cancel(self, ctx):
+        """Stop the running bulk role job; members already changed keep the change"""
+        job = self.jobs.get(ctx.guild.id)
+        if job is None or job.status != "running":
+            info_embed = discord.Embed(
+                title="ℹ️ Nothing To Cancel",
+                description="There is no bulk role job running in this server.",
+                color=discord.Color.blue(),
+                timestamp=discord.utils.utcnow()
+            )
+            info_embed.set_footer(
+                text="Delirium Den • Role Management",
+                icon_url="https://i.imgur.com/RzksmKL.png"
+            )
+            await ctx.send(embed=info_embed)
+            return
         
-        result_embed.add_field(
-            name="👤 Performed By",
-            value=ctx.author.mention,
-            inline=True
+        job.cancel()
+        self.jobs.checkpoint()
+        cancelled_embed = discord.Embed(
+            title="🛑 Role Job Cancelled",
+            description=f"Stopped the role {job.action} job for **{job.role_name}** after {job.processed}/{job.total} members.",
+            color=discord.Color.red(),
+            timestamp=discord.utils.utcnow()
         )
-        
-        result_embed.set_footer(
-            text="Delirium Den • Role Management Complete",
+        cancelled_embed.add_field(name="Cancelled By", value=ctx.author.mention, inline=True)
+        cancelled_embed.set_footer(
+            text="Delirium Den • Cancelled",
             icon_url="https://i.imgur.com/RzksmKL.png"
         )
-        
-        await message.edit(embed=result_embed)
+        await ctx.send(embed=cancelled_embed)
 
     @commands.command(name="addrole")
     @commands.has_permissions(manage_roles=True)
@@ -550,7 +677,7 @@ class RoleAll(commands.Cog):
         
         help_embed.add_field(
             name="📋 Available Commands",
-            value="```/roleall <add/remove> @role\n!roleall <add/remove> @role\n!addrole @role\n!removerole @role```",
+            value="```/roleall <add/remove> @role\n!roleall <add/remove> @role\n!addrole @role\n!removerole @role\n!roleall_status\n!roleall_cancel```",
             inline=False
         )
         
@@ -562,7 +689,7 @@ class RoleAll(commands.Cog):
         
         help_embed.add_field(
             name="🔧 Prefix Commands",
-            value="• `!roleall add @role` - Add role to all members\n• `!roleall remove @role` - Remove role from all members\n• `!addrole @role` - Shortcut for adding roles\n• `!removerole @role` - Shortcut for removing roles",
+            value="• `!roleall add @role` - Add role to all members\n• `!roleall remove @role` - Remove role from all members\n• `!addrole @role` - Shortcut for adding roles\n• `!removerole @role` - Shortcut for removing roles\n• `!roleall_status` - Progress of the running (or last) job\n• `!roleall_cancel` - Stop the running job",
             inline=False
         )
         
@@ -574,7 +701,7 @@ class RoleAll(commands.Cog):
         
         help_embed.add_field(
             name="🔒 Safety Features",
-            value="• 30-second confirmation timeout\n• Detailed progress reporting\n• Error handling for failed operations\n• Statistics on successful/failed changes",
+            value="• 30-second confirmation timeout\n• Live progress with rate and ETA\n• Jobs resume automatically after a restart\n• One job per server at a time\n• Statistics on successful/failed changes",
             inline=False
         )
         
@@ -192,16 +192,17 @@ class RoleUserExtractor(commands.Cog):
         """
         try:
             guild = ctx.guild
+            index = self.bot.member_index.get(guild)
             staff_data = {}
-            already_listed = set()  # Track users who have already been listed
+            already_listed = 0  # Bitset of users who have already been listed
             
             # Collect data for each role
             for role_id in self.target_roles:
                 role = guild.get_role(role_id)
-                if role and role.members:
+                if role and index.role(role_id):
                     staff_data[role_id] = {
                         'role': role,
-                        'members': role.members,
+                        'members': index.role(role_id),
                         'hierarchy_weight': self.role_hierarchy.get(role_id, 999)
                     }
             
@@ -229,41 +230,40 @@ class RoleUserExtractor(commands.Cog):
             # Add fields for each role in hierarchy order
             for role_id, data in sorted_roles:
                 role = data['role']
-                all_members = data['members']
                 
                 # Filter out users who have already been listed in higher roles
-                unique_members = [member for member in all_members if member.id not in already_listed]
+                unique_mask = data['members'] & ~already_listed
+                unique_count = index.count(unique_mask)
                 
-                if not unique_members:
+                if not unique_count:
                     continue
                 
                 # Add these users to the already_listed set
-                for member in unique_members:
-                    already_listed.add(member.id)
+                already_listed |= unique_mask
                 
-                total_staff += len(unique_members)
+                total_staff += unique_count
                 
-                # Create member list
+                # Create member list; only the members shown are looked up
                 if detailed:
                     # Detailed view with user info
                     member_list = []
-                    for member in unique_members[:10]:  # Limit to prevent embed size issues
+                    for member in index.members(guild, unique_mask, limit=10):  # Limit to prevent embed size issues
                         status_emoji = self._get_status_emoji(member.status)
                         member_list.append(f"{status_emoji} {member.display_name}")
                     
-                    if len(unique_members) > 10:
-                        member_list.append(f"... and {len(unique_members) - 10} more")
+                    if unique_count > 10:
+                        member_list.append(f"... and {unique_count - 10} more")
                     
                     member_text = "\n".join(member_list) if member_list else "No unique members"
                 else:
                     # Simple view with just names
-                    member_names = [member.display_name for member in unique_members[:15]]
-                    if len(unique_members) > 15:
-                        member_names.append(f"... +{len(unique_members) - 15} more")
+                    member_names = [member.display_name for member in index.members(guild, unique_mask, limit=15)]
+                    if unique_count > 15:
+                        member_names.append(f"... +{unique_count - 15} more")
                     member_text = ", ".join(member_names) if member_names else "No unique members"
                 
                 embed.add_field(
-                    name=f"{role.name} ({len(unique_members)})",
+                    name=f"{role.name} ({unique_count})",
                     value=member_text,
                     inline=False
                 )
@@ -289,8 +289,9 @@ class RoleUserExtractor(commands.Cog):
         """
         try:
             guild = ctx.guild
+            index = self.bot.member_index.get(guild)
             staff_data = {}
-            already_counted = set()  # Track users who have already been counted
+            already_counted = 0  # Bitset of users who have already been counted
             
             # Collect data for each role
             for role_id in self.target_roles:
@@ -298,7 +299,7 @@ class RoleUserExtractor(commands.Cog):
                 if role:
                     staff_data[role_id] = {
                         'role': role,
-                        'all_members': role.members,
+                        'all_members': index.role(role_id),
                         'hierarchy_weight': self.role_hierarchy.get(role_id, 999)
                     }
             
@@ -320,17 +321,15 @@ class RoleUserExtractor(commands.Cog):
                 all_members = data['all_members']
                 
                 # Count only unique members (not already counted in higher roles)
-                unique_members = [member for member in all_members if member.id not in already_counted]
-                unique_count = len(unique_members)
+                unique_count = index.count(all_members & ~already_counted)
                 
                 # Add these users to the already_counted set
-                for member in unique_members:
-                    already_counted.add(member.id)
+                already_counted |= all_members
                 
                 total_staff += unique_count
                 
                 # Add role info (show both total and unique counts)
-                total_count = len(all_members)
+                total_count = index.count(all_members)
                 if unique_count != total_count:
                     role_info.append(f"**{role.name}**: {unique_count} unique ({total_count} total)")
                 else:
@@ -355,6 +354,7 @@ class RoleUserExtractor(commands.Cog):
     async def list_target_roles(self, ctx):
         """List all target roles and their current member counts"""
         guild = ctx.guild
+        index = self.bot.member_index.get(guild)
         embed = discord.Embed(
             title="🎭 Target Roles Status",
             description="Current status of all target roles:",
@@ -366,7 +366,7 @@ class RoleUserExtractor(commands.Cog):
             if role:
                 embed.add_field(
                     name=f"{role.name}",
-                    value=f"ID: {role_id}\nMembers: {len(role.members)}",
+                    value=f"ID: {role_id}\nMembers: {index.role_count(role_id)}",
                     inline=True
                 )
             else:
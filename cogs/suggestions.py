@@ -1,14 +1,13 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
-import os
 from datetime import datetime
 
 class Suggestions(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.data_file = 'suggestions_data.json'
+        self.storage = bot.storage
         self.suggestions_data = self.load_data()
         self.next_suggestion_id = self.get_next_id()
         
@@ -22,19 +21,15 @@ class Suggestions(commands.Cog):
         }
         
     def load_data(self):
-        """Load suggestions data from JSON file"""
-        if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        return {
+        """Load suggestions data from the shared store"""
+        return self.storage.load(self.data_file, lambda: {
             'suggestions': {},
             'settings': {}
-        }
+        })
     
     def save_data(self):
-        """Save suggestions data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.suggestions_data, f, indent=4)
+        """Queue suggestions data for the next storage flush"""
+        self.storage.mark_dirty(self.data_file)
     
     def get_next_id(self):
         """Get the next suggestion ID"""
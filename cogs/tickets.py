@@ -8,6 +8,31 @@ import json
 import asyncio
 from datetime import datetime
 
+from utils.ticket_registry import TicketRegistry
+from utils.transcripts import export_transcript
+
+# Transcript output: txt, jsonl or html; compressed with gzip, zstd or none
+TRANSCRIPT_FORMAT = os.getenv('TRANSCRIPT_FORMAT', 'html')
+TRANSCRIPT_COMPRESSION = os.getenv('TRANSCRIPT_COMPRESSION', 'gzip')
+
+def format_duration(seconds):
+    """Compact duration like 1h 5m or 42s"""
+    seconds = int(seconds)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds}s"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h"
+
+def get_registry(client):
+    """The Tickets cog's registry, for views that only have the interaction"""
+    return client.get_cog("Tickets").registry
+
 class TicketButton(ui.Button):
     def __init__(self):
         super().__init__(
@@ -18,9 +43,16 @@ class TicketButton(ui.Button):
         )
 
     async def callback(self, interaction: discord.Interaction):
+        registry = get_registry(interaction.client)
+
         # Check if user already has an open ticket
-        for channel in interaction.guild.text_channels:
-            if channel.name == f"ticket-{interaction.user.name.lower()}":
+        existing_id = registry.channel_for(interaction.guild.id, interaction.user.id)
+        if existing_id:
+            channel = interaction.guild.get_channel(existing_id)
+            if channel is None:
+                # Deleted without us seeing it; forget it and carry on
+                registry.remove(existing_id)
+            else:
                 error_embed = discord.Embed(
                     title="❌ Ticket Already Exists",
                     description="You already have an open ticket! Please use your existing ticket or close it first.",
@@ -61,6 +93,7 @@ class TicketButton(ui.Button):
             overwrites=overwrites,
             topic=f"Support ticket for {interaction.user.name} • Created {datetime.now().strftime('%Y-%m-%d %H:%M')}"
         )
+        registry.open(interaction.guild.id, channel.id, interaction.user.id, interaction.user.name)
 
         # Send initial message
         embed = discord.Embed(
@@ -217,45 +250,32 @@ class ClosureReasonModal(ui.Modal, title="🎭 Delirium Den Ticket Closure"):
         )
         await interaction.channel.send(embed=closure_embed)
 
-        # Create transcript
-        transcript = []
-        transcript.append(f"=== DELIRIUM DEN TICKET TRANSCRIPT ===")
-        transcript.append(f"Ticket: {interaction.channel.name}")
-        transcript.append(f"Closed by: {interaction.user.name} ({interaction.user.id})")
-        transcript.append(f"Closed at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}")
-        transcript.append(f"Reason: {self.reason.value}")
-        transcript.append(f"=" * 50)
-        transcript.append("")
-        
-        async for message in interaction.channel.history(limit=None, oldest_first=True):
-            timestamp = message.created_at.strftime('%Y-%m-%d %H:%M:%S UTC')
-            author = f"{message.author.name}#{message.author.discriminator}"
-            content = message.content if message.content else "[No text content]"
-            
-            if message.embeds:
-                content += f" [Embed: {len(message.embeds)} embed(s)]"
-            if message.attachments:
-                content += f" [Attachments: {', '.join([att.filename for att in message.attachments])}]"
-                
-            transcript.append(f"[{timestamp}] {author}: {content}")
+        registry = get_registry(interaction.client)
+        record = registry.close(interaction.channel.id)
 
-        # Save transcript
-        transcript_text = "\n".join(transcript)
-        filename = f"delirium-den-transcript-{interaction.channel.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt"
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(transcript_text)
+        # Stream the transcript to a compressed temp file, page by page
+        closed_at = datetime.now()
+        try:
+            transcript = await export_transcript(
+                interaction.channel,
+                {
+                    "Ticket": interaction.channel.name,
+                    "Closed by": f"{interaction.user.name} ({interaction.user.id})",
+                    "Closed at": closed_at.strftime('%Y-%m-%d %H:%M:%S UTC'),
+                    "Reason": self.reason.value,
+                },
+                fmt=TRANSCRIPT_FORMAT,
+                compression=TRANSCRIPT_COMPRESSION,
+            )
+        except Exception as e:
+            print(f"Error creating transcript: {str(e)}")
+            transcript = None
+        filename = f"delirium-den-transcript-{interaction.channel.name}-{closed_at.strftime('%Y%m%d-%H%M%S')}"
+        if transcript:
+            filename += transcript.extension
 
-        # Extract original ticket creator name (works for both "ticket-name" and "claimed-name" formats)
-        ticket_creator_name = interaction.channel.name.split("-", 1)[1]
-        members = interaction.guild.members
-        ticket_creator = None
-        
-        # Try to find the ticket creator by username
-        for member in members:
-            if member.name.lower() == ticket_creator_name:
-                ticket_creator = member
-                break
+        # Look up the ticket creator by id (survives renames of the user or channel)
+        ticket_creator = interaction.guild.get_member(record["owner_id"]) if record else None
         
         if ticket_creator:
             try:
@@ -289,10 +309,13 @@ class ClosureReasonModal(ui.Modal, title="🎭 Delirium Den Ticket Closure"):
                     icon_url="https://i.imgur.com/RzksmKL.png"
                 )
                 
-                await ticket_creator.send(
-                    embed=closure_dm_embed,
-                    file=discord.File(filename)
-                )
+                if transcript:
+                    await ticket_creator.send(
+                        embed=closure_dm_embed,
+                        file=discord.File(transcript.path, filename=filename)
+                    )
+                else:
+                    await ticket_creator.send(embed=closure_dm_embed)
             except Exception as e:
                 error_embed = discord.Embed(
                     title="⚠️ Warning",
@@ -335,10 +358,12 @@ class ClosureReasonModal(ui.Modal, title="🎭 Delirium Den Ticket Closure"):
         
         try:
             await interaction.channel.delete()
-            # Clean up transcript file after channel is deleted
-            os.remove(filename)
         except Exception as e:
-            print(f"Error deleting channel or cleaning up file: {str(e)}")
+            print(f"Error deleting channel: {str(e)}")
+        finally:
+            # Clean up transcript file whether or not the channel went away
+            if transcript:
+                transcript.discard()
 
 class CloseButton(ui.Button):
     def __init__(self):
@@ -402,13 +427,9 @@ class ClaimButton(ui.Button):
             await interaction.followup.send(embed=error_embed, ephemeral=True)
             return
             
-        # Get the ticket creator
+        # Get the ticket creator name
         ticket_creator_name = interaction.channel.name.replace("ticket-", "")
-        ticket_creator = None
-        for member in interaction.guild.members:
-            if member.name.lower() == ticket_creator_name:
-                ticket_creator = member
-                break
+        get_registry(interaction.client).claim(interaction.channel.id, interaction.user.id)
                 
         # Update channel name to show it's claimed
         await interaction.channel.edit(
@@ -497,6 +518,7 @@ class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.tickets_channel_id = int(os.getenv('TICKETS_CHANNEL_ID'))
+        self.registry = TicketRegistry(bot.storage)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -507,9 +529,67 @@ class Tickets(commands.Cog):
         self.bot.add_view(PersistentTicketView())
         self.bot.add_view(TicketControls())
         
+        self.reconcile_registry()
+        
         # Set up ticket panel
         await self.setup_ticket_panel()
 
+    @staticmethod
+    def is_ticket_channel(channel):
+        return isinstance(channel, discord.TextChannel) and channel.name.startswith(("ticket-", "claimed-"))
+
+    def adopt_channel(self, channel):
+        """Register a ticket channel we have no record of (created while offline or before the registry)"""
+        owner_name = channel.name.split("-", 1)[1]
+        owners = [
+            target for target in channel.overwrites
+            if isinstance(target, discord.Member) and not target.bot
+        ]
+        if not owners:
+            return None
+        # The owner has a member overwrite; prefer the one whose name the channel carries
+        owner = next((m for m in owners if m.name.lower() == owner_name), owners[0])
+        record = self.registry.open(
+            channel.guild.id, channel.id, owner.id, owner.name,
+            now=channel.created_at.timestamp()
+        )
+        if channel.name.startswith("claimed-"):
+            record["status"] = "claimed"
+        return record
+
+    def reconcile_registry(self):
+        """Drop tickets whose channels are gone and adopt untracked ticket channels"""
+        for guild in self.bot.guilds:
+            for channel_id in self.registry.channels(guild.id):
+                if guild.get_channel(channel_id) is None:
+                    self.registry.remove(channel_id)
+            for channel in guild.text_channels:
+                if self.is_ticket_channel(channel) and channel.id not in self.registry:
+                    self.adopt_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        if self.is_ticket_channel(channel) and channel.id not in self.registry:
+            self.adopt_channel(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        self.registry.remove(channel.id)
+
+    def cog_load(self):
+        # Bot messages count towards the activity too; other channels never reach the handler
+        self.bot.messages.register(
+            "tickets", self.handle_message, priority=30, channels=self.registry, include_bots=True
+        )
+
+    def cog_unload(self):
+        self.bot.messages.unregister("tickets")
+
+    async def handle_message(self, message):
+        """Keep per-ticket activity counters current"""
+        is_staff = any(role.name == "Staff" for role in getattr(message.author, "roles", ()))
+        self.registry.record_message(message.channel.id, message.author.id, is_staff, message.author.bot)
+
     async def setup_ticket_panel(self):
         """Set up the ticket panel"""
         channel = self.bot.get_channel(self.tickets_channel_id)
@@ -662,8 +742,8 @@ class Tickets(commands.Cog):
             return
 
         # Don't allow removing the ticket creator
-        ticket_creator_name = interaction.channel.name.split("-", 1)[1]
-        if user.name.lower() == ticket_creator_name:
+        record = self.registry.get(interaction.channel.id)
+        if record and user.id == record["owner_id"]:
             error_embed = discord.Embed(
                 title="❌ Cannot Remove Ticket Owner",
                 description="You cannot remove the ticket creator from their own ticket!",
@@ -814,6 +894,7 @@ class Tickets(commands.Cog):
         
         # Get the ticket creator name
         ticket_creator_name = interaction.channel.name.replace("ticket-", "")
+        self.registry.claim(interaction.channel.id, interaction.user.id)
         
         # Update channel name to show it's claimed
         await interaction.channel.edit(
@@ -884,23 +965,29 @@ class Tickets(commands.Cog):
             return
 
         # Parse ticket information
-        is_claimed = interaction.channel.name.startswith("claimed-")
-        ticket_creator_name = interaction.channel.name.split("-", 1)[1]
-        
-        # Find ticket creator
-        ticket_creator = None
-        for member in interaction.guild.members:
-            if member.name.lower() == ticket_creator_name:
-                ticket_creator = member
-                break
+        record = self.registry.get(interaction.channel.id)
+        if record:
+            is_claimed = record["status"] == "claimed"
+            ticket_creator_name = record["owner_name"]
+            ticket_creator = interaction.guild.get_member(record["owner_id"])
+        else:
+            is_claimed = interaction.channel.name.startswith("claimed-")
+            ticket_creator_name = interaction.channel.name.split("-", 1)[1]
+            ticket_creator = None
 
         # Get channel creation time
         channel_created = interaction.channel.created_at
         
-        # Count messages
-        message_count = 0
-        async for message in interaction.channel.history(limit=None):
-            message_count += 1
+        # Activity counters are kept by on_message, so no history scan here
+        message_count = record.get("message_count", 0) if record else 0
+        stats_lines = [f"**Messages:** {message_count}"]
+        if record:
+            stats_lines.append(f"**Participants:** {len(record.get('participants', []))}")
+            response = self.registry.response_seconds(record)
+            stats_lines.append(f"**First Staff Response:** {format_duration(response) if response is not None else 'Awaiting staff'}")
+            if record.get("last_activity"):
+                stats_lines.append(f"**Last Activity:** <t:{int(record['last_activity'])}:R>")
+        stats_lines.append(f"**Active For:** <t:{int(channel_created.timestamp())}:R>")
 
         info_embed = discord.Embed(
             title="🎭 Ticket Information",
@@ -930,7 +1017,7 @@ class Tickets(commands.Cog):
             
         info_embed.add_field(
             name="📊 Statistics",
-            value=f"**Messages:** {message_count}\n**Active For:** <t:{int(channel_created.timestamp())}:R>",
+            value="\n".join(stats_lines),
             inline=True
         )
         
@@ -959,6 +1046,39 @@ class Tickets(commands.Cog):
         
         await interaction.response.send_message(embed=info_embed, ephemeral=True)
 
+    @app_commands.command(name="ticket_stats", description="Show ticket response-time statistics")
+    @app_commands.checks.has_permissions(manage_channels=True)
+    async def ticket_stats(self, interaction: discord.Interaction):
+        """Show SLA statistics from the ticket registry"""
+        report = self.registry.report(interaction.guild.id)
+        
+        stats_embed = discord.Embed(
+            title="📊 Ticket Statistics",
+            description="Response times across open and recently closed Delirium Den tickets.",
+            color=discord.Color.purple(),
+            timestamp=datetime.utcnow()
+        )
+        stats_embed.add_field(
+            name="🎫 Tickets",
+            value=f"**Open:** {report['open']}\n**Awaiting Staff:** {report['awaiting_staff']}\n**Tracked:** {report['total']}",
+            inline=True
+        )
+        stats_embed.add_field(
+            name="⏱️ First Staff Response",
+            value=(
+                f"**Answered:** {report['answered']}\n"
+                f"**Median:** {format_duration(report['median_response']) if report['median_response'] is not None else 'N/A'}\n"
+                f"**90th Percentile:** {format_duration(report['p90_response']) if report['p90_response'] is not None else 'N/A'}"
+            ),
+            inline=True
+        )
+        stats_embed.set_footer(
+            text="Delirium Den • Ticket Statistics",
+            icon_url="https://i.imgur.com/RzksmKL.png"
+        )
+        
+        await interaction.response.send_message(embed=stats_embed, ephemeral=True)
+
     @app_commands.command(name="ticket_help", description="Get help with ticket system commands")
     async def ticket_help(self, interaction: discord.Interaction):
         """Get help with ticket system commands"""
@@ -977,7 +1097,7 @@ class Tickets(commands.Cog):
         
         help_embed.add_field(
             name="🛠️ Ticket Commands",
-            value="```/ticket_close - Close the current ticket\n/ticket_add @user - Add someone to ticket\n/ticket_remove @user - Remove someone from ticket\n/ticket_claim - Claim ticket (Staff only)\n/ticket_rename <name> - Rename the ticket\n/ticket_info - View ticket information```",
+            value="```/ticket_close - Close the current ticket\n/ticket_add @user - Add someone to ticket\n/ticket_remove @user - Remove someone from ticket\n/ticket_claim - Claim ticket (Staff only)\n/ticket_rename <name> - Rename the ticket\n/ticket_info - View ticket information\n/ticket_stats - Response-time statistics (Staff)```",
             inline=False
         )
         
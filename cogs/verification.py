@@ -220,9 +220,11 @@ class Verification(commands.Cog):
             await interaction.response.send_message(f"❌ Unverified role not found.", ephemeral=True)
             return
         
-        # Count members
-        total_members = len([m for m in interaction.guild.members if not m.bot])
-        unverified_members = len(unverified_role.members)
+        # Count members from the member index bitsets
+        index = self.bot.member_index.get(interaction.guild)
+        unverified_mask = index.role(unverified_role.id)
+        total_members = index.human_count
+        unverified_members = index.count(unverified_mask)
         verified_members = total_members - unverified_members
         
         embed = discord.Embed(
@@ -258,9 +260,9 @@ class Verification(commands.Cog):
         
         # Show some unverified members (up to 10)
         if unverified_members > 0:
-            unverified_list = [m.mention for m in unverified_role.members[:10]]
-            if len(unverified_role.members) > 10:
-                unverified_list.append(f"... and {len(unverified_role.members) - 10} more")
+            unverified_list = [f"<@{member_id}>" for member_id in index.ids(unverified_mask, limit=10)]
+            if unverified_members > 10:
+                unverified_list.append(f"... and {unverified_members - 10} more")
             
             embed.add_field(
                 name="🔒 Unverified Members",
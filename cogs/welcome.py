@@ -41,8 +41,11 @@ class Welcome(commands.Cog):
             print(f"🎭 ❌ Welcome channel not found: {self.welcome_channel_id}")
             return
         
-        # Get member count (excluding bots)
-        member_count = len([m for m in member.guild.members if not m.bot])
+        # Get member count (excluding bots); this listener may run before the index's own
+        index = self.bot.member_index.get(member.guild)
+        if member.id not in index:
+            index.add(member)
+        member_count = index.human_count
         
         # Get current time in EST
         est = pytz.timezone('US/Eastern')
@@ -176,8 +179,10 @@ class Welcome(commands.Cog):
         leave_date = datetime.utcnow()
         time_in_server = leave_date - join_date if join_date else None
         
-        # Get current member count
-        current_member_count = len([m for m in member.guild.members if not m.bot])
+        # Get current member count (excluding bots)
+        index = self.bot.member_index.get(member.guild)
+        index.remove(member.id)
+        current_member_count = index.human_count
         
         embed = discord.Embed(
             title="👋 Farewell from the Den",
@@ -362,9 +367,10 @@ class Welcome(commands.Cog):
             inline=True
         )
         
+        index = self.bot.member_index.get(ctx.guild)
         info_embed.add_field(
             name="📊 Server Statistics",
-            value=f"**Total Members:** {ctx.guild.member_count}\n**Humans:** {len([m for m in ctx.guild.members if not m.bot])}\n**Bots:** {len([m for m in ctx.guild.members if m.bot])}",
+            value=f"**Total Members:** {ctx.guild.member_count}\n**Humans:** {index.human_count}\n**Bots:** {index.bot_count}",
             inline=True
         )
         
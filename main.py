@@ -7,6 +7,11 @@ from dotenv import load_dotenv
 from datetime import datetime, timedelta
 import json
 
+from utils.dispatch import MessageDispatcher
+from utils.ledger import EconomyLedger
+from utils.member_index import MemberIndex
+from utils.storage import JsonStore
+
 # Load environment variables
 load_dotenv()
 
@@ -17,8 +22,21 @@ class MyBot(commands.Bot):
     def __init__(self):
         super().__init__(command_prefix='!', intents=intents)
         self.last_sync_file = 'last_sync.json'
+        # Shared write-behind storage used by every stateful cog
+        self.storage = JsonStore()
+        # XP/credit ledger shared by the leveling and gambling cogs
+        self.ledger = EconomyLedger()
+        self.ledger.migrate_from_json('levels_data.json')
+        # Single on_message stage; cogs register handlers instead of listeners
+        disabled = os.getenv('DISABLED_MESSAGE_HANDLERS', '')
+        self.messages = MessageDispatcher(name.strip() for name in disabled.split(',') if name.strip())
+        # Role/bot bitsets per guild for admin commands that select members
+        self.member_index = MemberIndex()
+        self.member_index.attach(self)
         
     async def setup_hook(self):
+        self.storage.start()
+        
         # Load all cogs
         for filename in os.listdir('./cogs'):
             if filename.endswith('.py'):
@@ -41,6 +59,16 @@ class MyBot(commands.Bot):
             else:
                 print("⏳ Skipping auto-sync (too recent or rate limited)")
 
+    async def on_message(self, message):
+        await self.messages.dispatch(message)
+        await self.process_commands(message)
+
+    async def close(self):
+        await super().close()
+        # Persist whatever the cogs left pending once they have unloaded
+        await self.storage.close()
+        self.ledger.close()
+
     def should_sync(self):
         """Check if enough time has passed since last sync"""
         try:
@@ -226,6 +254,49 @@ async def debugcogs(ctx):
     debug_info.append(f"- Last Global Sync: {last_sync}")
     debug_info.append("")
     
+    # Storage flush counters
+    storage_stats = bot.storage.stats()
+    debug_info.append("**Storage:**")
+    debug_info.append(f"- Documents: {storage_stats['documents']} ({storage_stats['pending']} pending)")
+    debug_info.append(f"- Flushes: {storage_stats['flushes']} ({storage_stats['marks']} changes coalesced)")
+    debug_info.append(f"- Bytes Written: {storage_stats['bytes_written']:,}")
+    debug_info.append(f"- Flush Latency: {storage_stats['last_flush_ms']}ms last, {storage_stats['avg_flush_ms']}ms avg, {storage_stats['max_flush_ms']}ms max")
+    debug_info.append("")
+    
+    # Log webhook delivery
+    logging_cog = bot.get_cog("WebhookLogging")
+    if logging_cog:
+        webhook_stats = logging_cog.dispatcher.stats()
+        debug_info.append("**Log Webhook:**")
+        debug_info.append(f"- Delivered: {webhook_stats['sent']} embeds in {webhook_stats['batches']} calls ({webhook_stats['pending']} pending)")
+        debug_info.append(f"- Rate Limited: {webhook_stats['rate_limited']} • Dropped: {webhook_stats['dropped']} • Failed: {webhook_stats['failed']}")
+        debug_info.append("")
+    
+    # Member index
+    index_stats = bot.member_index.stats()
+    debug_info.append("**Member Index:**")
+    debug_info.append(f"- {index_stats['members']:,} members, {index_stats['roles']} role bitsets in {index_stats['guilds']} guild(s) ({index_stats['builds']} builds)")
+    debug_info.append("")
+    
+    # Message dispatch
+    debug_info.append("**Message Handlers:**")
+    for route in bot.messages.stats():
+        state = "" if route['enabled'] else " (disabled)"
+        debug_info.append(
+            f"- {route['name']}{state}: {route['calls']:,} calls, {route['avg_us']}µs avg, "
+            f"{route['max_us']}µs max, {route['errors']} errors"
+        )
+    debug_info.append("")
+    
+    # Cached replacement webhooks
+    monitor_cog = bot.get_cog("EmptyMessageCog")
+    if monitor_cog:
+        pool_stats = monitor_cog.webhooks.stats()
+        debug_info.append("**Replacement Webhooks:**")
+        debug_info.append(f"- Cached: {pool_stats['cached']} channels • Created: {pool_stats['created']} • Adopted: {pool_stats['adopted']}")
+        debug_info.append(f"- Queued Replacements: {sum(len(q) for q in monitor_cog.replace_queues.values())}")
+        debug_info.append("")
+    
     # List all loaded cogs
     debug_info.append("**Loaded Cogs:**")
     for name, cog in bot.cogs.items():
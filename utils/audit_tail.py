@@ -0,0 +1,177 @@
+import asyncio
+import time
+from collections import deque
+from datetime import timedelta
+
+import discord
+
+
+class _Waiter:
+    __slots__ = ("key", "match", "since", "deadline", "future")
+
+    def __init__(self, key, match, since, deadline, future):
+        self.key = key
+        self.match = match
+        self.since = since
+        self.deadline = deadline
+        self.future = future
+
+    def wants(self, entry):
+        target_id = getattr(entry.target, "id", None)
+        if self.key not in ((entry.action, target_id), (entry.action, None)):
+            return False
+        return entry.created_at >= self.since and (self.match is None or self.match(entry))
+
+
+class GuildAuditTail:
+    """Recent audit log entries of one guild, indexed by (action, target_id).
+
+    Events that want an entry register a waiter. A single poller fetches
+    whatever is new since the last entry it saw (one request for every
+    waiting event, whatever the action) and hands matches out, so the number
+    of audit log requests follows the audit log volume rather than the
+    number of events asking.
+    """
+
+    def __init__(self, guild, retention=60.0, poll_delays=(0.5, 1.0, 1.5, 2.0), timeout=5.0):
+        self.guild = guild
+        self.retention = retention
+        self.poll_delays = poll_delays
+        self.timeout = timeout
+        self.last_id = None
+        self._index = {}    # (action, target_id) -> deque of entries, oldest first
+        self._arrivals = deque()  # every stored entry, in the order it was indexed
+        self._waiters = []
+        self._poller = None
+        self.fetches = 0
+
+    @staticmethod
+    def _keys(entry):
+        target_id = getattr(entry.target, "id", None)
+        return (entry.action, target_id), (entry.action, None)
+
+    def _store(self, entry):
+        for key in self._keys(entry):
+            self._index.setdefault(key, deque()).append(entry)
+        self._arrivals.append(entry)
+        if self.last_id is None or entry.id > self.last_id:
+            self.last_id = entry.id
+        self._prune()
+
+    def _prune(self):
+        """Drop entries older than the retention window, oldest arrivals first.
+
+        Each key's deque is in arrival order too, so an expired entry is always
+        at the head of its deques; every entry is removed once, which keeps the
+        cost per stored entry constant however many actions nobody asks about.
+        """
+        cutoff = discord.utils.utcnow() - timedelta(seconds=self.retention)
+        arrivals = self._arrivals
+        while arrivals and arrivals[0].created_at < cutoff:
+            entry = arrivals.popleft()
+            for key in self._keys(entry):
+                entries = self._index.get(key)
+                if entries and entries[0] is entry:
+                    entries.popleft()
+                    if not entries:
+                        del self._index[key]
+
+    def lookup(self, key, match, since):
+        """Newest indexed entry for key created at or after since that passes match"""
+        for entry in reversed(self._index.get(key, ())):
+            if entry.created_at < since:
+                break
+            if match is None or match(entry):
+                return entry
+        return None
+
+    def feed(self, entry):
+        """Add an entry (from a fetch or the gateway) and wake whoever was waiting for it"""
+        self._store(entry)
+        still_waiting = []
+        for waiter in self._waiters:
+            if waiter.future.done():
+                continue
+            if waiter.wants(entry):
+                waiter.future.set_result(entry)
+                continue
+            still_waiting.append(waiter)
+        self._waiters = still_waiting
+
+    async def _fetch(self):
+        self.fetches += 1
+        if self.last_id is None:
+            entries = [entry async for entry in self.guild.audit_logs(limit=25)]
+            entries.reverse()
+        else:
+            entries = [
+                entry async for entry in self.guild.audit_logs(limit=100, after=discord.Object(id=self.last_id))
+            ]
+        for entry in sorted(entries, key=lambda e: e.id):
+            self.feed(entry)
+
+    async def _poll(self):
+        """Fetch on a backoff while anyone is waiting; the first delay lets gateway entries arrive first"""
+        try:
+            step = 0
+            while True:
+                await asyncio.sleep(self.poll_delays[min(step, len(self.poll_delays) - 1)])
+                step += 1
+                self._waiters = [w for w in self._waiters if not w.future.done()]
+                if not self._waiters:
+                    return
+                try:
+                    await self._fetch()
+                except Exception as e:
+                    print(f"Error getting audit log entries: {e}")
+                # Give up on waiters whose entry never showed up
+                now = time.monotonic()
+                for waiter in self._waiters:
+                    if now >= waiter.deadline and not waiter.future.done():
+                        waiter.future.set_result(None)
+        finally:
+            self._poller = None
+            self._prune()
+
+    async def find(self, action, target_id=None, match=None, window=10.0):
+        """The entry for an event that just happened, or None after the poll delays run out"""
+        since = discord.utils.utcnow() - timedelta(seconds=window)
+        key = (action, target_id)
+        entry = self.lookup(key, match, since)
+        if entry is not None:
+            return entry
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(_Waiter(key, match, since, time.monotonic() + self.timeout, future))
+        if self._poller is None:
+            self._poller = asyncio.create_task(self._poll())
+        return await future
+
+
+class AuditLogCorrelator:
+    """GuildAuditTail per guild, created on first use"""
+
+    def __init__(self):
+        self._tails = {}
+
+    def tail(self, guild):
+        tail = self._tails.get(guild.id)
+        if tail is None:
+            tail = self._tails[guild.id] = GuildAuditTail(guild)
+        else:
+            tail.guild = guild
+        return tail
+
+    def feed(self, entry):
+        self.tail(entry.guild).feed(entry)
+
+    async def find(self, guild, action, target_id=None, match=None):
+        if not guild.me.guild_permissions.view_audit_log:
+            return None
+        return await self.tail(guild).find(action, target_id, match)
+
+    def stats(self):
+        return {
+            "guilds": len(self._tails),
+            "fetches": sum(tail.fetches for tail in self._tails.values()),
+        }
@@ -0,0 +1,136 @@
+import time
+from collections import OrderedDict
+
+
+class CooldownMap:
+    """Last-use timestamps that forget themselves once the cooldown is over.
+
+    Keys are kept in the order they were last touched, and every entry shares
+    the same ttl, so expired entries are always at the front. Each touch pops
+    whatever has expired there; an entry is popped at most once, so expiry is
+    amortized O(1) and the map only ever holds keys used within the last
+    ``ttl`` seconds (capped at ``max_size``, oldest dropped first).
+    """
+
+    def __init__(self, ttl, max_size=100_000):
+        self.ttl = ttl  # May be changed at runtime (cooldown commands)
+        self.max_size = max_size
+        self._stamps = OrderedDict()
+
+    def __len__(self):
+        return len(self._stamps)
+
+    def __contains__(self, key):
+        """Whether key is still on cooldown"""
+        return self.remaining(key) > 0
+
+    def expire(self, now=None):
+        """Drop every entry whose cooldown has run out"""
+        now = time.monotonic() if now is None else now
+        stamps = self._stamps
+        removed = 0
+        while stamps:
+            key, stamp = next(iter(stamps.items()))
+            if now - stamp < self.ttl:
+                break
+            stamps.popitem(last=False)
+            removed += 1
+        return removed
+
+    def elapsed(self, key, now=None):
+        """Seconds since key was last touched, or None if it isn't tracked"""
+        stamp = self._stamps.get(key)
+        if stamp is None:
+            return None
+        return (time.monotonic() if now is None else now) - stamp
+
+    def remaining(self, key, now=None, ttl=None):
+        """Seconds left on key's cooldown (0 if it's free); ttl overrides the default"""
+        elapsed = self.elapsed(key, now)
+        if elapsed is None:
+            return 0
+        return max(0, (self.ttl if ttl is None else ttl) - elapsed)
+
+    def touch(self, key, now=None):
+        """Start key's cooldown now"""
+        now = time.monotonic() if now is None else now
+        stamps = self._stamps
+        stamps[key] = now
+        stamps.move_to_end(key)
+        self.expire(now)
+        while len(stamps) > self.max_size:
+            stamps.popitem(last=False)
+
+    def hit(self, key, now=None):
+        """Start key's cooldown unless it is already running; returns whether it was free"""
+        now = time.monotonic() if now is None else now
+        if self.remaining(key, now) > 0:
+            return False
+        self.touch(key, now)
+        return True
+
+    def pop(self, key, default=None):
+        return self._stamps.pop(key, default)
+
+    def restore(self, key, stamp):
+        """Put back a timestamp previously taken with pop"""
+        self._stamps[key] = stamp
+        self._stamps.move_to_end(key)
+
+
+class RecentEvents:
+    """How many times each key did something within a sliding window.
+
+    Only the newest ``limit`` timestamps per key are kept (enough to answer
+    "has this key hit the limit"), and keys whose newest event has left the
+    window are dropped the same amortized way as CooldownMap.
+    """
+
+    def __init__(self, window, limit, max_size=100_000):
+        self.window = window
+        self.limit = limit
+        self.max_size = max_size
+        self._events = OrderedDict()  # key -> list of timestamps, ordered by newest event
+
+    def __len__(self):
+        return len(self._events)
+
+    def expire(self, now=None):
+        now = time.monotonic() if now is None else now
+        events = self._events
+        removed = 0
+        while events:
+            key, stamps = next(iter(events.items()))
+            if now - stamps[-1] < self.window:
+                break
+            events.popitem(last=False)
+            removed += 1
+        return removed
+
+    def add(self, key, now=None):
+        now = time.monotonic() if now is None else now
+        stamps = self._events.get(key)
+        if stamps is None:
+            self._events[key] = [now]
+        else:
+            stamps.append(now)
+            if len(stamps) > self.limit:
+                del stamps[:-self.limit]
+            self._events.move_to_end(key)
+        self.expire(now)
+        while len(self._events) > self.max_size:
+            self._events.popitem(last=False)
+
+    def count(self, key, now=None):
+        """Events for key inside the window (at most limit)"""
+        stamps = self._events.get(key)
+        if not stamps:
+            return 0
+        now = time.monotonic() if now is None else now
+        return sum(1 for stamp in stamps if now - stamp < self.window)
+
+    def exceeded(self, key, now=None):
+        return self.count(key, now) >= self.limit
+
+    def pop(self, key, default=None):
+        return self._events.pop(key, default)
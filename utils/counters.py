@@ -0,0 +1,202 @@
+import heapq
+import time
+from array import array
+from datetime import datetime
+
+
+class CounterTable:
+    """Per-user counters packed into parallel int64 arrays.
+
+    A user id maps to a slot through one dict; ids and counts live in
+    ``array('q')``, which is also what gets serialized, so the stored form is
+    two flat int lists rather than a str-keyed object. Counts only go up (or
+    are cleared), so the ``top_k`` highest users are kept in a small sorted
+    list that only changes when a count passes its smallest entry, making
+    top(k) O(k).
+    """
+
+    def __init__(self, top_k=25):
+        self.top_k = top_k
+        self._slots = {}
+        self._ids = array('q')
+        self._counts = array('q')
+        self._top = []  # user ids, highest count first
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, user_id):
+        return user_id in self._slots
+
+    def _slot(self, user_id):
+        slot = self._slots.get(user_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._slots[user_id] = slot
+            self._ids.append(user_id)
+            self._counts.append(0)
+        return slot
+
+    def _count_of(self, user_id):
+        return self._counts[self._slots[user_id]]
+
+    def get(self, user_id):
+        slot = self._slots.get(user_id)
+        return 0 if slot is None else self._counts[slot]
+
+    def add(self, user_id, amount=1):
+        """Add to a user's count and return the new value"""
+        slot = self._slot(user_id)
+        count = self._counts[slot] + amount
+        self._counts[slot] = count
+
+        top = self._top
+        if user_id in top:
+            top.sort(key=self._count_of, reverse=True)
+        elif len(top) < self.top_k:
+            top.append(user_id)
+            top.sort(key=self._count_of, reverse=True)
+        elif count > self._count_of(top[-1]):
+            top[-1] = user_id
+            top.sort(key=self._count_of, reverse=True)
+        return count
+
+    def top(self, k=10):
+        """(user_id, count) for the k highest users"""
+        return [(user_id, self._count_of(user_id)) for user_id in self._top[:k]]
+
+    def total(self):
+        return sum(self._counts)
+
+    def items(self):
+        return zip(self._ids, self._counts)
+
+    def clear(self):
+        self._slots.clear()
+        self._ids = array('q')
+        self._counts = array('q')
+        self._top = []
+
+    def _rebuild_top(self):
+        best = heapq.nlargest(self.top_k, range(len(self._ids)), key=self._counts.__getitem__)
+        self._top = [self._ids[slot] for slot in best if self._counts[slot] > 0]
+
+    def to_json(self):
+        return {"ids": self._ids.tolist(), "counts": self._counts.tolist()}
+
+    @classmethod
+    def from_json(cls, data, top_k=25):
+        """Build from to_json output or a legacy {user_id: count} dict"""
+        table = cls(top_k)
+        if isinstance(data, dict) and "ids" in data:
+            pairs = zip(data["ids"], data["counts"])
+        else:
+            pairs = ((int(user_id), count) for user_id, count in (data or {}).items())
+        for user_id, count in pairs:
+            slot = table._slot(user_id)
+            table._counts[slot] += count
+        table._rebuild_top()
+        return table
+
+
+class DecayingCounter:
+    """Per-user strike counts that wear off by one every ``decay_seconds``.
+
+    Decay is applied lazily to a single user when their count is read or
+    bumped, so strikes expire without any periodic scan of the table. A
+    decay of 0 keeps strikes until they are reset.
+    """
+
+    def __init__(self, decay_seconds=0):
+        self.decay_seconds = decay_seconds
+        self._slots = {}
+        self._ids = array('q')
+        self._counts = array('q')
+        self._last = array('d')  # unix time of each user's last strike
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, user_id):
+        return user_id in self._slots
+
+    def _current(self, slot, now):
+        count = self._counts[slot]
+        if count and self.decay_seconds:
+            count = max(0, count - int((now - self._last[slot]) // self.decay_seconds))
+        return count
+
+    def get(self, user_id, now=None):
+        slot = self._slots.get(user_id)
+        if slot is None:
+            return 0
+        return self._current(slot, time.time() if now is None else now)
+
+    def last_strike(self, user_id):
+        """Unix time of a user's last strike, or None"""
+        slot = self._slots.get(user_id)
+        if slot is None or not self._last[slot]:
+            return None
+        return self._last[slot]
+
+    def add(self, user_id, now=None):
+        """Record a strike and return the user's (decayed) count including it"""
+        now = time.time() if now is None else now
+        slot = self._slots.get(user_id)
+        if slot is None:
+            slot = len(self._ids)
+            self._slots[user_id] = slot
+            self._ids.append(user_id)
+            self._counts.append(0)
+            self._last.append(0.0)
+        count = self._current(slot, now) + 1
+        self._counts[slot] = count
+        self._last[slot] = now
+        return count
+
+    def reset(self, user_id):
+        slot = self._slots.get(user_id)
+        if slot is not None:
+            self._counts[slot] = 0
+
+    def clear(self):
+        self._slots.clear()
+        self._ids = array('q')
+        self._counts = array('q')
+        self._last = array('d')
+
+    def total(self, now=None):
+        now = time.time() if now is None else now
+        return sum(self._current(slot, now) for slot in range(len(self._ids)))
+
+    def top(self, k=5, now=None):
+        """(user_id, count) for the k users with the most current strikes"""
+        now = time.time() if now is None else now
+        counts = ((self._ids[slot], self._current(slot, now)) for slot in range(len(self._ids)))
+        return [(user_id, count) for user_id, count in heapq.nlargest(k, counts, key=lambda item: item[1]) if count > 0]
+
+    def to_json(self):
+        return {"ids": self._ids.tolist(), "counts": self._counts.tolist(), "last": self._last.tolist()}
+
+    @classmethod
+    def from_json(cls, data, decay_seconds=0):
+        """Build from to_json output or the legacy {user_id: {"count", "last_violation"}} dict"""
+        table = cls(decay_seconds)
+        if isinstance(data, dict) and "ids" in data:
+            rows = zip(data["ids"], data["counts"], data["last"])
+        else:
+            rows = []
+            for user_id, entry in (data or {}).items():
+                last = 0.0
+                if entry.get("last_violation"):
+                    try:
+                        last = datetime.fromisoformat(entry["last_violation"]).timestamp()
+                    except ValueError:
+                        pass
+                rows.append((int(user_id), entry.get("count", 0), last))
+        for user_id, count, last in rows:
+            table._slots[user_id] = len(table._ids)
+            table._ids.append(user_id)
+            table._counts.append(count)
+            table._last.append(last)
+        return table
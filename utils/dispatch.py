@@ -0,0 +1,112 @@
+import time
+
+
+class MessageRoute:
+    __slots__ = (
+        "name", "handler", "priority", "channels", "include_bots", "guild_only", "enabled",
+        "calls", "errors", "total_ns", "max_ns"
+    )
+
+    def __init__(self, name, handler, priority, channels, include_bots, guild_only):
+        self.name = name
+        self.handler = handler
+        self.priority = priority
+        self.channels = channels
+        self.include_bots = include_bots
+        self.guild_only = guild_only
+        self.enabled = True
+        self.calls = 0
+        self.errors = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+class MessageDispatcher:
+    """One on_message stage shared by every cog.
+
+    Cogs register an async handler instead of their own on_message
+    listener, so each message costs one task and one pass over the routes
+    rather than a task per cog. The bot and guild checks happen once: routes
+    are pre-sorted by priority (lowest first) into one tuple per
+    (bot author, in a guild) combination, and a route with ``channels`` (any
+    container supporting ``in`` that the cog keeps current) is skipped
+    unless the message's channel is in it. Handlers run one after another
+    and should hand anything slow to a task of their own; each one's call
+    count, errors and time are recorded for !debugcogs.
+    """
+
+    def __init__(self, disabled=()):
+        self._routes = {}
+        self._table = {}  # (is_bot, in_guild) -> routes in priority order
+        self.disabled = set(disabled)
+        self._rebuild()
+
+    def register(self, name, handler, priority=100, channels=None, include_bots=False, guild_only=True):
+        """handler(message) -> awaitable; registering a name again replaces it (cog reloads)"""
+        route = MessageRoute(name, handler, priority, channels, include_bots, guild_only)
+        route.enabled = name not in self.disabled
+        self._routes[name] = route
+        self._rebuild()
+        return route
+
+    def unregister(self, name):
+        if self._routes.pop(name, None) is not None:
+            self._rebuild()
+
+    def set_enabled(self, name, enabled):
+        """Feature flag: skip a handler without unloading its cog (kept across reloads)"""
+        if enabled:
+            self.disabled.discard(name)
+        else:
+            self.disabled.add(name)
+        route = self._routes.get(name)
+        if route is not None:
+            route.enabled = enabled
+            self._rebuild()
+        return route is not None
+
+    def _rebuild(self):
+        ordered = sorted((r for r in self._routes.values() if r.enabled), key=lambda r: r.priority)
+        self._table = {
+            (is_bot, in_guild): tuple(
+                r for r in ordered
+                if (r.include_bots or not is_bot) and (in_guild or not r.guild_only)
+            )
+            for is_bot in (False, True)
+            for in_guild in (False, True)
+        }
+
+    async def dispatch(self, message):
+        routes = self._table[(message.author.bot, message.guild is not None)]
+        if not routes:
+            return
+        channel_id = message.channel.id
+        for route in routes:
+            if route.channels is not None and channel_id not in route.channels:
+                continue
+            start = time.perf_counter_ns()
+            try:
+                await route.handler(message)
+            except Exception as e:
+                route.errors += 1
+                print(f"Error in message handler {route.name}: {e}")
+            elapsed = time.perf_counter_ns() - start
+            route.calls += 1
+            route.total_ns += elapsed
+            if elapsed > route.max_ns:
+                route.max_ns = elapsed
+
+    def stats(self):
+        """Per-handler counters, in priority order"""
+        return [
+            {
+                "name": r.name,
+                "priority": r.priority,
+                "enabled": r.enabled,
+                "calls": r.calls,
+                "errors": r.errors,
+                "avg_us": round(r.total_ns / r.calls / 1000, 1) if r.calls else 0,
+                "max_us": round(r.max_ns / 1000, 1),
+            }
+            for r in sorted(self._routes.values(), key=lambda r: r.priority)
+        ]
@@ -0,0 +1,205 @@
+ROLE_FIELDS = ("permissions", "color", "hoist", "mentionable")
+TEXT_FIELDS = ("topic", "nsfw", "slowmode_delay")
+CHANNEL_TYPES = ("text", "voice", "forum")  # channel types restore can recreate
+
+
+def restorable_role(role_data):
+    """Whether restore should (re)create this backed-up role"""
+    # Skip managed roles (bot roles, integration roles) and problematic role names
+    if role_data.get("managed", False):
+        return False
+    name = role_data["name"]
+    return not (name.startswith(("@", "Dyno", "MEE6", "Ticket Tool")) or name.lower().endswith(" bot"))
+
+
+def _overwrite_map(overwrites):
+    return {(o["type"], o["name"]): (o["allow"], o["deny"]) for o in overwrites}
+
+
+def _pair(backup_items, live_items, keys):
+    """Match backup to live items on each key function in turn.
+
+    Items sharing a key are paired in list (layout) order, so duplicate names
+    still line up. Returns (pairs, unmatched_backup, unmatched_live).
+    """
+    pairs = []
+    backup_left = list(backup_items)
+    live_left = list(live_items)
+    for key in keys:
+        live_by_key = {}
+        for item in live_left:
+            live_by_key.setdefault(key(item), []).append(item)
+        still_unmatched = []
+        for item in backup_left:
+            candidates = live_by_key.get(key(item))
+            if candidates:
+                pairs.append((item, candidates.pop(0)))
+            else:
+                still_unmatched.append(item)
+        matched_ids = {id(live) for _, live in pairs}
+        backup_left = still_unmatched
+        live_left = [item for item in live_left if id(item) not in matched_ids]
+    return pairs, backup_left, live_left
+
+
+def _reorder(pairs, backup_positions, live_items):
+    """(live_id, backup position) for every pair if the live side has them in a different order, else []"""
+    live_positions = {id(item): position for position, item in enumerate(live_items)}
+    in_live_order = sorted(pairs, key=lambda pair: live_positions[id(pair[1])])
+    wanted = [backup_positions[id(want)] for want, _ in in_live_order]
+    if wanted == sorted(wanted):
+        return []
+    # Kept items all get backup positions, so they share one scale with the creates
+    return [(have["id"], backup_positions[id(want)]) for want, have in pairs]
+
+
+class GuildDiff:
+    """Minimal create/update/delete/reorder plan taking a live guild to a backup.
+
+    Both sides use the backup layout (ServerBackup.capture_guild, with
+    ``layout_order`` applied to older backups), so an item's position is its
+    index in its section; the live side additionally carries ``id`` on every
+    item. Roles and categories are matched by name, channels by type, name
+    and category (then by type and name, for channels that moved category).
+    """
+
+    def __init__(self, backup, live, keep_channel_ids=()):
+        self.role_creates = []      # role_data
+        self.role_updates = []      # (live_id, name, {field: value})
+        self.role_deletes = []      # (live_id, name)
+        self.role_order = None      # (role_data, live_id or None if created), top first, if the order differs
+
+        self.category_creates = []  # (category_data, position)
+        self.category_updates = []  # (live_id, backup category_data, ["overwrites"])
+        self.category_deletes = []  # (live_id, name)
+        self.category_ids = {}      # backup category id -> live id, for paired categories
+
+        self.channel_creates = []   # (channel_data, category name or None, position)
+        self.channel_updates = []   # (live_id, channel_data, category name or None, [field names])
+        self.channel_deletes = []   # (live_id, name)
+        self.channel_positions = [] # (live_id, position) for kept channels/categories that moved
+
+        self._diff_roles(backup, live)
+        self._diff_categories(backup, live)
+        self._diff_channels(backup, live, set(keep_channel_ids))
+
+    def _diff_roles(self, backup, live):
+        wanted = [r for r in backup["roles"] if restorable_role(r)]
+        # Roles restore won't recreate (managed, bot roles) are left alone on both sides
+        present = [r for r in live["roles"] if restorable_role(r)]
+        pairs, creates, deletes = _pair(wanted, present, [lambda r: r["name"]])
+        self.role_creates = creates
+        self.role_deletes = [(r["id"], r["name"]) for r in deletes]
+        for want, have in pairs:
+            changes = {f: want[f] for f in ROLE_FIELDS if want[f] != have[f]}
+            if changes:
+                self.role_updates.append((have["id"], want["name"], changes))
+
+        positions = {id(r): position for position, r in enumerate(wanted)}
+        if creates or _reorder(pairs, positions, present):
+            live_ids = {id(want): have["id"] for want, have in pairs}
+            self.role_order = [(r, live_ids.get(id(r))) for r in wanted]
+
+    def _diff_categories(self, backup, live):
+        positions = {id(c): position for position, c in enumerate(backup["categories"])}
+        pairs, creates, deletes = _pair(backup["categories"], live["categories"], [lambda c: c["name"]])
+        self.category_creates = [(c, positions[id(c)]) for c in creates]
+        self.category_deletes = [(c["id"], c["name"]) for c in deletes]
+        for want, have in pairs:
+            self.category_ids[want["id"]] = have["id"]
+            if _overwrite_map(want["overwrites"]) != _overwrite_map(have["overwrites"]):
+                self.category_updates.append((have["id"], want, ["overwrites"]))
+        # Categories are channels too, so they share the bulk position update
+        self.channel_positions += _reorder(pairs, positions, live["categories"])
+
+    def _diff_channels(self, backup, live, keep_ids):
+        backup_categories = {c["id"]: c["name"] for c in backup["categories"]}
+        live_categories = {c["id"]: c["name"] for c in live["categories"]}
+
+        def backup_category(channel):
+            return backup_categories.get(channel["category_id"])
+
+        def live_category(channel):
+            return live_categories.get(channel["category_id"])
+
+        # Tag copies of each side with its category name so one key function serves both.
+        # Live channels of other types (news, stage, ...) are left alone: the
+        # diff can't recreate them, so it must never pair or delete them either.
+        # Kept channels (the one restore runs in) still pair, so their backup
+        # copy isn't recreated; they are only left out of the changes below.
+        wanted = []
+        positions = {}
+        for position, c in enumerate(backup["channels"]):
+            if c["type"] in CHANNEL_TYPES:
+                wanted.append(dict(c, _category=backup_category(c)))
+                positions[id(wanted[-1])] = position
+        present = [
+            dict(c, _category=live_category(c)) for c in live["channels"]
+            if c["type"] in CHANNEL_TYPES
+        ]
+
+        pairs, creates, deletes = _pair(wanted, present, [
+            lambda c: (c["type"], c["name"], c["_category"]),
+            lambda c: (c["type"], c["name"]),
+        ])
+        self.channel_creates = [(c, c["_category"], positions[id(c)]) for c in creates]
+        self.channel_deletes = [(c["id"], c["name"]) for c in deletes if c["id"] not in keep_ids]
+        for want, have in pairs:
+            if have["id"] in keep_ids:
+                continue
+            fields = []
+            if want["type"] == "text":
+                fields += [f for f in TEXT_FIELDS if want.get(f) != have.get(f)]
+            if _overwrite_map(want["overwrites"]) != _overwrite_map(have["overwrites"]):
+                fields.append("overwrites")
+            # Compared by pairing rather than name, since category names can repeat
+            if want["category_id"] is None:
+                moved = have["category_id"] is not None
+            else:
+                moved = self.category_ids.get(want["category_id"]) != have["category_id"]
+            if moved:
+                fields.append("category")
+            if fields:
+                self.channel_updates.append((have["id"], want, want["_category"], fields))
+        self.channel_positions += [
+            (channel_id, position) for channel_id, position in _reorder(pairs, positions, present)
+            if channel_id not in keep_ids
+        ]
+
+    @property
+    def empty(self):
+        return not (
+            self.role_creates or self.role_updates or self.role_deletes or self.role_order
+            or self.category_creates or self.category_updates or self.category_deletes
+            or self.channel_creates or self.channel_updates or self.channel_deletes
+            or self.channel_positions
+        )
+
+    def counts(self):
+        return {
+            "create": len(self.role_creates) + len(self.category_creates) + len(self.channel_creates),
+            "update": len(self.role_updates) + len(self.category_updates) + len(self.channel_updates),
+            "delete": len(self.role_deletes) + len(self.category_deletes) + len(self.channel_deletes),
+            "reorder": len(self.channel_positions) + (1 if self.role_order else 0),
+        }
+
+    def describe(self):
+        """One line per change, for showing the plan before it is applied"""
+        lines = []
+        lines += [f"+ role {r['name']}" for r in self.role_creates]
+        lines += [f"~ role {name} ({', '.join(changes)})" for _, name, changes in self.role_updates]
+        lines += [f"- role {name}" for _, name in self.role_deletes]
+        if self.role_order:
+            lines.append(f"↕ reorder roles ({len(self.role_order)})")
+        lines += [f"+ category {c['name']}" for c, _ in self.category_creates]
+        lines += [f"~ category {c['name']} ({', '.join(fields)})" for _, c, fields in self.category_updates]
+        lines += [f"- category {name}" for _, name in self.category_deletes]
+        lines += [
+            f"+ {c['type']} #{c['name']}" + (f" in {category}" if category else "")
+            for c, category, _ in self.channel_creates
+        ]
+        lines += [f"~ #{c['name']} ({', '.join(fields)})" for _, c, _, fields in self.channel_updates]
+        lines += [f"- #{name}" for _, name in self.channel_deletes]
+        if self.channel_positions:
+            lines.append(f"↕ reorder channels ({len(self.channel_positions)})")
+        return lines
@@ -0,0 +1,264 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+
+# Column -> default for a brand new user; mirrors the old levels_data.json layout
+USER_DEFAULTS = {
+    "xp": 0,
+    "level": 0,
+    "credits": 100,  # Starting credits
+    "reputation": 0,
+    "voice_time": 0,  # Total voice time in minutes
+    "messages_sent": 0,
+    "last_daily": 0,
+    "last_rep": 0,
+    "profile_bg": "default",
+    "rank_bg": "default",
+    "description": "No description set.",
+}
+
+USER_COLUMNS_SQL = """
+    xp INTEGER NOT NULL DEFAULT 0,
+    level INTEGER NOT NULL DEFAULT 0,
+    credits INTEGER NOT NULL DEFAULT 100,
+    reputation INTEGER NOT NULL DEFAULT 0,
+    voice_time INTEGER NOT NULL DEFAULT 0,
+    messages_sent INTEGER NOT NULL DEFAULT 0,
+    last_daily REAL NOT NULL DEFAULT 0,
+    last_rep REAL NOT NULL DEFAULT 0,
+    profile_bg TEXT NOT NULL DEFAULT 'default',
+    rank_bg TEXT NOT NULL DEFAULT 'default',
+    description TEXT NOT NULL DEFAULT 'No description set.'
+"""
+
+
+class EconomyLedger:
+    """Transactional XP/credit store shared by the leveling and gambling cogs.
+
+    Every (guild, user) pair is one indexed row, so XP, credits and
+    reputation stay inside the guild they were earned in, and balance checks,
+    bets and payouts are single-row statements. Nothing is held in memory:
+    a guild's rows are only touched when that guild is active.
+    """
+
+    def __init__(self, path="economy.db"):
+        self.path = path
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self):
+        # Flat per-user rows from before guild scoping; only read by the migration
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY,
+                {USER_COLUMNS_SQL}
+            )
+        """)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS guild_users (
+                guild_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                {USER_COLUMNS_SQL},
+                PRIMARY KEY (guild_id, user_id)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_guild_users_xp ON guild_users (guild_id, xp DESC)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Group several statements into one atomic write"""
+        if self.conn.in_transaction:
+            # Nested use joins the outer transaction
+            yield self.conn
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    @staticmethod
+    def _check_columns(fields):
+        for column in fields:
+            if column not in USER_DEFAULTS:
+                raise KeyError(f"Unknown ledger column: {column}")
+
+    def _ensure_user(self, guild_id, user_id):
+        self.conn.execute(
+            "INSERT OR IGNORE INTO guild_users (guild_id, user_id) VALUES (?, ?)",
+            (int(guild_id), int(user_id))
+        )
+
+    def _get_meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def get_user(self, guild_id, user_id):
+        """Get or create a user's row in a guild as a plain dict"""
+        key = (int(guild_id), int(user_id))
+        query = "SELECT * FROM guild_users WHERE guild_id = ? AND user_id = ?"
+        row = self.conn.execute(query, key).fetchone()
+        if row is None:
+            self._ensure_user(*key)
+            row = self.conn.execute(query, key).fetchone()
+        return dict(row)
+
+    def get_credits(self, guild_id, user_id):
+        """Credit balance without creating a row (0 for unknown users)"""
+        row = self.conn.execute(
+            "SELECT credits FROM guild_users WHERE guild_id = ? AND user_id = ?",
+            (int(guild_id), int(user_id))
+        ).fetchone()
+        return row["credits"] if row else 0
+
+    def get_xp(self, guild_id, user_id):
+        """XP without creating a row (None for unknown users)"""
+        row = self.conn.execute(
+            "SELECT xp FROM guild_users WHERE guild_id = ? AND user_id = ?",
+            (int(guild_id), int(user_id))
+        ).fetchone()
+        return row["xp"] if row else None
+
+    def update(self, guild_id, user_id, **fields):
+        """Overwrite columns for one user"""
+        if not fields:
+            return
+        self._check_columns(fields)
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self.transaction():
+            self._ensure_user(guild_id, user_id)
+            self.conn.execute(
+                f"UPDATE guild_users SET {assignments} WHERE guild_id = ? AND user_id = ?",
+                (*fields.values(), int(guild_id), int(user_id))
+            )
+
+    def increment(self, guild_id, user_id, **deltas):
+        """Atomically add to numeric columns and return the updated row"""
+        self._check_columns(deltas)
+        assignments = ", ".join(f"{column} = {column} + ?" for column in deltas)
+        with self.transaction():
+            self._ensure_user(guild_id, user_id)
+            row = self.conn.execute(
+                f"UPDATE guild_users SET {assignments} WHERE guild_id = ? AND user_id = ? RETURNING *",
+                (*deltas.values(), int(guild_id), int(user_id))
+            ).fetchone()
+        return dict(row)
+
+    def credit(self, guild_id, user_id, amount, **fields):
+        """Add credits (and optionally set other columns) in one statement; returns the new balance"""
+        self._check_columns(fields)
+        assignments = "".join(f", {column} = ?" for column in fields)
+        with self.transaction():
+            self._ensure_user(guild_id, user_id)
+            row = self.conn.execute(
+                f"UPDATE guild_users SET credits = credits + ?{assignments} "
+                f"WHERE guild_id = ? AND user_id = ? RETURNING credits",
+                (amount, *fields.values(), int(guild_id), int(user_id))
+            ).fetchone()
+        return row["credits"]
+
+    def debit(self, guild_id, user_id, amount):
+        """Remove credits only if the balance covers it; returns the new balance or None"""
+        row = self.conn.execute(
+            "UPDATE guild_users SET credits = credits - ? "
+            "WHERE guild_id = ? AND user_id = ? AND credits >= ? RETURNING credits",
+            (amount, int(guild_id), int(user_id), amount)
+        ).fetchone()
+        return row["credits"] if row else None
+
+    def reset_guild(self, guild_id):
+        """Zero XP and level for every user in a guild"""
+        self.conn.execute("UPDATE guild_users SET xp = 0, level = 0 WHERE guild_id = ?", (int(guild_id),))
+
+    def iter_xp(self, guild_id):
+        """Yield (user_id, xp, level) for a guild's users, highest XP first"""
+        yield from self.conn.execute(
+            "SELECT user_id, xp, level FROM guild_users WHERE guild_id = ? ORDER BY xp DESC",
+            (int(guild_id),)
+        )
+
+    def migrate_from_json(self, json_path):
+        """One-shot import of the legacy flat levels_data.json file.
+
+        Rows land in the flat ``users`` table and are copied into guilds by
+        adopt_legacy_users. Only runs while that table is still empty; the
+        JSON file is kept with a ``.migrated`` suffix afterwards.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        if self.conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+            return 0
+
+        try:
+            with open(json_path, 'r') as f:
+                legacy = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            print(f"Could not migrate {json_path}: {e}")
+            return 0
+
+        columns = list(USER_DEFAULTS)
+        rows = []
+        for user_id, data in legacy.items():
+            try:
+                uid = int(user_id)
+            except ValueError:
+                continue
+            rows.append((uid, *(data.get(column, USER_DEFAULTS[column]) for column in columns)))
+
+        placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+        with self.transaction():
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO users (user_id, {', '.join(columns)}) VALUES ({placeholders})",
+                rows
+            )
+        os.replace(json_path, f"{json_path}.migrated")
+        print(f"📦 Migrated {len(rows)} users from {json_path} into {self.path}")
+        return len(rows)
+
+    def adopt_legacy_users(self, guild_members):
+        """Move flat pre-guild rows into one home guild per user.
+
+        guild_members maps guild_id -> member ids for the guilds the bot is in
+        the first time this runs. A legacy row holds the user's whole balance,
+        so it goes to a single guild rather than being copied into each one:
+        the largest of the user's guilds by member count (the main community
+        rather than a staff or side server), lowest guild id on a tie. It only
+        ever runs once; later guilds start empty instead of inheriting global
+        progress.
+        """
+        if self._get_meta("legacy_adopted"):
+            return 0
+        if not self.conn.execute("SELECT 1 FROM users LIMIT 1").fetchone():
+            self._set_meta("legacy_adopted", 1)
+            return 0
+
+        home = {}
+        for guild_id in sorted(guild_members, key=lambda g: (-len(guild_members[g]), int(g))):
+            for member_id in guild_members[guild_id]:
+                home.setdefault(int(member_id), int(guild_id))
+
+        columns = ", ".join(USER_DEFAULTS)
+        with self.transaction():
+            cursor = self.conn.executemany(
+                f"INSERT OR IGNORE INTO guild_users (guild_id, user_id, {columns}) "
+                f"SELECT ?, user_id, {columns} FROM users WHERE user_id = ?",
+                ((guild_id, member_id) for member_id, guild_id in home.items())
+            )
+            copied = cursor.rowcount
+            self._set_meta("legacy_adopted", 1)
+        print(f"📦 Moved {copied} legacy user rows into their home guild ({len(guild_members)} guild(s))")
+        return copied
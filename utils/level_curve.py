@@ -0,0 +1,59 @@
+from bisect import bisect_right
+
+
+class LevelCurve:
+    """Precomputed cumulative XP table for the leveling curve.
+
+    Reaching level ``L`` from ``L - 1`` costs ``int(base * L ** exponent)`` XP.
+    ``totals[L]`` holds the XP needed to reach level ``L`` from zero, so
+    XP -> level is a single bisect instead of walking the curve. The table is
+    built up to ``max_level`` and extended on demand for anything beyond it.
+    """
+
+    def __init__(self, base=150, exponent=1.5, max_level=1000):
+        self.base = base
+        self.exponent = exponent
+        self.totals = [0]
+        self._extend(max_level)
+
+    @property
+    def max_level(self):
+        return len(self.totals) - 1
+
+    def xp_for_next_level(self, current_level):
+        """XP needed to go from current_level to the next one"""
+        return int(self.base * (current_level + 1) ** self.exponent)
+
+    def _extend(self, max_level):
+        totals = self.totals
+        for level in range(len(totals), max_level + 1):
+            totals.append(totals[-1] + int(self.base * level ** self.exponent))
+
+    def _ensure_xp(self, xp):
+        # Double the table until it covers xp (only hit by extreme outliers)
+        while self.totals[-1] <= xp:
+            self._extend(max(self.max_level * 2, 1))
+
+    def total_xp(self, level):
+        """Total XP needed to reach level"""
+        if level <= 0:
+            return 0
+        if level > self.max_level:
+            self._extend(level)
+        return self.totals[level]
+
+    def level_for_xp(self, xp):
+        """Highest level whose total XP requirement is covered by xp"""
+        if xp < 0:
+            return 0
+        self._ensure_xp(xp)
+        return bisect_right(self.totals, xp) - 1
+
+    def levels_for_xp(self, xp_values):
+        """Batch version of level_for_xp for leaderboards and imports"""
+        xp_values = list(xp_values)
+        if not xp_values:
+            return []
+        self._ensure_xp(max(xp_values))
+        totals = self.totals
+        return [bisect_right(totals, xp) - 1 if xp >= 0 else 0 for xp in xp_values]
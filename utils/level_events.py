@@ -0,0 +1,47 @@
+class LevelUp:
+    """A member's pending level-up; later level-ups before delivery fold into it"""
+
+    __slots__ = ("guild_id", "user_id", "old_level", "new_level", "xp", "channel_id")
+
+    def __init__(self, guild_id, user_id, old_level, new_level, xp, channel_id=None):
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.old_level = old_level
+        self.new_level = new_level
+        self.xp = xp
+        self.channel_id = channel_id
+
+
+class LevelUpQueue:
+    """Level-ups waiting for their roles and announcements, coalesced per (guild, user).
+
+    Producers only touch a dict, so recording a level-up never awaits. The
+    consumer drains everything at once and can then batch the Discord calls:
+    one role edit per member and one message per channel.
+    """
+
+    def __init__(self):
+        self._pending = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def push(self, guild_id, user_id, old_level, new_level, xp, channel_id=None):
+        key = (guild_id, user_id)
+        event = self._pending.get(key)
+        if event is None:
+            self._pending[key] = LevelUp(guild_id, user_id, old_level, new_level, xp, channel_id)
+            return
+        # Keep the first old_level so rewards for every level crossed are granted
+        event.new_level = max(event.new_level, new_level)
+        event.xp = max(event.xp, xp)
+        if channel_id is not None:
+            event.channel_id = channel_id
+
+    def drain(self):
+        """Remove and return every pending level-up grouped by guild id"""
+        by_guild = {}
+        for event in self._pending.values():
+            by_guild.setdefault(event.guild_id, []).append(event)
+        self._pending.clear()
+        return by_guild
@@ -0,0 +1,225 @@
+# Set bit positions of every byte value, for turning bitsets back into member ids
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+class GuildMemberIndex:
+    """Role membership of one guild as bitsets over member slots.
+
+    Every member gets a slot (freed slots are reused), and each role, the
+    bots, and the occupied slots are Python ints with one bit per slot. Set
+    operations on them run in C a machine word at a time, so "humans without
+    role X" is ``index.humans & ~index.role(x)`` instead of a walk over every
+    Member and its role list, and human/bot counts are kept as plain numbers.
+    """
+
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self._slots = {}  # member_id -> slot
+        self._ids = []  # slot -> member_id (None when free)
+        self._free = []
+        self._roles = {}  # role_id -> bitset
+        self.present = 0
+        self.bots = 0
+        self.bot_count = 0
+
+    @classmethod
+    def build(cls, guild):
+        """Index every cached member; role bitsets are assembled as bytes rather than bit by bit"""
+        index = cls(guild.id)
+        members = list(guild.members)
+        size = (len(members) + 7) // 8
+        role_bytes = {}
+        bot_bytes = bytearray(size)
+        for slot, member in enumerate(members):
+            index._slots[member.id] = slot
+            index._ids.append(member.id)
+            byte, bit = slot >> 3, 1 << (slot & 7)
+            if member.bot:
+                bot_bytes[byte] |= bit
+                index.bot_count += 1
+            for role in member.roles:
+                if role.id == guild.id:  # @everyone is everyone
+                    continue
+                data = role_bytes.get(role.id)
+                if data is None:
+                    data = role_bytes[role.id] = bytearray(size)
+                data[byte] |= bit
+        index._roles = {role_id: int.from_bytes(data, "little") for role_id, data in role_bytes.items()}
+        index.bots = int.from_bytes(bot_bytes, "little")
+        index.present = (1 << len(members)) - 1
+        return index
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, member_id):
+        return member_id in self._slots
+
+    @property
+    def human_count(self):
+        return len(self._slots) - self.bot_count
+
+    @property
+    def humans(self):
+        return self.present & ~self.bots
+
+    def role(self, role_id):
+        """Bitset of members with the role (0 if nobody has it)"""
+        return self._roles.get(role_id, 0)
+
+    def role_count(self, role_id):
+        return self.role(role_id).bit_count()
+
+    @staticmethod
+    def count(mask):
+        return mask.bit_count()
+
+    def add(self, member):
+        if member.id in self._slots:
+            self.remove(member.id)
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = member.id
+        else:
+            slot = len(self._ids)
+            self._ids.append(member.id)
+        self._slots[member.id] = slot
+        bit = 1 << slot
+        self.present |= bit
+        if member.bot:
+            self.bots |= bit
+            self.bot_count += 1
+        for role in member.roles:
+            if role.id != self.guild_id:
+                self._roles[role.id] = self._roles.get(role.id, 0) | bit
+
+    def remove(self, member_id):
+        slot = self._slots.pop(member_id, None)
+        if slot is None:
+            return
+        bit = 1 << slot
+        self.present &= ~bit
+        if self.bots & bit:
+            self.bots &= ~bit
+            self.bot_count -= 1
+        for role_id, bits in self._roles.items():
+            if bits & bit:
+                self._roles[role_id] = bits & ~bit
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def set_roles(self, member_id, before_ids, after_ids):
+        """Apply a member's role change (sets of role ids)"""
+        slot = self._slots.get(member_id)
+        if slot is None:
+            return
+        bit = 1 << slot
+        for role_id in after_ids - before_ids:
+            if role_id != self.guild_id:
+                self._roles[role_id] = self._roles.get(role_id, 0) | bit
+        for role_id in before_ids - after_ids:
+            if role_id in self._roles:
+                self._roles[role_id] &= ~bit
+
+    def drop_role(self, role_id):
+        self._roles.pop(role_id, None)
+
+    def ids(self, mask, limit=None):
+        """Member ids for the set bits of mask, in slot order"""
+        found = []
+        ids = self._ids
+        data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+        for byte_index, byte in enumerate(data):
+            if not byte:
+                continue
+            base = byte_index << 3
+            found.extend(ids[base + bit] for bit in _BYTE_BITS[byte])
+            if limit is not None and len(found) >= limit:
+                return found[:limit]
+        return found
+
+    def members(self, guild, mask, limit=None):
+        """Cached Member objects for the set bits of mask"""
+        members = (guild.get_member(member_id) for member_id in self.ids(mask, limit))
+        return [member for member in members if member is not None]
+
+
+class MemberIndex:
+    """GuildMemberIndex per guild, built on first use and kept current from gateway events.
+
+    ``attach`` registers the listeners on the bot. A guild that isn't fully
+    chunked yet is indexed on demand without being cached, so a partial
+    member list never sticks. Cached indexes are dropped whenever discord.py
+    may have refilled its member cache (ready after a re-identify, a guild
+    becoming available or unavailable), since events missed in between
+    would otherwise leave the bitsets stale.
+    """
+
+    def __init__(self):
+        self._guilds = {}
+        self.builds = 0
+
+    def attach(self, bot):
+        for listener in (
+            self.on_member_join, self.on_raw_member_remove, self.on_member_update,
+            self.on_guild_role_delete, self.on_guild_remove,
+            self.on_ready, self.on_guild_available, self.on_guild_unavailable
+        ):
+            bot.add_listener(listener)
+
+    def get(self, guild):
+        index = self._guilds.get(guild.id)
+        if index is None:
+            index = GuildMemberIndex.build(guild)
+            self.builds += 1
+            if guild.chunked:
+                self._guilds[guild.id] = index
+        return index
+
+    async def on_member_join(self, member):
+        index = self._guilds.get(member.guild.id)
+        if index is not None:
+            index.add(member)
+
+    async def on_raw_member_remove(self, payload):
+        index = self._guilds.get(payload.guild_id)
+        if index is not None:
+            index.remove(payload.user.id)
+
+    async def on_member_update(self, before, after):
+        index = self._guilds.get(after.guild.id)
+        if index is None:
+            return
+        before_ids = {role.id for role in before.roles}
+        after_ids = {role.id for role in after.roles}
+        if before_ids != after_ids:
+            if after.id in index:
+                index.set_roles(after.id, before_ids, after_ids)
+            else:
+                index.add(after)
+
+    async def on_guild_role_delete(self, role):
+        index = self._guilds.get(role.guild.id)
+        if index is not None:
+            index.drop_role(role.id)
+
+    async def on_guild_remove(self, guild):
+        self._guilds.pop(guild.id, None)
+
+    async def on_ready(self):
+        # Every guild was re-chunked; rebuild from the fresh cache on next use
+        self._guilds.clear()
+
+    async def on_guild_available(self, guild):
+        self._guilds.pop(guild.id, None)
+
+    async def on_guild_unavailable(self, guild):
+        self._guilds.pop(guild.id, None)
+
+    def stats(self):
+        return {
+            "guilds": len(self._guilds),
+            "members": sum(len(index) for index in self._guilds.values()),
+            "roles": sum(len(index._roles) for index in self._guilds.values()),
+            "builds": self.builds,
+        }
@@ -0,0 +1,35 @@
+class MonitorIndex:
+    """Flattened, immutable view of {guild_id: {user_id: channel_id or 'all'}}.
+
+    ``users`` holds every monitored user id, so a message from anyone else is
+    rejected by a single set-membership test on an int, with no tuple built
+    and no dict walked. Monitored users then go through ``keys``: one
+    (guild_id, user_id, None) key when monitored server-wide or
+    (guild_id, user_id, channel_id) when monitored in one channel, plus
+    (guild_id, user_id) for each. Rebuild whenever the mapping changes.
+    """
+
+    __slots__ = ("users", "keys")
+
+    def __init__(self, monitored_users=None):
+        users = set()
+        keys = set()
+        for guild_id, guild_users in (monitored_users or {}).items():
+            for user_id, scope in guild_users.items():
+                users.add(user_id)
+                keys.add((guild_id, user_id))
+                keys.add((guild_id, user_id, None if scope == 'all' else scope))
+        self.users = frozenset(users)
+        self.keys = frozenset(keys)
+
+    def __len__(self):
+        return sum(1 for key in self.keys if len(key) == 2)
+
+    def matches(self, guild_id, user_id, channel_id):
+        """Whether a message by user_id in this guild and channel should be replaced"""
+        if user_id not in self.users:
+            return False
+        keys = self.keys
+        if (guild_id, user_id) not in keys:
+            return False
+        return (guild_id, user_id, None) in keys or (guild_id, user_id, channel_id) in keys
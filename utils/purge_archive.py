@@ -0,0 +1,71 @@
+from utils.transcripts import TranscriptWriter
+
+
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024  # webhook attachment limit
+
+
+class AuthorTally:
+    """Message counts per author in a fixed amount of memory.
+
+    Keeps at most ``capacity`` authors (the Space-Saving heavy-hitters
+    scheme): once full, a new author replaces the one with the lowest count
+    and inherits that count, so anyone who posted more than
+    ``total / capacity`` of the messages is always kept and the top authors
+    come out right for any realistic purge. Counts of authors that came in
+    through an eviction may be over by at most the evicted count.
+    """
+
+    def __init__(self, capacity=500):
+        self.capacity = capacity
+        self.total = 0
+        self.evictions = 0
+        self._counts = {}   # author_id -> count
+        self._names = {}    # author_id -> display string
+
+    def add(self, author):
+        self.total += 1
+        if author.id in self._counts:
+            self._counts[author.id] += 1
+            return
+        floor = 0
+        if len(self._counts) >= self.capacity:
+            victim = min(self._counts, key=self._counts.get)
+            floor = self._counts.pop(victim)
+            del self._names[victim]
+            self.evictions += 1
+        self._counts[author.id] = floor + 1
+        self._names[author.id] = str(author)
+
+    @property
+    def authors(self):
+        """Distinct authors seen, or a lower bound once authors were evicted"""
+        return len(self._counts)
+
+    @property
+    def exact(self):
+        return self.evictions == 0
+
+    def top(self, n=10):
+        """[(author_id, name, count)] for the n authors with the most messages"""
+        ranked = sorted(self._counts.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(author_id, self._names[author_id], count) for author_id, count in ranked]
+
+
+async def archive_messages(messages, meta, capacity=500):
+    """Stream messages, oldest first, into a gzipped JSON Lines file and tally their authors.
+
+    Returns (writer, tally). The writer is closed; whoever uploads
+    ``writer.path`` is responsible for removing it.
+    """
+    writer = TranscriptWriter("jsonl", "gzip")
+    tally = AuthorTally(capacity)
+    try:
+        await writer.write_header(meta)
+        for message in sorted(messages, key=lambda m: m.id):
+            tally.add(message.author)
+            await writer.add(message)
+        await writer.close()
+    except BaseException:
+        writer.discard()
+        raise
+    return writer, tally
@@ -0,0 +1,106 @@
+import time
+from bisect import bisect_left, insort
+
+
+class GuildRanking:
+    """Members of one guild kept in XP order (highest first).
+
+    Entries are ``(-xp, user_id)`` tuples in a sorted list, so a rank lookup
+    is a bisect and a page is a slice. Moving a user re-bisects their old and
+    new slot; the list shift is a memmove, which stays cheap well past the
+    size of our largest guild.
+    """
+
+    def __init__(self, rows=()):
+        self._xp = {user_id: xp for user_id, xp in rows}
+        self._keys = sorted((-xp, user_id) for user_id, xp in self._xp.items())
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, user_id):
+        return user_id in self._xp
+
+    def update(self, user_id, xp):
+        """Insert or move a user"""
+        old_xp = self._xp.get(user_id)
+        if old_xp == xp:
+            return
+        if old_xp is not None:
+            del self._keys[bisect_left(self._keys, (-old_xp, user_id))]
+        insort(self._keys, (-xp, user_id))
+        self._xp[user_id] = xp
+
+    def remove(self, user_id):
+        old_xp = self._xp.pop(user_id, None)
+        if old_xp is not None:
+            del self._keys[bisect_left(self._keys, (-old_xp, user_id))]
+
+    def rank(self, user_id):
+        """1-based position of a user, or 0 if they aren't ranked"""
+        xp = self._xp.get(user_id)
+        if xp is None:
+            return 0
+        return bisect_left(self._keys, (-xp, user_id)) + 1
+
+    def page(self, start, end):
+        """(user_id, xp) pairs for positions start..end-1"""
+        return [(user_id, -neg_xp) for neg_xp, user_id in self._keys[start:end]]
+
+
+class LeaderboardIndex:
+    """Lazily built GuildRanking per guild, kept current by the leveling cog.
+
+    Rankings for guilds nobody has looked at recently are evicted, so memory
+    follows the number of active guilds rather than every guild ever seen.
+    """
+
+    def __init__(self, loader):
+        # loader(guild) -> iterable of (user_id, xp) for that guild's members
+        self._loader = loader
+        self._rankings = {}
+        self._last_used = {}
+
+    def __len__(self):
+        return len(self._rankings)
+
+    def get(self, guild):
+        ranking = self._rankings.get(guild.id)
+        if ranking is None:
+            ranking = GuildRanking(self._loader(guild))
+            self._rankings[guild.id] = ranking
+        self._last_used[guild.id] = time.monotonic()
+        return ranking
+
+    def update_xp(self, guild_id, user_id, xp):
+        """Record a user's new XP if that guild's ranking is loaded"""
+        ranking = self._rankings.get(guild_id)
+        if ranking is not None:
+            ranking.update(user_id, xp)
+
+    def add_member(self, guild_id, user_id, xp):
+        ranking = self._rankings.get(guild_id)
+        if ranking is not None:
+            ranking.update(user_id, xp)
+
+    def remove_member(self, guild_id, user_id):
+        ranking = self._rankings.get(guild_id)
+        if ranking is not None:
+            ranking.remove(user_id)
+
+    def invalidate(self, guild_id=None):
+        """Drop one (or every) ranking so it is rebuilt on next use"""
+        if guild_id is None:
+            self._rankings.clear()
+            self._last_used.clear()
+        else:
+            self._rankings.pop(guild_id, None)
+            self._last_used.pop(guild_id, None)
+
+    def evict_idle(self, max_idle_seconds):
+        """Drop rankings that haven't been read for max_idle_seconds"""
+        cutoff = time.monotonic() - max_idle_seconds
+        idle = [guild_id for guild_id, last_used in self._last_used.items() if last_used < cutoff]
+        for guild_id in idle:
+            self.invalidate(guild_id)
+        return len(idle)
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+
+class RouteLimiter:
+    """Token buckets keyed by route, e.g. ("send", channel_id).
+
+    Each route may burst up to ``rate`` calls and then refills at
+    ``rate / per`` calls per second. Callers await ``acquire`` before the API
+    call, so a burst of work is spread out locally instead of running into
+    Discord's 429s and the global retry backoff.
+    """
+
+    def __init__(self, rate, per):
+        self.rate = float(rate)
+        self.per = float(per)
+        self._buckets = {}  # route -> [tokens, last_refill]
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def _refill(self, bucket, now):
+        tokens, last = bucket
+        bucket[0] = min(self.rate, tokens + (now - last) * self.rate / self.per)
+        bucket[1] = now
+
+    def delay(self, route):
+        """Seconds until a call on route would be allowed (0 if it can go now)"""
+        bucket = self._buckets.get(route)
+        if bucket is None:
+            return 0.0
+        self._refill(bucket, time.monotonic())
+        if bucket[0] >= 1:
+            return 0.0
+        return (1 - bucket[0]) * self.per / self.rate
+
+    async def acquire(self, route):
+        """Wait for a token on route, then spend it"""
+        while True:
+            wait = self.delay(route)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        bucket = self._buckets.setdefault(route, [self.rate, time.monotonic()])
+        bucket[0] -= 1
+
+    def prune(self):
+        """Forget routes whose buckets have refilled completely"""
+        now = time.monotonic()
+        for route, bucket in list(self._buckets.items()):
+            self._refill(bucket, now)
+            if bucket[0] >= self.rate:
+                del self._buckets[route]
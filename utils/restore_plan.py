@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+
+class PlanStep:
+    __slots__ = ("key", "run", "deps", "after", "route", "label", "phase")
+
+    def __init__(self, key, run, deps, after, route, label, phase):
+        self.key = key
+        self.run = run
+        self.deps = tuple(deps)
+        self.after = tuple(after)
+        self.route = route
+        self.label = label
+        self.phase = phase
+
+
+class RestorePlan:
+    """A dependency graph of API calls (roles -> categories -> channels).
+
+    Every step starts as soon as the steps it depends on have finished, so a
+    channel only waits for its own category and the roles in its overwrites
+    rather than for a whole phase. In-flight calls are capped by a semaphore
+    and spread out by a RouteLimiter; discord.py still honours the bucket
+    headers and 429s underneath. A failed step skips everything in its
+    ``deps`` instead of aborting the plan; ``after`` only orders steps, so a
+    failure there just leaves the dependent step without that result.
+    """
+
+    def __init__(self):
+        self.steps = {}
+        self.results = {}
+        self.errors = []  # (label, message)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __contains__(self, key):
+        return key in self.steps
+
+    def add(self, key, run, deps=(), after=(), route=None, label=None, phase=None):
+        """run(results) -> awaitable; its result is stored under key"""
+        self.steps[key] = PlanStep(
+            key, run,
+            [d for d in deps if d != key],
+            [a for a in after if a != key],
+            route, label or str(key), phase
+        )
+
+    def phases(self):
+        """Step counts per phase, in the order phases were first added"""
+        counts = {}
+        for step in self.steps.values():
+            counts[step.phase] = counts.get(step.phase, 0) + 1
+        return counts
+
+    async def execute(self, limiter, concurrency=5, progress=None):
+        semaphore = asyncio.Semaphore(concurrency)
+        tasks = {}
+
+        async def run_step(step):
+            for dep in step.deps:
+                if dep in tasks and not await tasks[dep]:
+                    if progress:
+                        progress.skipped(step.phase)
+                    return False
+            for dep in step.after:
+                if dep in tasks:
+                    await tasks[dep]
+            async with semaphore:
+                if step.route is not None:
+                    await limiter.acquire(step.route)
+                try:
+                    self.results[step.key] = await step.run(self.results)
+                except Exception as e:
+                    self.errors.append((step.label, str(e)))
+                    if progress:
+                        progress.failed(step.phase, f"{step.label}: {e}")
+                    return False
+            if progress:
+                progress.done(step.phase)
+            return True
+
+        for key, step in self.steps.items():
+            tasks[key] = asyncio.create_task(run_step(step))
+        if tasks:
+            await asyncio.gather(*tasks.values())
+        return self.results
+
+
+class ProgressMessage:
+    """Batched progress for a long operation: one message, edited periodically.
+
+    Counters change freely; a background task renders them at most once per
+    ``interval`` seconds, so progress reporting costs a handful of edits
+    instead of one message per created channel.
+    """
+
+    def __init__(self, message, render, interval=3.0, max_errors=10):
+        self.message = message
+        self.render = render  # render(progress) -> discord.Embed
+        self.interval = interval
+        self.max_errors = max_errors
+        self.totals = {}
+        self.counts = {}  # phase -> [done, failed, skipped]
+        self.recent_errors = []
+        self.error_count = 0
+        self.started = time.monotonic()
+        self._dirty = True
+        self._task = None
+
+    def add_phases(self, totals):
+        for phase, total in totals.items():
+            self.totals[phase] = self.totals.get(phase, 0) + total
+            self.counts.setdefault(phase, [0, 0, 0])
+        self._dirty = True
+
+    def _bump(self, phase, index):
+        self.counts.setdefault(phase, [0, 0, 0])[index] += 1
+        self._dirty = True
+
+    def done(self, phase):
+        self._bump(phase, 0)
+
+    def failed(self, phase, error):
+        self._bump(phase, 1)
+        self.error_count += 1
+        self.recent_errors.append(error)
+        del self.recent_errors[:-self.max_errors]
+
+    def skipped(self, phase):
+        self._bump(phase, 2)
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    async def flush(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        try:
+            await self.message.edit(embed=self.render(self))
+        except Exception as e:
+            print(f"Could not update progress message: {e}")
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop the periodic edits and render the final state"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._dirty = True
+        await self.flush()
@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import deque
+
+
+class RoleJob:
+    """One bulk role add/remove across many members, resumable after a restart.
+
+    Member ids are worked off a queue by a few workers; each call waits on a
+    RouteLimiter token for the guild (discord.py still waits on the real
+    bucket headers underneath), so throughput follows the rate limit rather
+    than one await per member. ``to_json`` writes the ids not yet finished
+    (queued plus in flight), so the checkpoint the JsonStore flushes is
+    always enough to pick the job up again.
+    """
+
+    def __init__(self, guild_id, role_id, role_name, action, requested_by, channel_id,
+                 member_ids=(), message_id=None):
+        self.guild_id = guild_id
+        self.role_id = role_id
+        self.role_name = role_name
+        self.action = action  # "add" or "remove"
+        self.requested_by = requested_by
+        self.channel_id = channel_id
+        self.message_id = message_id
+        self.status = "running"  # running, cancelled, finished
+        self.total = len(member_ids)
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.failed_ids = []  # first few, for the summary
+        self.elapsed = 0.0  # seconds spent running, summed over restarts
+        self.created_at = time.time()
+        self.pending = deque(member_ids)
+        self.in_flight = set()
+
+    @property
+    def processed(self):
+        return self.done + self.failed + self.skipped
+
+    @property
+    def remaining(self):
+        return len(self.pending) + len(self.in_flight)
+
+    @property
+    def rate(self):
+        """Members per second over the whole job"""
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def cancel(self):
+        if self.status == "running":
+            self.status = "cancelled"
+
+    def to_json(self):
+        return {
+            "guild_id": self.guild_id,
+            "role_id": self.role_id,
+            "role_name": self.role_name,
+            "action": self.action,
+            "requested_by": self.requested_by,
+            "channel_id": self.channel_id,
+            "message_id": self.message_id,
+            "status": self.status,
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "failed_ids": self.failed_ids,
+            "elapsed": round(self.elapsed, 3),
+            "created_at": self.created_at,
+            "remaining": list(self.in_flight) + list(self.pending),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        job = cls(
+            data["guild_id"], data["role_id"], data["role_name"], data["action"],
+            data["requested_by"], data["channel_id"], data["remaining"], data["message_id"]
+        )
+        for field in ("status", "total", "done", "failed", "skipped", "failed_ids", "elapsed", "created_at"):
+            setattr(job, field, data[field])
+        return job
+
+    async def run(self, apply, limiter, concurrency=4, progress=None, checkpoint=None, interval=10.0):
+        """Work off the queue until it is empty or the job is cancelled.
+
+        apply(member_id) -> awaitable that returns False when the member no
+        longer needs the change (left, already has the role) and raises on
+        failure. checkpoint() is called every ``interval`` seconds and at the end.
+        """
+        phase = "👥 Members"
+        started = time.monotonic()
+        base_elapsed = self.elapsed
+
+        async def worker():
+            while self.pending and self.status == "running":
+                member_id = self.pending.popleft()
+                self.in_flight.add(member_id)
+                try:
+                    await limiter.acquire(self.guild_id)
+                    changed = await apply(member_id)
+                except asyncio.CancelledError:
+                    # Unfinished: back on the queue so the checkpoint still has it
+                    self.in_flight.discard(member_id)
+                    self.pending.appendleft(member_id)
+                    raise
+                except Exception as e:
+                    self.in_flight.discard(member_id)
+                    self.failed += 1
+                    if len(self.failed_ids) < 10:
+                        self.failed_ids.append(member_id)
+                    if progress:
+                        progress.failed(phase, f"<@{member_id}>: {e}")
+                else:
+                    self.in_flight.discard(member_id)
+                    if changed is False:
+                        self.skipped += 1
+                        if progress:
+                            progress.skipped(phase)
+                    else:
+                        self.done += 1
+                        if progress:
+                            progress.done(phase)
+
+        async def ticker():
+            while True:
+                await asyncio.sleep(interval)
+                self.elapsed = base_elapsed + time.monotonic() - started
+                checkpoint()
+
+        ticking = asyncio.create_task(ticker()) if checkpoint else None
+        try:
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+        finally:
+            if ticking is not None:
+                ticking.cancel()
+            self.elapsed = base_elapsed + time.monotonic() - started
+            if self.status == "running" and not self.pending:
+                self.status = "finished"
+            if checkpoint:
+                checkpoint()
+
+
+class RoleJobStore:
+    """The latest RoleJob per guild, kept in a JsonStore document.
+
+    A running job is checkpointed by marking the document dirty; the store's
+    periodic flush serializes it through RoleJob.to_json. A finished or
+    cancelled job stays until the next job in that guild replaces it, so
+    status still has something to report.
+    """
+
+    def __init__(self, storage, path="role_jobs.json"):
+        self.storage = storage
+        self.path = path
+        raw = storage.load(path, dict)
+        self._jobs = {}
+        for guild_id, data in raw.items():
+            try:
+                self._jobs[guild_id] = RoleJob.from_json(data)
+            except (KeyError, TypeError) as e:
+                print(f"Error loading role job for guild {guild_id}: {e}")
+        storage.register(path, self._jobs)
+
+    def get(self, guild_id):
+        return self._jobs.get(str(guild_id))
+
+    def put(self, job):
+        self._jobs[str(job.guild_id)] = job
+        self.checkpoint()
+
+    def reserve(self, job):
+        """Store job unless the guild already has one running; check and claim happen without an await between them"""
+        current = self.get(job.guild_id)
+        if current is not None and current.status == "running":
+            return False
+        self.put(job)
+        return True
+
+    def release(self, job):
+        """Drop a reserved job that never started"""
+        if self._jobs.get(str(job.guild_id)) is job:
+            del self._jobs[str(job.guild_id)]
+            self.checkpoint()
+
+    def running(self):
+        return [job for job in self._jobs.values() if job.status == "running"]
+
+    def checkpoint(self):
+        self.storage.mark_dirty(self.path)
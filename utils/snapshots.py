@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+SECTIONS = ("roles", "categories", "channels")
+
+
+def layout_order(data):
+    """Put a backup's sections in layout order (roles top first, categories and channels top down).
+
+    Snapshots and current captures are already in that order and carry no
+    positions, since list order is the layout. Single-file backups from
+    before that stored a "position" on every item, so those are sorted by it.
+    """
+    for section in SECTIONS:
+        items = data[section]
+        if items and "position" in items[0]:
+            items.sort(key=lambda item: item["position"], reverse=section == "roles")
+    return data
+
+
+class SnapshotStore:
+    """Content-addressed, incremental server backups.
+
+    Every role, category and channel is stored once as a gzipped object named
+    by the hash of its canonical JSON, and each section's ordered list of
+    hashes is itself an object. Items don't record their position (the list
+    order is the layout), so moving one channel only writes new lists
+    instead of a new object for every channel that shifted. A snapshot is then a small manifest pointing
+    at three section lists, so an unchanged guild costs one manifest per
+    backup and a changed channel costs one new object plus a new channel list.
+    Objects are shared by every snapshot (and every guild) that contains them.
+
+    All methods do blocking file I/O; cogs call them through asyncio.to_thread.
+    """
+
+    def __init__(self, root="backups"):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        self._known = None  # hashes already on disk, loaded on first use
+        # Garbage collection must never run between a save's object writes and its manifest
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _canonical(obj):
+        return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.json.gz")
+
+    def _load_known(self):
+        if self._known is None:
+            self._known = set()
+            for prefix in os.listdir(self.objects_dir):
+                for name in os.listdir(os.path.join(self.objects_dir, prefix)):
+                    self._known.add(name.split(".", 1)[0])
+        return self._known
+
+    @staticmethod
+    def _write_atomic(path, payload):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    def put(self, obj, stats=None):
+        """Store obj if it isn't stored yet; returns its hash"""
+        payload = self._canonical(obj)
+        digest = hashlib.sha256(payload).hexdigest()[:32]
+        known = self._load_known()
+        if digest not in known:
+            path = self._object_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = gzip.compress(payload, compresslevel=6, mtime=0)
+            self._write_atomic(path, compressed)
+            known.add(digest)
+            if stats is not None:
+                stats["objects_written"] += 1
+                stats["bytes_written"] += len(compressed)
+        return digest
+
+    def get(self, digest):
+        with open(self._object_path(digest), "rb") as f:
+            return json.loads(gzip.decompress(f.read()))
+
+    def _guild_dir(self, guild_id):
+        return os.path.join(self.snapshots_dir, str(guild_id))
+
+    def save(self, guild_id, meta, sections):
+        """Write a snapshot; sections maps each of SECTIONS to a list of dicts.
+
+        Returns (snapshot_id, stats) where stats counts the objects and bytes
+        that were actually new.
+        """
+        with self._lock:
+            return self._save(guild_id, meta, sections)
+
+    def _save(self, guild_id, meta, sections):
+        stats = {"objects_written": 0, "bytes_written": 0, "items": 0}
+        trees = {}
+        for section in SECTIONS:
+            items = sections.get(section, [])
+            stats["items"] += len(items)
+            trees[section] = self.put([self.put(item, stats) for item in items], stats)
+
+        manifest = dict(meta)
+        manifest["trees"] = trees
+        manifest["counts"] = {section: len(sections.get(section, [])) for section in SECTIONS}
+
+        guild_dir = self._guild_dir(guild_id)
+        os.makedirs(guild_dir, exist_ok=True)
+        snapshot_id = time.strftime("%Y%m%d_%H%M%S", time.gmtime())
+        path = os.path.join(guild_dir, f"{snapshot_id}.json")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(guild_dir, f"{snapshot_id}_{suffix:03d}.json")
+        payload = json.dumps(manifest, indent=2).encode("utf-8")
+        self._write_atomic(path, payload)
+        stats["bytes_written"] += len(payload)
+        return os.path.basename(path)[:-len(".json")], stats
+
+    def list(self, guild_id):
+        """Snapshot ids for a guild, oldest first"""
+        guild_dir = self._guild_dir(guild_id)
+        if not os.path.isdir(guild_dir):
+            return []
+        return sorted(name[:-len(".json")] for name in os.listdir(guild_dir) if name.endswith(".json"))
+
+    def manifest(self, guild_id, snapshot_id):
+        with open(os.path.join(self._guild_dir(guild_id), f"{snapshot_id}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def load(self, guild_id, snapshot_id):
+        """Rebuild a snapshot in the single-file backup layout restore expects"""
+        manifest = self.manifest(guild_id, snapshot_id)
+        data = {k: v for k, v in manifest.items() if k not in ("trees", "counts")}
+        for section in SECTIONS:
+            data[section] = [self.get(digest) for digest in self.get(manifest["trees"][section])]
+        return data
+
+    def prune(self, guild_id, keep):
+        """Keep the newest `keep` snapshots of a guild, then drop unreferenced objects"""
+        removed = 0
+        with self._lock:
+            for snapshot_id in self.list(guild_id)[:-keep] if keep > 0 else []:
+                os.remove(os.path.join(self._guild_dir(guild_id), f"{snapshot_id}.json"))
+                removed += 1
+            if removed:
+                self._collect_garbage()
+        return removed
+
+    def collect_garbage(self):
+        """Delete objects no snapshot of any guild refers to"""
+        with self._lock:
+            return self._collect_garbage()
+
+    def _collect_garbage(self):
+        live = set()
+        for guild_id in os.listdir(self.snapshots_dir):
+            for snapshot_id in self.list(guild_id):
+                for tree in self.manifest(guild_id, snapshot_id)["trees"].values():
+                    if tree not in live:
+                        live.add(tree)
+                        live.update(self.get(tree))
+        known = self._load_known()
+        freed = 0
+        for digest in list(known - live):
+            try:
+                os.remove(self._object_path(digest))
+                freed += 1
+            except FileNotFoundError:
+                pass
+            known.discard(digest)
+        return freed
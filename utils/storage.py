@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import time
+
+
+class JsonStore:
+    """Write-behind JSON storage shared by every stateful cog.
+
+    Documents live in memory for the lifetime of the bot. Cogs mutate them in
+    place and call ``mark_dirty``; dirty documents are written out together on
+    a timer (and once more at shutdown) instead of on every change.
+    """
+
+    def __init__(self, flush_interval=5.0):
+        self.flush_interval = flush_interval
+        self._documents = {}
+        self._dirty = set()
+        self._flush_task = None
+        self._flush_lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+
+        # Counters surfaced through stats()
+        self.marks = 0
+        self.flushes = 0
+        self.files_written = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def load(self, path, default=None):
+        """Return the live document for path, reading it from disk the first time"""
+        if path in self._documents:
+            return self._documents[path]
+
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = default() if callable(default) else ({} if default is None else default)
+
+        self._documents[path] = data
+        return data
+
+    def register(self, path, data):
+        """Make data the live document for path (for cogs that reshape what they load)"""
+        self._documents[path] = data
+
+    def mark_dirty(self, path):
+        """Schedule a document to be written on the next flush"""
+        self.marks += 1
+        self._dirty.add(path)
+
+    @property
+    def pending(self):
+        return len(self._dirty)
+
+    @staticmethod
+    def _encode(obj):
+        """json.dumps fallback: objects can provide to_json(), anything else is stringified"""
+        to_json = getattr(obj, "to_json", None)
+        if to_json is not None:
+            return to_json()
+        return str(obj)
+
+    def _take_snapshot(self):
+        """Serialize every dirty document on the loop so writers see a consistent state"""
+        paths, self._dirty = self._dirty, set()
+        snapshot = []
+        for path in paths:
+            if path not in self._documents:
+                continue
+            try:
+                payload = json.dumps(self._documents[path], default=self._encode).encode('utf-8')
+            except (TypeError, ValueError) as e:
+                print(f"Error serializing {path}: {e}")
+                self.write_errors += 1
+                continue
+            snapshot.append((path, payload))
+        return snapshot
+
+    @staticmethod
+    def _write_files(snapshot):
+        """Atomically replace each file; runs in a worker thread"""
+        written = 0
+        for path, payload in snapshot:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            written += len(payload)
+        return written
+
+    def _record_flush(self, started, snapshot, written):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.files_written += len(snapshot)
+        self.bytes_written += written
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+        self.total_flush_ms += elapsed_ms
+
+    async def flush(self):
+        """Write all dirty documents without blocking the event loop"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            started = time.perf_counter()
+            snapshot = self._take_snapshot()
+            try:
+                written = await asyncio.to_thread(self._write_files, snapshot)
+            except OSError as e:
+                print(f"Error flushing storage: {e}")
+                self.write_errors += 1
+                # Try again on the next tick
+                self._dirty.update(path for path, _ in snapshot)
+                return
+            self._record_flush(started, snapshot, written)
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+                return  # close() does the final flush
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Storage flush loop error: {e}")
+
+    def start(self):
+        """Start the periodic flush task"""
+        if self._flush_task is None or self._flush_task.done():
+            self._stopping.clear()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Stop the flush task and persist anything still pending"""
+        if self._flush_task is not None:
+            # Signalled rather than cancelled: cancelling mid-flush would abandon a
+            # worker thread still writing files the final flush is about to rewrite
+            self._stopping.set()
+            await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    def stats(self):
+        """Flush latency and write volume counters"""
+        return {
+            "documents": len(self._documents),
+            "pending": len(self._dirty),
+            "marks": self.marks,
+            "flushes": self.flushes,
+            "files_written": self.files_written,
+            "bytes_written": self.bytes_written,
+            "write_errors": self.write_errors,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "max_flush_ms": round(self.max_flush_ms, 2),
+            "avg_flush_ms": round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+        }
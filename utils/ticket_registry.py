@@ -0,0 +1,168 @@
+import statistics
+import time
+
+
+class TicketRegistry:
+    """Open tickets keyed by channel id, with an owner index.
+
+    Records live in a JsonStore document (``{channel_id: record}``) so they
+    survive restarts. Lookups go through ids rather than channel or member
+    names, so a user renaming themselves or a ticket being renamed doesn't
+    lose track of who owns what.
+
+    Each record also carries activity counters fed from on_message (message
+    count, participants, last activity, first staff response). When a
+    ticket's channel is deleted a short summary moves to a separate history
+    document, so response-time reports never need the Discord API.
+    """
+
+    def __init__(self, storage, path="ticket_registry.json",
+                 history_path="ticket_history.json", max_history=5000):
+        self.storage = storage
+        self.path = path
+        self.history_path = history_path
+        self.max_history = max_history
+        self._tickets = storage.load(path, dict)
+        self._history = storage.load(history_path, list)
+        self._by_owner = {}  # (guild_id, owner_id) -> channel_id
+        for channel_id, record in self._tickets.items():
+            if record["status"] != "closed":
+                self._by_owner[(record["guild_id"], record["owner_id"])] = int(channel_id)
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __contains__(self, channel_id):
+        return str(channel_id) in self._tickets
+
+    def _save(self):
+        self.storage.mark_dirty(self.path)
+
+    def get(self, channel_id):
+        """The record for a ticket channel, or None"""
+        return self._tickets.get(str(channel_id))
+
+    def channel_for(self, guild_id, owner_id):
+        """Channel id of the owner's open ticket in guild, or None"""
+        return self._by_owner.get((guild_id, owner_id))
+
+    def channels(self, guild_id=None):
+        """Channel ids of every tracked ticket (optionally in one guild)"""
+        return [
+            int(channel_id) for channel_id, record in self._tickets.items()
+            if guild_id is None or record["guild_id"] == guild_id
+        ]
+
+    def open(self, guild_id, channel_id, owner_id, owner_name, now=None):
+        record = {
+            "guild_id": guild_id,
+            "owner_id": owner_id,
+            "owner_name": owner_name,
+            "status": "open",
+            "claimer_id": None,
+            "created_at": time.time() if now is None else now,
+            "claimed_at": None,
+            "closed_at": None,
+            "message_count": 0,
+            "participants": [],
+            "last_activity": None,
+            "first_response_at": None,
+        }
+        self._tickets[str(channel_id)] = record
+        self._by_owner[(guild_id, owner_id)] = channel_id
+        self._save()
+        return record
+
+    def record_message(self, channel_id, author_id, is_staff, is_bot=False, now=None):
+        """Update a ticket's activity counters; returns False for non-ticket channels"""
+        record = self._tickets.get(str(channel_id))
+        if record is None:
+            return False
+        now = time.time() if now is None else now
+        record["message_count"] = record.get("message_count", 0) + 1
+        record["last_activity"] = now
+        if not is_bot:
+            participants = record.setdefault("participants", [])
+            if author_id not in participants:
+                participants.append(author_id)
+            if is_staff and author_id != record["owner_id"] and record.get("first_response_at") is None:
+                record["first_response_at"] = now
+        self._save()
+        return True
+
+    @staticmethod
+    def response_seconds(record):
+        """Seconds from creation to the first staff reply, or None if unanswered"""
+        if record.get("first_response_at") is None:
+            return None
+        return record["first_response_at"] - record["created_at"]
+
+    def claim(self, channel_id, claimer_id, now=None):
+        record = self.get(channel_id)
+        if record is None:
+            return None
+        record["status"] = "claimed"
+        record["claimer_id"] = claimer_id
+        record["claimed_at"] = time.time() if now is None else now
+        self._save()
+        return record
+
+    def close(self, channel_id, now=None):
+        """Mark a ticket closed; it stays registered until its channel is gone.
+
+        A closed ticket no longer counts as the owner's open ticket, so they
+        can open a new one during the countdown before deletion.
+        """
+        record = self.get(channel_id)
+        if record is None:
+            return None
+        record["status"] = "closed"
+        record["closed_at"] = time.time() if now is None else now
+        key = (record["guild_id"], record["owner_id"])
+        if self._by_owner.get(key) == channel_id:
+            del self._by_owner[key]
+        self._save()
+        return record
+
+    def remove(self, channel_id):
+        """Forget a ticket (its channel was deleted)"""
+        record = self._tickets.pop(str(channel_id), None)
+        if record is None:
+            return None
+        key = (record["guild_id"], record["owner_id"])
+        if self._by_owner.get(key) == channel_id:
+            del self._by_owner[key]
+        self._archive(record)
+        self._save()
+        return record
+
+    def _archive(self, record):
+        self._history.append({
+            "guild_id": record["guild_id"],
+            "created_at": record["created_at"],
+            "closed_at": record.get("closed_at"),
+            "response_seconds": self.response_seconds(record),
+            "message_count": record.get("message_count", 0),
+        })
+        if len(self._history) > self.max_history:
+            del self._history[:len(self._history) - self.max_history]
+        self.storage.mark_dirty(self.history_path)
+
+    def report(self, guild_id):
+        """Response-time summary over open and archived tickets in a guild"""
+        open_tickets = [r for r in self._tickets.values() if r["guild_id"] == guild_id]
+        archived = [h for h in self._history if h["guild_id"] == guild_id]
+        responses = [self.response_seconds(r) for r in open_tickets]
+        responses += [h["response_seconds"] for h in archived]
+        answered = [seconds for seconds in responses if seconds is not None]
+        return {
+            "open": sum(1 for r in open_tickets if r["status"] != "closed"),
+            "awaiting_staff": sum(
+                1 for r in open_tickets
+                if r["status"] != "closed" and r.get("first_response_at") is None
+            ),
+            "total": len(open_tickets) + len(archived),
+            "answered": len(answered),
+            "median_response": statistics.median(answered) if answered else None,
+            "p90_response": statistics.quantiles(answered, n=10)[-1] if len(answered) >= 2 else None,
+        }
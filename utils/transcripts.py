@@ -0,0 +1,217 @@
+import asyncio
+import gzip
+import html
+import json
+import os
+import tempfile
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional
+    zstandard = None
+
+
+FORMATS = ("txt", "jsonl", "html")
+COMPRESSIONS = ("gzip", "zstd", "none")
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body{{background:#313338;color:#dbdee1;font:15px/1.4 "Segoe UI",Helvetica,Arial,sans-serif;margin:0;padding:24px}}
+header{{border-bottom:1px solid #4e5058;margin-bottom:16px;padding-bottom:12px}}
+header h1{{font-size:20px;margin:0 0 8px}}
+header dl{{display:grid;grid-template-columns:max-content auto;gap:2px 12px;margin:0}}
+header dt{{color:#949ba4}}
+.msg{{padding:4px 0}}
+.author{{color:#f2f3f5;font-weight:600}}
+.ts{{color:#949ba4;font-size:12px;margin-left:6px}}
+.content{{white-space:pre-wrap;word-wrap:break-word}}
+.extra{{color:#949ba4;font-size:13px}}
+a{{color:#00a8fc}}
+</style></head><body>
+"""
+_HTML_FOOT = "</body></html>\n"
+
+
+def _open_zstd(raw):
+    return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False)
+
+
+class TranscriptWriter:
+    """Streams a ticket transcript to a compressed temporary file.
+
+    Messages are rendered into a small text buffer that is handed to a worker
+    thread for compression and writing whenever it passes ``chunk_size``, so
+    the memory used is bounded by one chunk no matter how long the ticket is,
+    and the event loop never waits on the file.
+    """
+
+    def __init__(self, fmt="html", compression="gzip", directory=None, chunk_size=256 * 1024):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown transcript format: {fmt}")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown transcript compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            print("zstandard is not installed, writing gzip transcripts instead")
+            compression = "gzip"
+
+        self.fmt = fmt
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.messages = 0
+        self.bytes_in = 0
+
+        fd, self.path = tempfile.mkstemp(prefix="transcript-", dir=directory)
+        self._raw = os.fdopen(fd, "wb")
+        if compression == "gzip":
+            self._out = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6)
+        elif compression == "zstd":
+            self._out = _open_zstd(self._raw)
+        else:
+            self._out = self._raw
+        self._buffer = []
+        self._buffered = 0
+
+    @property
+    def extension(self):
+        suffix = {"gzip": ".gz", "zstd": ".zst", "none": ""}[self.compression]
+        return f".{self.fmt}{suffix}"
+
+    @property
+    def size(self):
+        """Bytes written to disk so far (compressed)"""
+        return self._raw.tell() if not self._raw.closed else os.path.getsize(self.path)
+
+    def _write_sync(self, data):
+        self._out.write(data)
+
+    async def _drain(self):
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        self._buffer = []
+        self._buffered = 0
+        self.bytes_in += len(data)
+        await asyncio.to_thread(self._write_sync, data)
+
+    async def _emit(self, text):
+        self._buffer.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self.chunk_size:
+            await self._drain()
+
+    async def write_header(self, meta):
+        """meta: ordered mapping of label -> value shown above the messages"""
+        if self.fmt == "txt":
+            lines = ["=== DELIRIUM DEN TICKET TRANSCRIPT ==="]
+            lines += [f"{label}: {value}" for label, value in meta.items()]
+            lines += ["=" * 50, "", ""]
+            await self._emit("\n".join(lines))
+        elif self.fmt == "jsonl":
+            record = {"type": "meta"}
+            record.update({label.lower().replace(" ", "_"): str(value) for label, value in meta.items()})
+            await self._emit(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            title = html.escape(f"Transcript - {meta.get('Ticket', '')}")
+            rows = "".join(
+                f"<dt>{html.escape(str(label))}</dt><dd>{html.escape(str(value))}</dd>"
+                for label, value in meta.items()
+            )
+            await self._emit(
+                _HTML_HEAD.format(title=title)
+                + f"<header><h1>Delirium Den Ticket Transcript</h1><dl>{rows}</dl></header>\n"
+            )
+
+    async def add(self, message):
+        """Render one discord.Message"""
+        self.messages += 1
+        if self.fmt == "txt":
+            await self._emit(self._render_txt(message))
+        elif self.fmt == "jsonl":
+            await self._emit(self._render_jsonl(message))
+        else:
+            await self._emit(self._render_html(message))
+
+    @staticmethod
+    def _render_txt(message):
+        timestamp = message.created_at.strftime('%Y-%m-%d %H:%M:%S UTC')
+        author = f"{message.author.name}#{message.author.discriminator}"
+        content = message.content if message.content else "[No text content]"
+        if message.embeds:
+            content += f" [Embed: {len(message.embeds)} embed(s)]"
+        if message.attachments:
+            content += f" [Attachments: {', '.join(att.filename for att in message.attachments)}]"
+        return f"[{timestamp}] {author}: {content}\n"
+
+    @staticmethod
+    def _render_jsonl(message):
+        record = {
+            "id": message.id,
+            "created_at": message.created_at.isoformat(),
+            "author_id": message.author.id,
+            "author": message.author.name,
+            "content": message.content,
+            "embeds": len(message.embeds),
+            "attachments": [{"filename": att.filename, "url": att.url} for att in message.attachments],
+        }
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    @staticmethod
+    def _render_html(message):
+        timestamp = message.created_at.strftime('%Y-%m-%d %H:%M:%S UTC')
+        parts = [
+            f'<div class="msg" id="m{message.id}"><span class="author">{html.escape(message.author.name)}</span>'
+            f'<span class="ts">{timestamp}</span>'
+        ]
+        if message.content:
+            parts.append(f'<div class="content">{html.escape(message.content)}</div>')
+        if message.embeds:
+            parts.append(f'<div class="extra">[Embed: {len(message.embeds)} embed(s)]</div>')
+        for att in message.attachments:
+            parts.append(
+                f'<div class="extra">📎 <a href="{html.escape(att.url, quote=True)}">{html.escape(att.filename)}</a></div>'
+            )
+        parts.append("</div>\n")
+        return "".join(parts)
+
+    async def close(self):
+        """Write the footer, flush the compressor and close the file"""
+        if self.fmt == "html":
+            await self._emit(_HTML_FOOT)
+        await self._drain()
+        await asyncio.to_thread(self._close_sync)
+
+    def _close_sync(self):
+        if self._out is not self._raw:
+            self._out.close()
+        self._raw.close()
+
+    def discard(self):
+        """Close (if still open) and remove the temporary file"""
+        try:
+            if not self._raw.closed:
+                self._close_sync()
+        except Exception:
+            pass
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def export_transcript(channel, meta, fmt="html", compression="gzip", directory=None):
+    """Stream channel's whole history, oldest first, into a TranscriptWriter.
+
+    Returns the closed writer; the caller uploads ``writer.path`` and then
+    calls ``writer.discard()``.
+    """
+    writer = TranscriptWriter(fmt, compression, directory)
+    try:
+        await writer.write_header(meta)
+        async for message in channel.history(limit=None, oldest_first=True):
+            await writer.add(message)
+        await writer.close()
+    except BaseException:
+        writer.discard()
+        raise
+    return writer
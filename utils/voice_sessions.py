@@ -0,0 +1,79 @@
+import time
+
+
+class VoiceSession:
+    """One member's stay in voice within one guild"""
+
+    __slots__ = ("channel_id", "joined_at", "earning", "earning_since", "banked_seconds")
+
+    def __init__(self, channel_id, earning, now):
+        self.channel_id = channel_id
+        self.joined_at = now
+        self.earning = earning
+        self.earning_since = now
+        self.banked_seconds = 0.0
+
+    def bank(self, now):
+        """Move earning time up to now into banked_seconds"""
+        if self.earning:
+            self.banked_seconds += max(0.0, now - self.earning_since)
+        self.earning_since = now
+
+
+class VoiceSessionTracker:
+    """Voice sessions keyed by (guild_id, user_id), settled lazily.
+
+    Nothing runs per minute: earning time is banked whenever a session's
+    state changes and converted to whole minutes only when the caller
+    settles it (on leave, on /rank, or at a coarse checkpoint). Partial
+    minutes stay banked for the next settlement, so no time is counted twice.
+    """
+
+    def __init__(self):
+        self._sessions = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, key):
+        return key in self._sessions
+
+    def update(self, guild_id, user_id, channel_id, earning, now=None):
+        """Start a session or record a change of channel/earning state"""
+        now = time.time() if now is None else now
+        key = (guild_id, user_id)
+        session = self._sessions.get(key)
+        if session is None:
+            self._sessions[key] = VoiceSession(channel_id, earning, now)
+            return
+        session.bank(now)
+        session.channel_id = channel_id
+        session.earning = earning
+
+    def _take_minutes(self, session, now):
+        session.bank(now)
+        minutes = int(session.banked_seconds // 60)
+        session.banked_seconds -= minutes * 60
+        return minutes
+
+    def settle(self, guild_id, user_id, now=None):
+        """Whole earning minutes accrued since the last settlement"""
+        session = self._sessions.get((guild_id, user_id))
+        if session is None:
+            return 0
+        return self._take_minutes(session, time.time() if now is None else now)
+
+    def end(self, guild_id, user_id, now=None):
+        """Close a session and return its unsettled whole minutes"""
+        session = self._sessions.pop((guild_id, user_id), None)
+        if session is None:
+            return 0
+        return self._take_minutes(session, time.time() if now is None else now)
+
+    def settle_all(self, now=None):
+        """Yield ((guild_id, user_id), minutes) for every session with minutes to credit"""
+        now = time.time() if now is None else now
+        for key, session in list(self._sessions.items()):
+            minutes = self._take_minutes(session, now)
+            if minutes:
+                yield key, minutes
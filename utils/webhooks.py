@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+import aiohttp
+import discord
+
+
+MAX_EMBEDS = 10          # per webhook execute
+MAX_EMBED_CHARS = 6000   # combined text of every embed in one message
+
+
+def embed_size(data):
+    """Characters Discord counts towards the 6000 limit for one embed dict"""
+    size = len(data.get("title", "")) + len(data.get("description", ""))
+    size += len(data.get("footer", {}).get("text", ""))
+    size += len(data.get("author", {}).get("name", ""))
+    for field in data.get("fields", ()):
+        size += len(field.get("name", "")) + len(field.get("value", ""))
+    return size
+
+
+class WebhookDispatcher:
+    """Queued, batched delivery to one Discord webhook over a pooled session.
+
+    ``send`` only appends to a bounded queue. A single worker packs up to 10
+    embeds (and at most 6000 characters) into each execute call, flushing
+    when a batch fills or ``flush_interval`` seconds after the first queued
+    embed. It waits out 429s using ``retry_after`` and pauses on its own when
+    the bucket headers say the webhook has no requests left. When the queue
+    is full the oldest embeds are dropped and counted.
+
+    An embed can carry a file attachment (a path the dispatcher deletes once
+    it has been delivered or given up on); those go out on their own.
+    """
+
+    def __init__(self, url, flush_interval=1.0, max_queue=5000):
+        self.url = url
+        self.flush_interval = flush_interval
+        self._queue = deque(maxlen=max_queue)
+        self._wakeup = asyncio.Event()
+        self._session = None
+        self._worker = None
+        self._paused_until = 0.0
+
+        # Counters surfaced through stats()
+        self.queued = 0
+        self.sent = 0
+        self.batches = 0
+        self.dropped = 0
+        self.rate_limited = 0
+        self.failed = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    def send(self, embed_data, attachment=None):
+        """Queue one embed dict for delivery; attachment is an optional (path, filename)"""
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1
+            _, dropped_attachment = self._queue[0]
+            if dropped_attachment:
+                self.discard_attachment(dropped_attachment)
+        self._queue.append((embed_data, attachment))
+        self.queued += 1
+        if len(self._queue) >= MAX_EMBEDS:
+            self._wakeup.set()
+        self.start()
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    def _session_for_send(self):
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+        return self._session
+
+    def _take_batch(self):
+        """Up to 10 plain embeds, or a single embed with its attachment"""
+        if self._queue and self._queue[0][1] is not None:
+            embed_data, attachment = self._queue.popleft()
+            return [embed_data], attachment
+        batch = []
+        chars = 0
+        while self._queue and len(batch) < MAX_EMBEDS and self._queue[0][1] is None:
+            size = embed_size(self._queue[0][0])
+            if batch and chars + size > MAX_EMBED_CHARS:
+                break
+            batch.append(self._queue.popleft()[0])
+            chars += size
+        return batch, None
+
+    @staticmethod
+    def discard_attachment(attachment):
+        """Remove an attachment's file once nothing is going to upload it"""
+        try:
+            os.remove(attachment[0])
+        except OSError:
+            pass
+
+    async def _run(self):
+        while self._queue:
+            if len(self._queue) < MAX_EMBEDS:
+                # Give a burst a moment to fill the batch
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            batch, attachment = self._take_batch()
+            if not batch:
+                continue
+            try:
+                await self._deliver({"embeds": batch}, len(batch), attachment)
+            finally:
+                if attachment:
+                    self.discard_attachment(attachment)
+
+    async def _deliver(self, payload, count, attachment=None, attempts=5):
+        """POST one execute call; 429s are waited out, other failures retried a few times"""
+        if not self.url:
+            self.dropped += count
+            return False
+        failures = 0
+        while failures < attempts:
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            handle = None
+            try:
+                if attachment:
+                    path, filename = attachment
+                    handle = open(path, "rb")
+                    form = aiohttp.FormData()
+                    form.add_field("payload_json", json.dumps(payload), content_type="application/json")
+                    form.add_field("files[0]", handle, filename=filename)
+                    request = {"data": form}
+                else:
+                    request = {"json": payload}
+                async with self._session_for_send().post(self.url, **request) as response:
+                    self._note_bucket(response.headers)
+                    if response.status in (200, 204):
+                        self.sent += count
+                        self.batches += 1
+                        return True
+                    if response.status == 429:
+                        self.rate_limited += 1
+                        try:
+                            retry_after = float((await response.json()).get("retry_after", 1))
+                        except (aiohttp.ContentTypeError, ValueError):
+                            retry_after = float(response.headers.get("Retry-After", 1))
+                        self._paused_until = time.monotonic() + retry_after
+                        continue
+                    if response.status < 500:
+                        print(f"Webhook request failed with status {response.status}: {await response.text()}")
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                print(f"Error sending webhook: {e}")
+            finally:
+                if handle is not None:
+                    handle.close()
+            failures += 1
+            await asyncio.sleep(2 ** failures)
+        self.failed += count
+        return False
+
+    def _note_bucket(self, headers):
+        """Pause before the next call when the bucket is empty instead of eating a 429"""
+        if headers.get("X-RateLimit-Remaining") == "0":
+            try:
+                reset_after = float(headers.get("X-RateLimit-Reset-After", 0))
+            except ValueError:
+                return
+            self._paused_until = max(self._paused_until, time.monotonic() + reset_after)
+
+    async def close(self):
+        """Deliver what is queued (best effort), then close the session"""
+        if self._worker is not None and not self._worker.done():
+            self._wakeup.set()
+            try:
+                await asyncio.wait_for(self._worker, 10)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._worker.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def stats(self):
+        return {
+            "pending": len(self._queue),
+            "queued": self.queued,
+            "sent": self.sent,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+        }
+
+
+class ChannelWebhookPool:
+    """One reusable bot-owned webhook per channel.
+
+    The first send in a channel adopts a webhook the bot already owns there
+    (matched by name) or creates one; later sends reuse the cached object,
+    so a replacement costs one execute call instead of create/send/delete.
+    Threads use their parent's webhook. Call ``invalidate`` when a channel's
+    webhooks change; a send that finds its webhook gone drops the cache
+    entry and retries once with a fresh one.
+    """
+
+    def __init__(self, bot, name):
+        self.bot = bot
+        self.name = name
+        self._webhooks = {}  # parent channel id -> discord.Webhook
+        self._locks = {}
+        self.created = 0
+        self.adopted = 0
+
+    @staticmethod
+    def _parent(channel):
+        return channel.parent if isinstance(channel, discord.Thread) else channel
+
+    def invalidate(self, channel_id):
+        self._webhooks.pop(channel_id, None)
+
+    async def get(self, channel):
+        parent = self._parent(channel)
+        webhook = self._webhooks.get(parent.id)
+        if webhook is not None:
+            return webhook
+        lock = self._locks.setdefault(parent.id, asyncio.Lock())
+        async with lock:
+            webhook = self._webhooks.get(parent.id)
+            if webhook is None:
+                for existing in await parent.webhooks():
+                    if (existing.name == self.name and existing.token
+                            and existing.user and existing.user.id == self.bot.user.id):
+                        webhook = existing
+                        self.adopted += 1
+                        break
+                else:
+                    webhook = await parent.create_webhook(name=self.name)
+                    self.created += 1
+                self._webhooks[parent.id] = webhook
+        return webhook
+
+    async def send(self, channel, **kwargs):
+        """Execute the channel's webhook with discord.Webhook.send keyword arguments"""
+        if isinstance(channel, discord.Thread):
+            kwargs["thread"] = channel
+        for attempt in range(2):
+            webhook = await self.get(channel)
+            try:
+                return await webhook.send(**kwargs)
+            except discord.NotFound:
+                self.invalidate(self._parent(channel).id)
+                if attempt:
+                    raise
+
+    def stats(self):
+        return {"cached": len(self._webhooks), "created": self.created, "adopted": self.adopted}